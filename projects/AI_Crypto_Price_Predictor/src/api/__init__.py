@@ -0,0 +1,6 @@
+"""HTTP serving of predictions."""
+
+from .batching import DynamicBatcher, LatencyTracker
+from .cache import PredictionCache
+
+__all__ = ["DynamicBatcher", "LatencyTracker", "PredictionCache"]
@@ -0,0 +1,159 @@
+"""Dynamic request batching in front of a batch prediction function.
+
+Concurrent ``submit`` calls are queued and grouped: a batch closes when it
+holds ``max_batch_size`` requests or ``max_wait`` seconds after its first
+request arrived. The batch runs in ``executor`` (a process pool in
+production) so the event loop keeps accepting requests, and while up to
+``concurrency`` batches are in flight the next one is already forming.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..models.predictor import pad_windows
+
+PredictFn = Callable[[NDArray[np.float64], NDArray[np.int64]], NDArray[np.float64]]
+
+_Request = tuple[NDArray[np.float64], int, "asyncio.Future[float]"]
+
+
+class LatencyTracker:
+    """Percentiles over the most recent ``size`` latencies."""
+
+    def __init__(self, size: int = 10_000):
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.samples = np.zeros(size)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    def summary(self) -> dict[str, float]:
+        """Count, p50, p99 and max of the recent latencies in milliseconds."""
+        recent = self.samples[: min(self.count, len(self.samples))] * 1000
+        if not len(recent):
+            return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        p50, p99 = np.percentile(recent, [50, 99])
+        return {
+            "count": self.count,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "max_ms": float(recent.max()),
+        }
+
+
+class DynamicBatcher:
+    """Group concurrent prediction requests into batches."""
+
+    def __init__(
+        self,
+        predict: PredictFn,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        executor: Executor | None = None,
+        concurrency: int = 1,
+    ):
+        if max_batch_size < 1 or concurrency < 1:
+            raise ValueError("max_batch_size and concurrency must be positive")
+        if max_wait < 0:
+            raise ValueError("max_wait must be non-negative")
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.concurrency = concurrency
+        self.batches = 0
+        self.predictions = 0
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._in_flight: set[asyncio.Task[None]] = set()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.predictions / self.batches if self.batches else 0.0
+
+    async def start(self) -> None:
+        """Start collecting batches on the running loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        """Stop collecting and wait for batches already running."""
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()[2].cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def submit(self, window: NDArray[np.float64], horizon: int) -> float:
+        """Queue one request and wait for its prediction."""
+        if self._queue is None:
+            raise RuntimeError("DynamicBatcher is not started")
+        future: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((window, horizon, future))
+        return await future
+
+    async def _collect(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        batch: list[_Request] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(queue.get(), remaining))
+                        except asyncio.TimeoutError:
+                            break
+                await slots.acquire()
+                task = asyncio.create_task(self._run(batch))
+                batch = []
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            for _, _, future in batch:
+                future.cancel()
+
+    async def _run(self, batch: list[_Request]) -> None:
+        # Requests whose callers went away are not worth computing
+        batch = [request for request in batch if not request[2].done()]
+        if not batch:
+            return
+        windows = pad_windows([window for window, _, _ in batch])
+        horizons = np.array([horizon for _, horizon, _ in batch], np.int64)
+        loop = asyncio.get_running_loop()
+        try:
+            results: Any = await loop.run_in_executor(
+                self.executor, self.predict, windows, horizons
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.predictions += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(float(result))
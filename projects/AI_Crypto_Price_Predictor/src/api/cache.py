@@ -0,0 +1,163 @@
+"""Two-tier cache of prediction results.
+
+Predictions are keyed on symbol, horizon and a BLAKE2 digest of the input
+price window, so identical requests share a result however they arrive.
+Lookups go to an in-process LRU first, then to Redis, where entries live
+for ``ttl`` seconds under ``prefix`` (the ``cache_ttl`` and ``prefix`` of
+``RedisConfig``). Local entries expire after the same ``ttl``.
+
+Misses are single-flight: while one caller computes a key, every other
+caller of that key awaits the same task instead of starting its own, so a
+burst of identical BTC requests reaches the model once. The task is
+shielded, so a caller that disconnects does not cancel it for the rest.
+
+Redis is optional and may be a synchronous or asyncio client; calls to
+a synchronous one run in a worker thread so a slow server does not stall
+the event loop. Errors from it are logged and treated as misses, never
+surfaced to callers.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """In-process LRU in front of an optional Redis layer."""
+
+    def __init__(
+        self,
+        redis: Any = None,
+        ttl: int = 3600,
+        prefix: str = "",
+        max_entries: int = 10_000,
+    ):
+        if ttl < 1:
+            raise ValueError("ttl must be positive")
+        if max_entries < 0:
+            raise ValueError("max_entries must be non-negative")
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "redis_errors": 0,
+        }
+        self._local: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._pending: dict[str, asyncio.Task[float]] = {}
+
+    @classmethod
+    def from_config(
+        cls, config: Any, redis: Any = None, max_entries: int = 10_000
+    ) -> "PredictionCache":
+        """Create a cache from a ``RedisConfig`` or its dict form."""
+        if isinstance(config, Mapping):
+            ttl, prefix = config["cache_ttl"], config["prefix"]
+        else:
+            ttl, prefix = config.cache_ttl, config.prefix
+        return cls(redis, ttl=ttl, prefix=prefix, max_entries=max_entries)
+
+    def key(self, symbol: str, horizon: int, window: NDArray[np.float64]) -> str:
+        """Cache key of a prediction request."""
+        data = np.ascontiguousarray(window, np.float64).tobytes()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return f"{self.prefix}prediction:{symbol}:{horizon}:{digest}"
+
+    async def get_or_compute(
+        self,
+        symbol: str,
+        horizon: int,
+        window: NDArray[np.float64],
+        compute: Callable[[], Awaitable[float]],
+    ) -> float:
+        """Return the cached prediction, computing it at most once if missing.
+
+        Raises ``ValueError``, and caches nothing, if the prediction is not
+        a finite number.
+        """
+        key = self.key(symbol, horizon, window)
+        value = self._get_local(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Drop every local entry; Redis entries expire on their own."""
+        self._local.clear()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[float]]) -> float:
+        cached = await self._redis_call("get", key)
+        if cached is not None:
+            self.stats["redis_hits"] += 1
+            value = float(cached)
+        else:
+            self.stats["misses"] += 1
+            value = await compute()
+        if not math.isfinite(value):
+            raise ValueError(f"Prediction is not finite: {value}")
+        if cached is None:
+            await self._redis_call("set", key, repr(value), ex=self.ttl)
+        self._set_local(key, value)
+        return value
+
+    def _get_local(self, key: str) -> float | None:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: float) -> None:
+        if not self.max_entries:
+            return
+        self._local[key] = (value, time.monotonic() + self.ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _redis_call(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        if self.redis is None:
+            return None
+        try:
+            method = getattr(self.redis, command)
+            if inspect.iscoroutinefunction(method):
+                return await method(*args, **kwargs)
+            # A blocking client must not hold up the other requests
+            result = await asyncio.to_thread(method, *args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception:
+            self.stats["redis_errors"] += 1
+            logger.warning("Redis %s failed", command, exc_info=True)
+            return None
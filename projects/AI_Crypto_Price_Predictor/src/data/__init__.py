@@ -0,0 +1,14 @@
+"""Price data storage and ingestion."""
+
+from .ingestion import FakeExchange, IngestionPipeline, ReplaySource
+from .schemas import CryptoPrice
+from .timeseries import SeriesSlice, TimeSeriesStore
+
+__all__ = [
+    "CryptoPrice",
+    "FakeExchange",
+    "IngestionPipeline",
+    "ReplaySource",
+    "SeriesSlice",
+    "TimeSeriesStore",
+]
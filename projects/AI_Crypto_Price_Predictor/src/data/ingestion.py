@@ -0,0 +1,385 @@
+"""Streaming ingestion of price ticks into the time-series store.
+
+A source is any async iterable of raw tick mappings. ``IngestionPipeline``
+runs it as a producer feeding a bounded ``asyncio.Queue``: when the
+consumer falls behind the queue fills up and ``put`` blocks, which slows
+the source down instead of buffering without limit.
+
+The consumer drains the queue into micro-batches, closing a batch when it
+holds ``batch_size`` ticks or ``max_delay`` seconds after its first tick
+arrived, whichever comes first. Each batch is validated against
+``CryptoPrice`` in one pydantic call and written to the sink with a
+single ``extend``, so per-tick overhead is limited to a queue operation.
+
+``ReplaySource`` and ``FakeExchange`` make the pipeline usable offline;
+a live exchange client only has to yield the same mappings.
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import math
+import random
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Mapping
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+from .schemas import CryptoPrice
+
+logger = logging.getLogger(__name__)
+
+_ADAPTER = TypeAdapter(list[CryptoPrice])
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DONE = object()  # end-of-stream marker put on the queue by the producer
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    """Parse an ISO timestamp as UTC-aware, or ``None`` if it is invalid.
+
+    Only used to pace replays; rows with a bad timestamp are still emitted
+    and rejected by validation.
+    """
+    text = str(value)
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"  # not accepted by Python 3.10
+    try:
+        timestamp = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+class PriceSink(Protocol):
+    """Where validated batches go; ``TimeSeriesStore`` satisfies it.
+
+    A sink that also has ``latest(symbol, count)``, as the store does, is
+    asked for each symbol's newest tick so a restarted pipeline does not
+    try to append older ones.
+    """
+
+    def extend(self, rows: Iterable[Any]) -> int: ...
+
+
+class ReplaySource:
+    """Replay ticks recorded as JSON lines or CSV.
+
+    Without ``speed`` ticks are emitted as fast as the pipeline accepts
+    them; with it the gaps between their timestamps are reproduced,
+    divided by ``speed``. A row whose timestamp does not parse is
+    emitted without delay and left for validation to reject.
+    """
+
+    def __init__(self, path: str | Path, speed: float | None = None):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.path = Path(path)
+        self.speed = speed
+
+    def _rows(self) -> Iterable[dict[str, Any]]:
+        with open(self.path, newline="") as f:
+            if self.path.suffix == ".csv":
+                yield from csv.DictReader(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        first: datetime | None = None
+        started = loop.time()
+        for count, row in enumerate(self._rows()):
+            timestamp = None
+            if self.speed is not None:
+                timestamp = _parse_timestamp(row.get("timestamp"))
+            if timestamp is not None:
+                first = first or timestamp
+                due = (timestamp - first).total_seconds() / self.speed
+                delay = started + due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % 256 == 0:
+                await asyncio.sleep(0)
+            yield row
+
+
+class FakeExchange:
+    """Random-walk ticks for a few symbols, optionally rate limited.
+
+    ``rate`` is in ticks per second across all symbols; ``None`` emits as
+    fast as possible. Stops after ``count`` ticks, or never when ``None``.
+    """
+
+    def __init__(
+        self,
+        symbols: Mapping[str, float] | None = None,
+        rate: float | None = None,
+        count: int | None = None,
+        volatility: float = 0.001,
+        seed: int | None = None,
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.prices = dict(symbols or {"BTC": 40_000.0, "ETH": 2_500.0})
+        self.rate = rate
+        self.count = count
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        symbols = list(self.prices)
+        started = loop.time()
+        last = datetime.now(timezone.utc)
+        sequence = 0
+        while self.count is None or sequence < self.count:
+            if self.rate is not None:
+                delay = started + sequence / self.rate - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif sequence % 256 == 0:
+                await asyncio.sleep(0)
+            symbol = symbols[sequence % len(symbols)]
+            price = self.prices[symbol] * math.exp(self._rng.gauss(0, self.volatility))
+            self.prices[symbol] = price
+            # Keep timestamps increasing even if the wall clock steps back
+            last = max(last, datetime.now(timezone.utc))
+            yield {
+                "id": f"{symbol}_{sequence % 10**8:08d}",
+                "symbol": symbol,
+                "price": f"{price:.2f}",
+                "timestamp": last.isoformat(),
+                "source": "fake-exchange",
+            }
+            sequence += 1
+
+
+class IngestionMetrics:
+    """Counters and timings of one pipeline run."""
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.late = 0
+        self.batches = 0
+        self.queue_high_water = 0
+        self.backpressure_seconds = 0.0
+        self.flush_seconds = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.max_latency = 0.0
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Accepted ticks per second of wall time."""
+        return self.accepted / self.elapsed if self.elapsed else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        """All metrics as a flat dict, e.g. for logging or an endpoint.
+
+        ``lag`` is how far behind event time the newest flushed tick was;
+        ``latency`` is the time a tick spent between the queue and the sink.
+        """
+        return {
+            "received": self.received,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "late": self.late,
+            "batches": self.batches,
+            "mean_batch_size": self.accepted / self.batches if self.batches else 0.0,
+            "queue_high_water": self.queue_high_water,
+            "backpressure_seconds": self.backpressure_seconds,
+            "flush_seconds": self.flush_seconds,
+            "throughput": self.throughput,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "max_latency": self.max_latency,
+            "elapsed": self.elapsed,
+        }
+
+
+class IngestionPipeline:
+    """Move ticks from a source to a sink in validated micro-batches."""
+
+    def __init__(
+        self,
+        source: AsyncIterable[Mapping[str, Any]],
+        sink: PriceSink,
+        batch_size: int = 1000,
+        max_delay: float = 0.1,
+        queue_size: int = 10_000,
+    ):
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError("batch_size and queue_size must be positive")
+        if max_delay < 0:
+            raise ValueError("max_delay must be non-negative")
+        self.source = source
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.metrics = IngestionMetrics()
+        self._last_seen: dict[str, datetime | None] = {}
+        self._resumed: set[str] = set()
+        self._stopping = False
+
+    async def run(self) -> IngestionMetrics:
+        """Ingest until the source is exhausted or the task is cancelled."""
+        queue: asyncio.Queue[Any] = asyncio.Queue(self.queue_size)
+        self.metrics = IngestionMetrics()
+        self._stopping = False
+        tasks = [
+            asyncio.create_task(self._produce(queue)),
+            asyncio.create_task(self._consume(queue)),
+        ]
+        try:
+            # A failing source or sink cancels the other side
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.metrics.finished = time.monotonic()
+        return self.metrics
+
+    def stop(self) -> None:
+        """Stop reading the source; ``run`` returns once queued ticks are flushed."""
+        self._stopping = True
+
+    async def _produce(self, queue: "asyncio.Queue[Any]") -> None:
+        metrics = self.metrics
+        async for row in self.source:
+            if self._stopping:
+                break
+            item = (time.monotonic(), row)
+            metrics.received += 1
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                blocked = time.monotonic()
+                await queue.put(item)
+                metrics.backpressure_seconds += time.monotonic() - blocked
+            if queue.qsize() > metrics.queue_high_water:
+                metrics.queue_high_water = queue.qsize()
+        await queue.put(_DONE)
+
+    async def _consume(self, queue: "asyncio.Queue[Any]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            done = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if done:
+                return
+
+    def _flush(self, batch: list[tuple[float, Mapping[str, Any]]]) -> None:
+        metrics = self.metrics
+        ticks = self._validate([row for _, row in batch])
+        groups: dict[str, list[CryptoPrice]] = {}
+        for tick in ticks:
+            if tick is None:
+                metrics.rejected += 1
+                continue
+            # The store is append-only per symbol, so drop ticks that
+            # arrive after a newer one for the same symbol
+            if tick.timestamp.tzinfo is None:
+                tick.timestamp = tick.timestamp.replace(tzinfo=timezone.utc)
+            group = groups.get(tick.symbol)
+            last = group[-1].timestamp if group else self._last_stored(tick.symbol)
+            # A tick at exactly the stored newest time is a replayed duplicate
+            resumed = not group and tick.symbol in self._resumed
+            if last is not None and (
+                tick.timestamp < last or (resumed and tick.timestamp == last)
+            ):
+                metrics.late += 1
+                continue
+            groups.setdefault(tick.symbol, []).append(tick)
+        started = time.monotonic()
+        written = []
+        for symbol, rows in groups.items():
+            try:
+                self.sink.extend(rows)
+            except ValueError:
+                logger.warning(
+                    "Sink rejected %d %s ticks", len(rows), symbol, exc_info=True
+                )
+                metrics.rejected += len(rows)
+                continue
+            self._last_seen[symbol] = rows[-1].timestamp
+            self._resumed.discard(symbol)
+            written.extend(rows)
+        if written:
+            finished = time.monotonic()
+            metrics.flush_seconds += finished - started
+            metrics.accepted += len(written)
+            metrics.batches += 1
+            metrics.max_latency = max(metrics.max_latency, finished - batch[0][0])
+            lag = datetime.now(timezone.utc) - max(tick.timestamp for tick in written)
+            metrics.last_lag = max(lag, timedelta(0)).total_seconds()
+            metrics.max_lag = max(metrics.max_lag, metrics.last_lag)
+
+    def _last_stored(self, symbol: str) -> datetime | None:
+        """Newest timestamp of a symbol, asking the sink on first sight."""
+        if symbol in self._last_seen:
+            return self._last_seen[symbol]
+        last = None
+        latest = getattr(self.sink, "latest", None)
+        if latest is not None:
+            try:
+                stored = latest(symbol, 1).timestamps
+            except ValueError:
+                stored = ()
+            if len(stored):
+                nanoseconds = int(stored[-1].astype(np.int64))
+                last = _EPOCH + timedelta(microseconds=nanoseconds // 1000)
+                self._resumed.add(symbol)
+        self._last_seen[symbol] = last
+        return last
+
+    @staticmethod
+    def _validate(rows: list[Mapping[str, Any]]) -> list[CryptoPrice | None]:
+        """Validate a batch at once, falling back per row if any fail."""
+        try:
+            return list(_ADAPTER.validate_python(rows))
+        except ValidationError as e:
+            failed = {int(error["loc"][0]) for error in e.errors(include_url=False)}
+        logger.debug("Rejected %d of %d ticks", len(failed), len(rows))
+        good = iter(
+            _ADAPTER.validate_python(
+                [row for i, row in enumerate(rows) if i not in failed]
+            )
+        )
+        return [None if i in failed else next(good) for i in range(len(rows))]
@@ -0,0 +1,16 @@
+"""Validated shapes of incoming price data."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+
+class CryptoPrice(BaseModel):
+    """One price tick, as stored by the data pipeline."""
+
+    id: str = Field(..., pattern=r"^[A-Z]{2,10}_\d{8}$")
+    symbol: str = Field(..., min_length=2, max_length=10)
+    price: Decimal = Field(..., gt=0)
+    timestamp: datetime
+    source: str = Field(..., min_length=3)
@@ -0,0 +1,386 @@
+"""Columnar, append-only price history keyed by symbol.
+
+Each symbol's ticks live in two parallel columns: ``int64`` timestamps in
+nanoseconds since the Unix epoch (UTC) and ``float64`` prices. New ticks
+go into a growable in-memory buffer; once it holds ``segment_size`` rows,
+or on ``flush``, it is sealed into an immutable segment made of one
+``.npy`` file per column and reopened as a read-only memory map, so
+history larger than RAM is paged in by the OS only when it is read.
+
+Ticks must arrive in non-decreasing time order per symbol, which keeps
+every segment sorted and segments ordered among themselves. A time range
+is located by bisecting the segment bounds and then ``searchsorted``
+inside the first and last segments touched, so slicing costs O(log n)
+plus the size of the result, and a range inside one segment is returned
+as a zero-copy view.
+"""
+
+import bisect
+import os
+import re
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, NamedTuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+DEFAULT_ROOT = Path(__file__).resolve().parents[2] / "data" / "timeseries"
+DEFAULT_SEGMENT_SIZE = 65_536
+
+TimestampLike = Union[int, datetime, np.datetime64, str]
+
+_SYMBOL_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SeriesSlice(NamedTuple):
+    """Ticks of one symbol in a time range, oldest first."""
+
+    timestamps: NDArray[np.datetime64]
+    prices: NDArray[np.float64]
+
+
+def to_nanoseconds(value: TimestampLike) -> int:
+    """Convert a timestamp to nanoseconds since the epoch.
+
+    Integers are taken to be nanoseconds already; naive datetimes are UTC.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - _EPOCH
+        seconds = delta.days * 86_400 + delta.seconds
+        return seconds * 1_000_000_000 + delta.microseconds * 1_000
+    if isinstance(value, str):
+        value = np.datetime64(value)
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[ns]").astype(np.int64))
+    raise TypeError(f"Unsupported timestamp: {value!r}")
+
+
+def _timestamp_column(values: ArrayLike) -> NDArray[np.int64]:
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return array.astype("datetime64[ns]").view(np.int64)
+    if array.dtype == object:
+        return np.fromiter(
+            (to_nanoseconds(value) for value in array), np.int64, len(array)
+        )
+    return array.astype(np.int64, copy=False)
+
+
+class _Buffer:
+    """Growable pair of columns for the unsealed tail of a series."""
+
+    def __init__(self, capacity: int):
+        self.timestamps = np.empty(capacity, np.int64)
+        self.prices = np.empty(capacity, np.float64)
+        self.size = 0
+
+    def reserve(self, size: int) -> None:
+        if size <= len(self.timestamps):
+            return
+        capacity = max(size, 2 * len(self.timestamps))
+        for name in ("timestamps", "prices"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, column.dtype)
+            grown[: self.size] = column[: self.size]
+            setattr(self, name, grown)
+
+    def clear(self) -> None:
+        self.size = 0
+
+
+class _Segment(NamedTuple):
+    """A sealed, sorted run of ticks, usually memory-mapped."""
+
+    timestamps: NDArray[np.int64]
+    prices: NDArray[np.float64]
+
+    @property
+    def first(self) -> int:
+        return int(self.timestamps[0])
+
+    @property
+    def last(self) -> int:
+        return int(self.timestamps[-1])
+
+
+def _join(parts: list[_Segment]) -> SeriesSlice:
+    """Concatenate runs; a single run is returned as a view."""
+    if not parts:
+        return SeriesSlice(np.empty(0, "datetime64[ns]"), np.empty(0, np.float64))
+    if len(parts) == 1:
+        timestamps, prices = parts[0]
+    else:
+        timestamps = np.concatenate([part.timestamps for part in parts])
+        prices = np.concatenate([part.prices for part in parts])
+    return SeriesSlice(timestamps.view("datetime64[ns]"), prices)
+
+
+class _Series:
+    """Sealed segments plus the write buffer of one symbol."""
+
+    def __init__(self, directory: Path, segment_size: int):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.segments: list[_Segment] = []
+        self.firsts: list[int] = []
+        self.lasts: list[int] = []
+        self.next_id = 0
+        self.buffer = _Buffer(min(segment_size, 1024))
+
+    def load(self) -> None:
+        """Open every segment already on disk as a memory map."""
+        ids = sorted(
+            int(path.name.split(".")[0])
+            for path in self.directory.glob("*.timestamps.npy")
+        )
+        for segment_id in ids:
+            stem = self.directory / f"{segment_id:08d}"
+            timestamps = np.load(f"{stem}.timestamps.npy", mmap_mode="r")
+            prices = np.load(f"{stem}.prices.npy", mmap_mode="r")
+            if len(timestamps) != len(prices):
+                raise ValueError(f"Corrupt segment: {stem}")
+            self._add_segment(_Segment(timestamps, prices))
+            self.next_id = segment_id + 1
+
+    @property
+    def last_timestamp(self) -> int | None:
+        if self.buffer.size:
+            return int(self.buffer.timestamps[self.buffer.size - 1])
+        return self.lasts[-1] if self.lasts else None
+
+    def __len__(self) -> int:
+        return sum(len(segment.prices) for segment in self.segments) + self.buffer.size
+
+    def append(
+        self, timestamps: NDArray[np.int64], prices: NDArray[np.float64]
+    ) -> None:
+        if len(timestamps) != len(prices):
+            raise ValueError("timestamps and prices must have the same length")
+        if not len(timestamps):
+            return
+        last = self.last_timestamp
+        if (last is not None and timestamps[0] < last) or np.any(
+            timestamps[1:] < timestamps[:-1]
+        ):
+            raise ValueError("Ticks must be appended in time order")
+        buffer = self.buffer
+        offset = 0
+        while offset < len(timestamps):
+            count = min(len(timestamps) - offset, self.segment_size - buffer.size)
+            end = buffer.size + count
+            buffer.reserve(end)
+            buffer.timestamps[buffer.size : end] = timestamps[offset : offset + count]
+            buffer.prices[buffer.size : end] = prices[offset : offset + count]
+            buffer.size = end
+            offset += count
+            if buffer.size >= self.segment_size:
+                self.seal()
+
+    def seal(self) -> None:
+        """Write the buffer out as a new memory-mapped segment."""
+        buffer = self.buffer
+        if buffer.size:
+            self._write(buffer.timestamps[: buffer.size], buffer.prices[: buffer.size])
+            buffer.clear()
+
+    def _write(
+        self, timestamps: NDArray[np.int64], prices: NDArray[np.float64]
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self.directory / f"{self.next_id:08d}"
+        # Prices are written first: a segment only exists once its
+        # timestamps file does, so a crash never leaves half a segment
+        for name, column in (("prices", prices), ("timestamps", timestamps)):
+            tmp_path = Path(f"{stem}.{name}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, column)
+            os.replace(tmp_path, f"{stem}.{name}.npy")
+        self._add_segment(
+            _Segment(
+                np.load(f"{stem}.timestamps.npy", mmap_mode="r"),
+                np.load(f"{stem}.prices.npy", mmap_mode="r"),
+            )
+        )
+        self.next_id += 1
+
+    def _add_segment(self, segment: _Segment) -> None:
+        if not len(segment.timestamps):
+            return
+        self.segments.append(segment)
+        self.firsts.append(segment.first)
+        self.lasts.append(segment.last)
+
+    def _runs(self) -> list[_Segment]:
+        """Sealed segments, then the buffered tail, oldest first."""
+        size = self.buffer.size
+        if not size:
+            return self.segments
+        tail = _Segment(self.buffer.timestamps[:size], self.buffer.prices[:size])
+        return self.segments + [tail]
+
+    def _slice(self, run: _Segment, lo: int, hi: int) -> _Segment:
+        # The buffer is reused after sealing, so never hand out views of it
+        part = _Segment(run.timestamps[lo:hi], run.prices[lo:hi])
+        if run.timestamps.base is self.buffer.timestamps:
+            part = _Segment(part.timestamps.copy(), part.prices.copy())
+        return part
+
+    def range(self, start: int | None, end: int | None) -> SeriesSlice:
+        """Return ticks with ``start <= timestamp < end``."""
+        runs = self._runs()
+        # Only runs whose last tick is >= start and whose first tick is
+        # < end can hold matches; both bounds are sorted across runs
+        first = 0
+        if start is not None:
+            first = bisect.bisect_left(self.lasts, start)
+        stop = len(runs)
+        if end is not None:
+            stop = bisect.bisect_left(self.firsts, end)
+            if len(runs) > len(self.segments) and self.buffer.timestamps[0] < end:
+                stop = len(runs)
+        parts = []
+        for run in runs[first:stop]:
+            lo, hi = 0, len(run.timestamps)
+            if start is not None:
+                lo = int(np.searchsorted(run.timestamps, start, "left"))
+            if end is not None:
+                hi = int(np.searchsorted(run.timestamps, end, "left"))
+            if lo < hi:
+                parts.append(self._slice(run, lo, hi))
+        return _join(parts)
+
+    def tail(self, count: int) -> SeriesSlice:
+        """Return the last ``count`` ticks, reading only the runs needed."""
+        parts: list[_Segment] = []
+        for run in reversed(self._runs()):
+            if count <= 0:
+                break
+            size = len(run.timestamps)
+            take = min(count, size)
+            parts.append(self._slice(run, size - take, size))
+            count -= take
+        return _join(parts[::-1])
+
+
+class TimeSeriesStore:
+    """Append-only columnar store of price ticks per symbol.
+
+    Segments are kept under ``root/<SYMBOL>/``; ``root`` defaults to the
+    project's ``data/timeseries`` directory. Existing segments are opened
+    lazily the first time a symbol is used.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+    ):
+        if segment_size < 1:
+            raise ValueError("segment_size must be positive")
+        self.root = Path(root) if root is not None else DEFAULT_ROOT
+        self.segment_size = segment_size
+        self._series: dict[str, _Series] = {}
+
+    @property
+    def symbols(self) -> list[str]:
+        """Symbols with data in memory or on disk."""
+        names = set(self._series)
+        if self.root.is_dir():
+            names.update(path.name for path in self.root.iterdir() if path.is_dir())
+        return sorted(names)
+
+    def __len__(self) -> int:
+        return sum(self.count(symbol) for symbol in self.symbols)
+
+    def count(self, symbol: str) -> int:
+        """Number of ticks stored for a symbol."""
+        return len(self._get(symbol))
+
+    def append(self, symbol: str, timestamp: TimestampLike, price: Any) -> None:
+        """Append a single tick."""
+        self.append_arrays(
+            symbol,
+            np.array([to_nanoseconds(timestamp)], np.int64),
+            np.array([float(price)], np.float64),
+        )
+
+    def append_arrays(
+        self, symbol: str, timestamps: ArrayLike, prices: ArrayLike
+    ) -> None:
+        """Append a batch of ticks given as parallel arrays."""
+        self._get(symbol).append(
+            _timestamp_column(timestamps), np.asarray(prices, np.float64)
+        )
+
+    def extend(self, rows: Iterable[Any]) -> int:
+        """Append ``CryptoPrice``-like rows or mappings; return how many.
+
+        Rows only need ``symbol``, ``timestamp`` and ``price``; ``Decimal``
+        prices are converted to floats. Rows are grouped per symbol and
+        each group is appended in one batch.
+        """
+        grouped: dict[str, tuple[list[int], list[float]]] = {}
+        for row in rows:
+            if isinstance(row, dict):
+                symbol, timestamp, price = row["symbol"], row["timestamp"], row["price"]
+            else:
+                symbol, timestamp, price = row.symbol, row.timestamp, row.price
+            timestamps, prices = grouped.setdefault(symbol, ([], []))
+            timestamps.append(to_nanoseconds(timestamp))
+            prices.append(float(price))
+        for symbol, (timestamps, prices) in grouped.items():
+            self.append_arrays(
+                symbol, np.array(timestamps, np.int64), np.array(prices, np.float64)
+            )
+        return sum(len(timestamps) for timestamps, _ in grouped.values())
+
+    def range(
+        self,
+        symbol: str,
+        start: TimestampLike | None = None,
+        end: TimestampLike | None = None,
+    ) -> SeriesSlice:
+        """Return ticks with ``start <= timestamp < end``; bounds are optional."""
+        return self._get(symbol).range(
+            None if start is None else to_nanoseconds(start),
+            None if end is None else to_nanoseconds(end),
+        )
+
+    def latest(self, symbol: str, count: int) -> SeriesSlice:
+        """Return the last ``count`` ticks of a symbol."""
+        return self._get(symbol).tail(count)
+
+    def flush(self, symbol: str | None = None) -> None:
+        """Seal buffered ticks of one symbol, or all of them, to disk."""
+        names = [symbol] if symbol is not None else list(self._series)
+        for name in names:
+            self._get(name).seal()
+
+    def close(self) -> None:
+        """Flush everything and release the memory maps."""
+        self.flush()
+        self._series.clear()
+
+    def __enter__(self) -> "TimeSeriesStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _get(self, symbol: str) -> _Series:
+        series = self._series.get(symbol)
+        if series is None:
+            if not _SYMBOL_PATTERN.match(symbol):
+                raise ValueError(f"Invalid symbol: {symbol!r}")
+            series = self._series[symbol] = _Series(
+                self.root / symbol, self.segment_size
+            )
+            series.load()
+        return series
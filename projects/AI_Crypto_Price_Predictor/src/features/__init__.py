@@ -0,0 +1,27 @@
+"""Feature engineering for the price models."""
+
+from .indicators import (
+    FeatureConfig,
+    IncrementalFeatures,
+    bollinger,
+    compute_features,
+    ema,
+    macd,
+    returns,
+    rsi,
+    sma,
+    volatility,
+)
+
+__all__ = [
+    "FeatureConfig",
+    "IncrementalFeatures",
+    "bollinger",
+    "compute_features",
+    "ema",
+    "macd",
+    "returns",
+    "rsi",
+    "sma",
+    "volatility",
+]
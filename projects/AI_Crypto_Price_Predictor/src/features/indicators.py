@@ -0,0 +1,397 @@
+"""Technical indicators over whole price arrays, and tick by tick.
+
+The batch functions take a 1-D price array and return arrays of the same
+length, with ``NaN`` where a window is not yet full, following the
+pandas-ta conventions: EMAs are seeded with the simple mean of their
+first ``span`` values, RSI uses Wilder's smoothing, Bollinger bands use
+the population standard deviation and volatility is the sample standard
+deviation of log returns.
+
+Exponential averages are recurrences, which NumPy cannot express
+directly. ``_ewm`` evaluates them a block at a time in closed form,
+``y[k] = d**(k+1) * (y[-1] + a * cumsum(x / d**(j+1))[k])``, choosing
+blocks short enough that ``d**-block`` stays far from overflow.
+
+``IncrementalFeatures`` produces the same values as ``compute_features``
+one tick at a time in O(1), so live inference never recomputes a window.
+"""
+
+import math
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import ArrayLike, NDArray
+
+FloatArray = NDArray[np.float64]
+
+# Smallest d**block allowed inside one _ewm block
+_MIN_BLOCK_DECAY = 1e-12
+
+
+class MACD(NamedTuple):
+    """MACD line, its signal line and their difference."""
+
+    macd: FloatArray
+    signal: FloatArray
+    histogram: FloatArray
+
+
+class Bands(NamedTuple):
+    """Bollinger bands around a simple moving average."""
+
+    lower: FloatArray
+    middle: FloatArray
+    upper: FloatArray
+
+
+class FeatureConfig(NamedTuple):
+    """Indicator parameters shared by the batch and incremental paths."""
+
+    sma_window: int = 20
+    ema_spans: tuple[int, ...] = (12, 26)
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    bollinger_window: int = 20
+    bollinger_std: float = 2.0
+    volatility_window: int = 20
+
+    def feature_names(self) -> list[str]:
+        """Names of the features, in output order."""
+        return [
+            f"sma_{self.sma_window}",
+            *(f"ema_{span}" for span in self.ema_spans),
+            f"rsi_{self.rsi_period}",
+            "macd",
+            "macd_signal",
+            "macd_hist",
+            "bb_lower",
+            "bb_middle",
+            "bb_upper",
+            "return",
+            "log_return",
+            f"volatility_{self.volatility_window}",
+        ]
+
+
+def _prices(values: ArrayLike) -> FloatArray:
+    array = np.asarray(values, np.float64)
+    if array.ndim != 1:
+        raise ValueError("prices must be one-dimensional")
+    return array
+
+
+def _check_window(window: int, name: str = "window") -> None:
+    if window < 1:
+        raise ValueError(f"{name} must be positive")
+
+
+def _ewm(values: FloatArray, alpha: float, initial: float) -> FloatArray:
+    """Evaluate ``y[k] = y[k-1] + alpha * (x[k] - y[k-1])`` from ``initial``."""
+    decay = 1.0 - alpha
+    if decay == 0.0:
+        return values.copy()
+    block = max(1, int(math.log(_MIN_BLOCK_DECAY) / math.log(decay)))
+    powers = decay ** np.arange(1, min(block, len(values)) + 1)
+    out = np.empty_like(values)
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start : start + block]
+        weights = powers[: len(chunk)]
+        result = weights * (previous + alpha * np.cumsum(chunk / weights))
+        out[start : start + len(chunk)] = result
+        previous = result[-1]
+    return out
+
+
+def _seeded_ewm(values: FloatArray, span: int, alpha: float) -> FloatArray:
+    """EWM seeded with the mean of the first ``span`` values."""
+    out = np.full(len(values), np.nan)
+    if len(values) < span:
+        return out
+    seed = values[:span].mean()
+    out[span - 1] = seed
+    out[span:] = _ewm(values[span:], alpha, seed)
+    return out
+
+
+def sma(prices: ArrayLike, window: int) -> FloatArray:
+    """Simple moving average."""
+    _check_window(window)
+    values = _prices(prices)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1 :] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def ema(prices: ArrayLike, span: int) -> FloatArray:
+    """Exponential moving average with ``alpha = 2 / (span + 1)``."""
+    _check_window(span, "span")
+    return _seeded_ewm(_prices(prices), span, 2.0 / (span + 1))
+
+
+def _rsi_value(gain: FloatArray, loss: FloatArray) -> FloatArray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + gain / loss)
+    value = np.where(loss == 0, 100.0, value)
+    return np.where((loss == 0) & (gain == 0), 50.0, value)
+
+
+def rsi(prices: ArrayLike, period: int = 14) -> FloatArray:
+    """Relative strength index with Wilder's smoothing, from 0 to 100."""
+    _check_window(period, "period")
+    values = _prices(prices)
+    out = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return out
+    change = np.diff(values)
+    gain = _seeded_ewm(np.maximum(change, 0.0), period, 1.0 / period)
+    loss = _seeded_ewm(np.maximum(-change, 0.0), period, 1.0 / period)
+    out[period:] = _rsi_value(gain[period - 1 :], loss[period - 1 :])
+    return out
+
+
+def macd(
+    prices: ArrayLike, fast: int = 12, slow: int = 26, signal: int = 9
+) -> MACD:
+    """Moving average convergence/divergence."""
+    if not 0 < fast < slow:
+        raise ValueError("MACD needs 0 < fast < slow")
+    _check_window(signal, "signal")
+    values = _prices(prices)
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = np.full(len(values), np.nan)
+    signal_line[slow - 1 :] = ema(line[slow - 1 :], signal)
+    return MACD(line, signal_line, line - signal_line)
+
+
+def bollinger(prices: ArrayLike, window: int = 20, num_std: float = 2.0) -> Bands:
+    """Bollinger bands ``num_std`` population deviations from the SMA."""
+    _check_window(window)
+    values = _prices(prices)
+    middle = np.full(len(values), np.nan)
+    width = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window)
+        middle[window - 1 :] = windows.mean(axis=1)
+        width[window - 1 :] = num_std * windows.std(axis=1)
+    return Bands(middle - width, middle, middle + width)
+
+
+def returns(prices: ArrayLike, log: bool = False) -> FloatArray:
+    """One-step simple or log returns; the first value is ``NaN``."""
+    values = _prices(prices)
+    out = np.full(len(values), np.nan)
+    if log:
+        out[1:] = np.diff(np.log(values))
+    else:
+        out[1:] = values[1:] / values[:-1] - 1.0
+    return out
+
+
+def volatility(prices: ArrayLike, window: int = 20) -> FloatArray:
+    """Rolling sample standard deviation of log returns."""
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    values = _prices(prices)
+    out = np.full(len(values), np.nan)
+    if len(values) > window:
+        log_returns = np.diff(np.log(values))
+        out[window:] = sliding_window_view(log_returns, window).std(axis=1, ddof=1)
+    return out
+
+
+def compute_features(
+    prices: ArrayLike, config: FeatureConfig = FeatureConfig()
+) -> dict[str, FloatArray]:
+    """Every configured indicator over a whole price history."""
+    values = _prices(prices)
+    macd_result = macd(
+        values, config.macd_fast, config.macd_slow, config.macd_signal
+    )
+    bands = bollinger(values, config.bollinger_window, config.bollinger_std)
+    columns = [
+        sma(values, config.sma_window),
+        *(ema(values, span) for span in config.ema_spans),
+        rsi(values, config.rsi_period),
+        *macd_result,
+        *bands,
+        returns(values),
+        returns(values, log=True),
+        volatility(values, config.volatility_window),
+    ]
+    return dict(zip(config.feature_names(), columns))
+
+
+class _RollingWindow:
+    """Running mean and variance of the last ``size`` values in O(1).
+
+    Sums are kept relative to the first value seen to limit cancellation,
+    and recomputed from the ring buffer once per lap so rounding errors
+    cannot accumulate.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = np.zeros(size)
+        self.count = 0
+        self.position = 0
+        self.shift = 0.0
+        self.total = 0.0
+        self.squares = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.size
+
+    def push(self, value: float) -> None:
+        if not self.count:
+            self.shift = value
+        centered = value - self.shift
+        if self.full:
+            old = self.values[self.position] - self.shift
+            self.total -= old
+            self.squares -= old * old
+        self.values[self.position] = value
+        self.total += centered
+        self.squares += centered * centered
+        self.count += 1
+        self.position = (self.position + 1) % self.size
+        if self.position == 0:
+            centered_all = self.values - self.shift
+            self.total = float(centered_all.sum())
+            self.squares = float(centered_all @ centered_all)
+
+    def mean(self) -> float:
+        return self.shift + self.total / self.size
+
+    def std(self, ddof: int = 0) -> float:
+        mean = self.total / self.size
+        variance = (self.squares - self.size * mean * mean) / (self.size - ddof)
+        return math.sqrt(max(variance, 0.0))
+
+
+class _EWMState:
+    """EWM seeded with the mean of its first ``span`` inputs."""
+
+    def __init__(self, span: int, alpha: float):
+        self.span = span
+        self.alpha = alpha
+        self.count = 0
+        self.value = 0.0
+
+    def push(self, x: float) -> float:
+        self.count += 1
+        if self.count < self.span:
+            self.value += x
+            return math.nan
+        if self.count == self.span:
+            self.value = (self.value + x) / self.span
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class IncrementalFeatures:
+    """Streaming counterpart of ``compute_features``.
+
+    Each ``update`` takes one price and returns the latest value of every
+    feature, matching the last row ``compute_features`` would give for
+    the same history, in constant time.
+    """
+
+    def __init__(self, config: FeatureConfig = FeatureConfig()):
+        if config.volatility_window < 2:
+            raise ValueError("volatility_window must be at least 2")
+        if not 0 < config.macd_fast < config.macd_slow:
+            raise ValueError("MACD needs 0 < fast < slow")
+        for window in (
+            config.sma_window,
+            config.rsi_period,
+            config.macd_signal,
+            config.bollinger_window,
+            *config.ema_spans,
+        ):
+            _check_window(window)
+        self.config = config
+        self.names = config.feature_names()
+        self.count = 0
+        self._last_price = math.nan
+        self._sma = _RollingWindow(config.sma_window)
+        self._emas = [_EWMState(span, 2.0 / (span + 1)) for span in config.ema_spans]
+        self._gain = _EWMState(config.rsi_period, 1.0 / config.rsi_period)
+        self._loss = _EWMState(config.rsi_period, 1.0 / config.rsi_period)
+        self._fast = _EWMState(config.macd_fast, 2.0 / (config.macd_fast + 1))
+        self._slow = _EWMState(config.macd_slow, 2.0 / (config.macd_slow + 1))
+        self._signal = _EWMState(config.macd_signal, 2.0 / (config.macd_signal + 1))
+        self._bands = _RollingWindow(config.bollinger_window)
+        self._volatility = _RollingWindow(config.volatility_window)
+
+    @classmethod
+    def from_history(
+        cls, prices: Iterable[float], config: FeatureConfig = FeatureConfig()
+    ) -> "IncrementalFeatures":
+        """Create a state primed with past prices."""
+        features = cls(config)
+        for price in prices:
+            features.update(price)
+        return features
+
+    def update(self, price: float) -> dict[str, float]:
+        """Add one price and return the current features."""
+        config = self.config
+        price = float(price)
+        nan = math.nan
+        previous, self._last_price = self._last_price, price
+        self.count += 1
+
+        self._sma.push(price)
+        sma_value = self._sma.mean() if self._sma.full else nan
+        ema_values = [state.push(price) for state in self._emas]
+
+        rsi_value = simple = log_return = nan
+        if self.count > 1:
+            change = price - previous
+            gain = self._gain.push(max(change, 0.0))
+            loss = self._loss.push(max(-change, 0.0))
+            if loss:
+                rsi_value = 100.0 - 100.0 / (1.0 + gain / loss)
+            elif not math.isnan(gain):
+                rsi_value = 100.0 if gain else 50.0
+            simple = price / previous - 1.0
+            log_return = math.log(price / previous)
+            self._volatility.push(log_return)
+
+        line = self._fast.push(price) - self._slow.push(price)
+        signal = self._signal.push(line) if not math.isnan(line) else nan
+
+        self._bands.push(price)
+        lower = middle = upper = nan
+        if self._bands.full:
+            middle = self._bands.mean()
+            width = config.bollinger_std * self._bands.std()
+            lower, upper = middle - width, middle + width
+
+        volatility_value = nan
+        if self._volatility.full:
+            volatility_value = self._volatility.std(ddof=1)
+
+        values = [
+            sma_value,
+            *ema_values,
+            rsi_value,
+            line,
+            signal,
+            line - signal,
+            lower,
+            middle,
+            upper,
+            simple,
+            log_return,
+            volatility_value,
+        ]
+        return dict(zip(self.names, values))
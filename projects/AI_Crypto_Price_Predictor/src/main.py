@@ -0,0 +1,149 @@
+"""FastAPI application serving batched price predictions.
+
+``POST /predict`` takes a window of recent prices and a horizon. Requests
+are not run one by one: they join a ``DynamicBatcher``, which hands
+groups of them to the model in a process pool, so throughput under load
+scales with the batch size while the event loop only does I/O. Results
+are cached in a ``PredictionCache``, in process and optionally in Redis.
+``GET /metrics`` reports latency percentiles, batching and cache stats.
+"""
+
+import multiprocessing
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, NamedTuple
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from . import __version__
+from .api.batching import DynamicBatcher, LatencyTracker, PredictFn
+from .api.cache import PredictionCache
+from .models.predictor import predict_batch
+
+
+class ServingConfig(NamedTuple):
+    """Batching and worker settings of the prediction server.
+
+    ``workers`` is the size of the process pool; 0 runs the model in the
+    event loop's default thread pool instead, which suits tests and
+    models that release the GIL. ``cache_ttl`` and ``cache_prefix`` mirror
+    ``RedisConfig``; ``cache_size`` 0 disables the in-process tier.
+    """
+
+    max_batch_size: int = 32
+    max_wait_ms: float = 5.0
+    workers: int = 2
+    max_window: int = 4096
+    cache_size: int = 10_000
+    cache_ttl: int = 3600
+    cache_prefix: str = ""
+
+
+class PredictionRequest(BaseModel):
+    """Recent prices of a symbol, oldest first."""
+
+    symbol: str = Field(..., min_length=2, max_length=10)
+    horizon: int = Field(1, ge=1, le=1440)
+    prices: list[Annotated[float, Field(gt=0)]] = Field(..., min_length=2)
+
+
+class PredictionResponse(BaseModel):
+    """Predicted price ``horizon`` steps after the last given price."""
+
+    symbol: str
+    horizon: int
+    prediction: float
+
+
+def create_app(
+    config: ServingConfig | None = None,
+    predict: PredictFn = predict_batch,
+    redis: Any = None,
+) -> FastAPI:
+    """Create the prediction API.
+
+    ``predict`` must be a module-level function when ``workers`` is
+    positive, so it can be sent to the worker processes. ``redis`` is an
+    optional sync or asyncio client for the shared tier of the cache.
+    """
+    config = config or ServingConfig()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        executor = None
+        if config.workers:
+            executor = ProcessPoolExecutor(
+                config.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        batcher = DynamicBatcher(
+            predict,
+            max_batch_size=config.max_batch_size,
+            max_wait=config.max_wait_ms / 1000,
+            executor=executor,
+            concurrency=max(config.workers, 1),
+        )
+        app.state.batcher = batcher
+        app.state.latency = LatencyTracker()
+        app.state.cache = PredictionCache(
+            redis,
+            ttl=config.cache_ttl,
+            prefix=config.cache_prefix,
+            max_entries=config.cache_size,
+        )
+        await batcher.start()
+        # Start the workers now rather than on the first request
+        await batcher.submit(np.ones(2), 1)
+        batcher.batches = batcher.predictions = 0
+        try:
+            yield
+        finally:
+            await batcher.stop()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    app = FastAPI(
+        title="AI Crypto Price Predictor", version=__version__, lifespan=lifespan
+    )
+
+    @app.post("/predict", response_model=PredictionResponse)
+    async def predict_price(
+        payload: PredictionRequest, request: Request
+    ) -> PredictionResponse:
+        start = time.perf_counter()
+        window = np.asarray(payload.prices[-config.max_window :], np.float64)
+        batcher: DynamicBatcher = request.app.state.batcher
+        try:
+            prediction = await request.app.state.cache.get_or_compute(
+                payload.symbol,
+                payload.horizon,
+                window,
+                lambda: batcher.submit(window, payload.horizon),
+            )
+        except ValueError as e:
+            # The trend of these prices overflows over this horizon
+            raise HTTPException(422, str(e)) from e
+        request.app.state.latency.record(time.perf_counter() - start)
+        return PredictionResponse(
+            symbol=payload.symbol, horizon=payload.horizon, prediction=prediction
+        )
+
+    @app.get("/metrics")
+    async def metrics(request: Request) -> dict[str, Any]:
+        batcher: DynamicBatcher = request.app.state.batcher
+        return {
+            "latency": request.app.state.latency.summary(),
+            "batches": batcher.batches,
+            "mean_batch_size": batcher.mean_batch_size,
+            "max_batch_size": batcher.max_batch_size,
+            "cache": request.app.state.cache.stats,
+        }
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok", "version": __version__}
+
+    return app
@@ -0,0 +1,5 @@
+"""Price prediction models."""
+
+from .predictor import predict_batch
+
+__all__ = ["predict_batch"]
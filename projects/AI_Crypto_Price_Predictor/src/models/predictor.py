@@ -0,0 +1,48 @@
+"""Baseline price model evaluated on whole batches of requests.
+
+``predict_batch`` fits a least-squares line to the log prices of every
+window in a batch at once and extrapolates it ``horizon`` steps past the
+last price. It is a placeholder until trained models exist, but it has
+the signature the serving layer needs: a module-level function, so it
+pickles into worker processes, taking one padded 2-D array per batch.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def pad_windows(windows: list[NDArray[np.float64]]) -> NDArray[np.float64]:
+    """Stack windows of different lengths, left-padding with ``NaN``."""
+    width = max(len(window) for window in windows)
+    batch = np.full((len(windows), width), np.nan)
+    for row, window in zip(batch, windows):
+        row[width - len(window) :] = window
+    return batch
+
+
+def predict_batch(
+    windows: NDArray[np.float64], horizons: NDArray[np.int64]
+) -> NDArray[np.float64]:
+    """Predict the price ``horizons`` steps after each window.
+
+    ``windows`` has one row per request, oldest price first, left-padded
+    with ``NaN`` where a request sent fewer prices than the longest one.
+    A forecast too large for a float comes back as ``inf``; callers
+    reject it rather than serve it.
+    """
+    log_prices = np.log(windows)
+    valid = ~np.isnan(log_prices)
+    count = valid.sum(axis=1)
+    steps = np.where(valid, np.arange(windows.shape[1], dtype=np.float64), np.nan)
+    mean_step = np.nansum(steps, axis=1) / count
+    mean_price = np.nansum(log_prices, axis=1) / count
+    step_offsets = steps - mean_step[:, None]
+    variance = np.nansum(step_offsets**2, axis=1)
+    covariance = np.nansum(step_offsets * (log_prices - mean_price[:, None]), axis=1)
+    slope = np.divide(
+        covariance, variance, out=np.zeros_like(covariance), where=variance > 0
+    )
+    last_step = windows.shape[1] - 1
+    target = last_step + horizons - mean_step
+    with np.errstate(over="ignore"):
+        return np.asarray(np.exp(mean_price + slope * target), np.float64)
@@ -0,0 +1,73 @@
+"""Tests for dynamic batching and the baseline predictor."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.api import DynamicBatcher, LatencyTracker
+from src.models import predict_batch
+from src.models.predictor import pad_windows
+
+
+def test_predict_batch_handles_ragged_windows():
+    """Test trend extrapolation on padded windows of different lengths."""
+    rising = 100 * 1.01 ** np.arange(10)
+    windows = pad_windows([rising, np.full(4, 50.0), rising[-3:]])
+    predictions = predict_batch(windows, np.array([1, 5, 2]))
+    assert predictions[0] == pytest.approx(rising[-1] * 1.01)
+    assert predictions[1] == pytest.approx(50.0)
+    assert predictions[2] == pytest.approx(rising[-1] * 1.01**2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_batches():
+    """Test batching by size and by deadline."""
+    sizes = []
+
+    def predict(windows, horizons):
+        sizes.append(len(windows))
+        return windows[:, -1] + horizons
+
+    batcher = DynamicBatcher(predict, max_batch_size=8, max_wait=0.05)
+    await batcher.start()
+    results = await asyncio.gather(
+        *(batcher.submit(np.array([1.0, float(i)]), 1) for i in range(20))
+    )
+    assert results == [i + 1.0 for i in range(20)]
+    assert sizes == [8, 8, 4]
+    assert batcher.mean_batch_size == pytest.approx(20 / 3)
+
+    assert await batcher.submit(np.array([1.0, 2.0]), 3) == 5.0
+    assert sizes[-1] == 1
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """Test that a failing batch fails each request in it."""
+
+    def predict(windows, horizons):
+        raise RuntimeError("model unavailable")
+
+    batcher = DynamicBatcher(predict, max_wait=0.01)
+    await batcher.start()
+    results = await asyncio.gather(
+        *(batcher.submit(np.ones(2), 1) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await batcher.stop()
+    with pytest.raises(RuntimeError):
+        await DynamicBatcher(predict).submit(np.ones(2), 1)
+
+
+def test_latency_percentiles():
+    """Test the rolling latency summary."""
+    tracker = LatencyTracker(size=100)
+    assert tracker.summary()["count"] == 0
+    for ms in range(1, 201):
+        tracker.record(ms / 1000)
+    summary = tracker.summary()
+    assert summary["count"] == 200
+    assert summary["p50_ms"] == pytest.approx(150.5)
+    assert summary["max_ms"] == pytest.approx(200)
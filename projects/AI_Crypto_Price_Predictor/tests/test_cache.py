@@ -0,0 +1,140 @@
+"""Tests for the two-tier prediction cache."""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.api import PredictionCache
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DB_CONFIG = REPO_ROOT / "tests" / "utils" / "test_data" / "test_db_config.json"
+
+
+class FakeRedis:
+    """Dict-backed stand-in recording the commands it receives."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.calls = []
+        self.fail = fail
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", key, ex))
+        self.data[key] = value.encode()
+        return True
+
+
+class AsyncFakeRedis(FakeRedis):
+    """Awaitable variant, shaped like ``redis.asyncio``."""
+
+    async def get(self, key):
+        return super().get(key)
+
+    async def set(self, key, value, ex=None):
+        return super().set(key, value, ex)
+
+
+class SlowRedis(FakeRedis):
+    """Blocking client whose every command takes ``delay`` seconds."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return super().get(key)
+
+
+class Counter:
+    """Slow computation that counts its calls."""
+
+    def __init__(self, value=42.0):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_single_flight_and_lru():
+    """Test de-duplication of concurrent misses and LRU eviction."""
+    cache = PredictionCache(max_entries=2)
+    compute = Counter()
+    window = np.array([1.0, 2.0, 3.0])
+    results = await asyncio.gather(
+        *(cache.get_or_compute("BTC", 1, window, compute) for _ in range(50))
+    )
+    assert results == [42.0] * 50 and compute.calls == 1
+    assert cache.stats["coalesced"] == 49
+
+    assert await cache.get_or_compute("BTC", 1, window.copy(), compute) == 42.0
+    assert cache.stats["local_hits"] == 1
+    await cache.get_or_compute("BTC", 2, window, compute)
+    await cache.get_or_compute("ETH", 1, window, compute)
+    assert len(cache) == 2 and compute.calls == 3
+    await cache.get_or_compute("BTC", 1, window, compute)  # evicted
+    assert compute.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_uses_config_ttl_and_prefix():
+    """Test that Redis entries honor RedisConfig and feed other processes."""
+    config = json.loads(DB_CONFIG.read_text())["redis"]
+    redis = FakeRedis()
+    compute = Counter(7.5)
+    window = np.array([10.0, 11.0])
+    first = PredictionCache.from_config(config, redis)
+    assert await first.get_or_compute("BTC", 3, window, compute) == 7.5
+    _, key, ttl = redis.calls[-1]
+    assert key.startswith(config["prefix"] + "prediction:BTC:3:")
+    assert ttl == config["cache_ttl"]
+
+    other = PredictionCache.from_config(config, redis)
+    assert await other.get_or_compute("BTC", 3, window, compute) == 7.5
+    assert compute.calls == 1 and other.stats["redis_hits"] == 1
+    assert first.key("BTC", 3, window) != first.key("BTC", 3, window[::-1])
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_and_async_clients():
+    """Test a failing Redis falling back to computing, and asyncio clients."""
+    cache = PredictionCache(FakeRedis(fail=True))
+    assert await cache.get_or_compute("BTC", 1, np.ones(2), Counter()) == 42.0
+    assert cache.stats["redis_errors"] == 1
+
+    redis = AsyncFakeRedis()
+    cache = PredictionCache(redis, ttl=60, prefix="test:")
+    await cache.get_or_compute("BTC", 1, np.ones(2), Counter())
+    assert list(redis.data) == [cache.key("BTC", 1, np.ones(2))]
+    cache.clear()
+    assert await cache.get_or_compute("BTC", 1, np.ones(2), Counter(0.0)) == 42.0
+    with pytest.raises(ValueError):
+        PredictionCache(ttl=0)
+
+
+@pytest.mark.asyncio
+async def test_slow_sync_redis_does_not_block_the_loop():
+    """Test that other requests keep moving while a sync Redis call blocks."""
+    cache = PredictionCache(SlowRedis(0.3))
+    slow = asyncio.create_task(cache.get_or_compute("BTC", 1, np.ones(2), Counter()))
+    await asyncio.sleep(0.01)
+    started = time.monotonic()
+    local = PredictionCache()
+    assert await local.get_or_compute("ETH", 1, np.ones(2), Counter(1.0)) == 1.0
+    assert time.monotonic() - started < 0.2
+    assert not slow.done()
+    assert await slow == 42.0
@@ -0,0 +1,95 @@
+"""Tests for the technical-indicator features."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.features import (
+    FeatureConfig,
+    IncrementalFeatures,
+    bollinger,
+    compute_features,
+    ema,
+    macd,
+    rsi,
+    sma,
+    volatility,
+)
+
+
+@pytest.fixture
+def prices():
+    """A reproducible random walk around BTC prices."""
+    rng = np.random.default_rng(42)
+    return 40_000 * np.exp(np.cumsum(rng.normal(0, 0.002, 3_000)))
+
+
+def reference_ema(values, span, alpha=None):
+    """Plain loop implementation of a mean-seeded EMA."""
+    alpha = 2 / (span + 1) if alpha is None else alpha
+    out = np.full(len(values), np.nan)
+    value = values[:span].mean()
+    out[span - 1] = value
+    for i in range(span, len(values)):
+        value += alpha * (values[i] - value)
+        out[i] = value
+    return out
+
+
+def test_batch_indicators(prices):
+    """Test the vectorized indicators against straightforward definitions."""
+    assert np.allclose(ema(prices, 12), reference_ema(prices, 12), equal_nan=True)
+    long = ema(prices, 500)
+    assert np.allclose(long, reference_ema(prices, 500), equal_nan=True)
+    assert np.isnan(long[498]) and not np.isnan(long[499])
+
+    average = sma(prices, 20)
+    assert np.isnan(average[18]) and average[19] == pytest.approx(prices[:20].mean())
+    bands = bollinger(prices, 20, 2.0)
+    assert bands.upper[19] - bands.middle[19] == pytest.approx(2 * prices[:20].std())
+
+    strength = rsi(prices, 14)
+    assert np.isnan(strength[13])
+    assert np.all((strength[14:] >= 0) & (strength[14:] <= 100))
+    assert rsi(np.arange(1.0, 40.0), 14)[-1] == 100.0
+    assert rsi(np.full(40, 5.0), 14)[-1] == 50.0
+
+    result = macd(prices)
+    assert np.allclose(result.macd, ema(prices, 12) - ema(prices, 26), equal_nan=True)
+    assert np.isnan(result.signal[32]) and not np.isnan(result.signal[33])
+    assert volatility(prices, 20)[20] == pytest.approx(
+        np.diff(np.log(prices[:21])).std(ddof=1)
+    )
+    assert np.isnan(sma(prices[:5], 20)).all()
+
+
+def test_incremental_matches_batch(prices):
+    """Test that tick-by-tick updates reproduce the batch features."""
+    config = FeatureConfig(sma_window=10, ema_spans=(5, 50), volatility_window=30)
+    batch = compute_features(prices, config)
+    assert list(batch) == config.feature_names()
+
+    state = IncrementalFeatures.from_history(prices[:1000], config)
+    rows = [state.update(price) for price in prices[1000:]]
+    for name, column in batch.items():
+        streamed = np.array([row[name] for row in rows])
+        assert np.allclose(streamed, column[1000:], rtol=1e-9), name
+
+    fresh = IncrementalFeatures(config)
+    first = fresh.update(prices[0])
+    assert math.isnan(first["sma_10"]) and math.isnan(first["return"])
+
+
+def test_rejects_bad_parameters():
+    """Test parameter validation."""
+    with pytest.raises(ValueError):
+        sma([1.0, 2.0], 0)
+    with pytest.raises(ValueError):
+        macd([1.0, 2.0], fast=26, slow=12)
+    with pytest.raises(ValueError):
+        volatility([1.0, 2.0], 1)
+    with pytest.raises(ValueError):
+        ema(np.ones((2, 2)), 3)
+    with pytest.raises(ValueError):
+        IncrementalFeatures(FeatureConfig(rsi_period=0))
@@ -0,0 +1,158 @@
+"""Tests for the streaming ingestion pipeline."""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.data import FakeExchange, IngestionPipeline, ReplaySource, TimeSeriesStore
+
+
+class SlowSink:
+    """Sink that records batches and blocks for a while on each one."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.batches = []
+
+    def extend(self, rows):
+        time.sleep(self.delay)
+        self.batches.append(list(rows))
+        return len(self.batches[-1])
+
+
+@pytest.mark.asyncio
+async def test_fake_exchange_into_store(tmp_path):
+    """Test that every generated tick lands in the store in batches."""
+    store = TimeSeriesStore(tmp_path)
+    pipeline = IngestionPipeline(
+        FakeExchange(count=5_000, seed=1), store, batch_size=500
+    )
+    metrics = (await pipeline.run()).snapshot()
+    assert metrics["accepted"] == metrics["received"] == 5_000
+    assert store.count("BTC") == store.count("ETH") == 2_500
+    assert metrics["batches"] >= 10 and metrics["mean_batch_size"] <= 500
+    assert metrics["throughput"] > 0 and metrics["max_lag"] < 60
+
+
+@pytest.mark.asyncio
+async def test_replay_rejects_invalid_and_late_ticks(tmp_path):
+    """Test validation and out-of-order handling of replayed ticks."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {
+            "id": f"BTC_{i:08d}",
+            "symbol": "BTC",
+            "price": str(40_000 + i),
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "source": "replay",
+        }
+        for i in range(10)
+    ]
+    rows[3]["price"] = "-1"
+    rows[5]["id"] = "bad"
+    rows.append(dict(rows[2], id="BTC_00000099"))  # older than what was stored
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+
+    store = TimeSeriesStore(tmp_path / "store")
+    metrics = await IngestionPipeline(ReplaySource(path), store).run()
+    assert (metrics.accepted, metrics.rejected, metrics.late) == (8, 2, 1)
+    prices = store.range("BTC").prices.tolist()
+    assert prices == [40_000 + i for i in range(10) if i not in (3, 5)]
+
+
+@pytest.mark.asyncio
+async def test_paced_replay_rejects_bad_timestamps(tmp_path):
+    """Test that a bad timestamp is rejected rather than ending a paced replay."""
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "id": f"BTC_{i:08d}",
+            "symbol": "BTC",
+            "price": str(40_000 + i),
+            "timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+            "source": "replay",
+        }
+        for i in range(6)
+    ]
+    rows[0]["timestamp"] += "Z"
+    rows[2]["timestamp"] = "not a time"
+    rows[4]["timestamp"] += "+00:00"
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+
+    store = TimeSeriesStore(tmp_path / "store")
+    metrics = await IngestionPipeline(ReplaySource(path, speed=10), store).run()
+    assert (metrics.accepted, metrics.rejected) == (5, 1)
+    assert store.count("BTC") == 5
+
+
+@pytest.mark.asyncio
+async def test_backpressure_and_time_based_batches():
+    """Test the bounded queue and flushing on max_delay."""
+    sink = SlowSink(0.01)
+    pipeline = IngestionPipeline(
+        FakeExchange(count=300), sink, batch_size=50, queue_size=20
+    )
+    metrics = await pipeline.run()
+    assert metrics.queue_high_water <= 20
+    assert metrics.backpressure_seconds > 0
+    assert all(len(batch) <= 50 for batch in sink.batches)
+
+    sink = SlowSink(0)
+    pipeline = IngestionPipeline(
+        FakeExchange(count=20, rate=400), sink, batch_size=1_000, max_delay=0.01
+    )
+    metrics = await pipeline.run()
+    assert metrics.accepted == 20 and len(sink.batches) > 1
+    with pytest.raises(ValueError):
+        IngestionPipeline(FakeExchange(), sink, batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_sink_rejections_do_not_stop_the_run(tmp_path):
+    """Test that ticks the store refuses are counted, not fatal."""
+    rows = [
+        {
+            "id": f"BTC_{i:08d}",
+            "symbol": "BTC/USD" if i % 2 else "BTC",
+            "price": "100",
+            "timestamp": f"2024-01-01T00:00:{i:02d}+00:00",
+            "source": "replay",
+        }
+        for i in range(10)
+    ]
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+    store = TimeSeriesStore(tmp_path / "store")
+    metrics = await IngestionPipeline(ReplaySource(path), store).run()
+    assert (metrics.accepted, metrics.rejected) == (5, 5)
+    assert store.count("BTC") == 5
+
+
+@pytest.mark.asyncio
+async def test_restart_skips_ticks_older_than_the_store(tmp_path):
+    """Test that a new pipeline resumes after the newest stored tick."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {
+            "id": f"ETH_{i:08d}",
+            "symbol": "ETH",
+            "price": str(2_000 + i),
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "source": "replay",
+        }
+        for i in range(10)
+    ]
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in rows[:6]))
+    with TimeSeriesStore(tmp_path / "store") as store:
+        await IngestionPipeline(ReplaySource(path), store).run()
+
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+    store = TimeSeriesStore(tmp_path / "store")
+    metrics = await IngestionPipeline(ReplaySource(path), store).run()
+    assert (metrics.accepted, metrics.late, metrics.rejected) == (4, 6, 0)
+    assert store.range("ETH").prices.tolist() == [2_000 + i for i in range(10)]
@@ -0,0 +1,78 @@
+"""Tests for the prediction API."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import ServingConfig, create_app
+
+
+@pytest.fixture
+def client():
+    """Client of an app that runs the model in threads."""
+    app = create_app(ServingConfig(workers=0, max_batch_size=16, max_wait_ms=20))
+    with TestClient(app) as client:
+        yield client
+
+
+def test_predict_and_metrics(client):
+    """Test predictions, batching of concurrent calls and latency metrics."""
+
+    def post(i):
+        prices = [100.0 + i, 101.0 + i, 102.0 + i]
+        return client.post("/predict", json={"symbol": "BTC", "prices": prices})
+
+    with ThreadPoolExecutor(16) as pool:
+        responses = list(pool.map(post, range(32)))
+    assert all(response.status_code == 200 for response in responses)
+    body = responses[0].json()
+    assert body["symbol"] == "BTC" and body["horizon"] == 1
+    assert body["prediction"] == pytest.approx(103.0, rel=1e-3)
+
+    metrics = client.get("/metrics").json()
+    assert metrics["latency"]["count"] == 32
+    assert metrics["latency"]["p99_ms"] >= metrics["latency"]["p50_ms"] > 0
+    assert metrics["mean_batch_size"] > 1
+    assert metrics["cache"]["misses"] == 32
+
+
+def test_identical_requests_computed_once(client):
+    """Test that a burst of identical requests reaches the model once."""
+    payload = {"symbol": "ETH", "horizon": 2, "prices": [100.0, 101.0, 102.01]}
+    with ThreadPoolExecutor(16) as pool:
+        responses = list(
+            pool.map(lambda _: client.post("/predict", json=payload), range(32))
+        )
+    predictions = {response.json()["prediction"] for response in responses}
+    assert len(predictions) == 1
+    assert predictions.pop() == pytest.approx(102.01 * 1.01**2, rel=1e-4)
+    cache = client.get("/metrics").json()["cache"]
+    assert cache["misses"] == 1
+    assert cache["coalesced"] + cache["local_hits"] == 31
+
+
+def test_rejects_invalid_requests(client):
+    """Test request validation."""
+    for prices in ([1.0], [1.0, -2.0]):
+        response = client.post("/predict", json={"symbol": "BTC", "prices": prices})
+        assert response.status_code == 422
+    assert client.get("/health").json()["status"] == "ok"
+
+
+def test_non_finite_predictions_are_rejected_and_not_cached(client):
+    """Test that an overflowing forecast is an error, every time."""
+    payload = {"symbol": "BTC", "horizon": 1440, "prices": [1.0, 1000.0]}
+    for _ in range(2):
+        response = client.post("/predict", json=payload)
+        assert response.status_code == 422
+        assert "not finite" in response.json()["detail"]
+    cache = client.get("/metrics").json()["cache"]
+    assert cache["misses"] == 2 and cache["local_hits"] == 0
+
+
+def test_process_pool_workers():
+    """Test inference in worker processes."""
+    with TestClient(create_app(ServingConfig(workers=1))) as client:
+        response = client.post("/predict", json={"symbol": "ETH", "prices": [5.0, 5.0]})
+        assert response.json()["prediction"] == pytest.approx(5.0)
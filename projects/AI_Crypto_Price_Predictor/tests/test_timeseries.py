@@ -0,0 +1,92 @@
+"""Tests for the columnar time-series store."""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.data import TimeSeriesStore
+from src.data.timeseries import to_nanoseconds
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def ticks(count: int, symbol: str = "BTC", offset: int = 0) -> list[SimpleNamespace]:
+    """CryptoPrice-like rows one minute apart."""
+    return [
+        SimpleNamespace(
+            symbol=symbol,
+            price=Decimal("40000.5") + i,
+            timestamp=START + timedelta(minutes=offset + i),
+        )
+        for i in range(count)
+    ]
+
+
+def test_extend_and_range(tmp_path):
+    """Test range slicing across sealed segments and the write buffer."""
+    store = TimeSeriesStore(tmp_path, segment_size=100)
+    assert store.extend(ticks(250) + ticks(10, "ETH")) == 260
+    assert store.count("BTC") == 250
+    assert store.symbols == ["BTC", "ETH"]
+    assert len(list((tmp_path / "BTC").glob("*.npy"))) == 4
+
+    window = store.range(
+        "BTC", START + timedelta(minutes=95), START + timedelta(minutes=205)
+    )
+    assert len(window.prices) == 110
+    assert window.prices[0] == 40095.5 and window.prices[-1] == 40204.5
+    assert window.timestamps[0] == np.datetime64("2024-01-01T01:35", "ns")
+    assert np.all(np.diff(window.timestamps.astype(np.int64)) > 0)
+
+    inside = store.range("BTC", START, START + timedelta(minutes=50))
+    assert not inside.prices.flags.owndata  # a view of the mapped segment
+    assert len(store.range("BTC", START + timedelta(days=1)).prices) == 0
+    assert len(store.range("BTC", end=START).prices) == 0
+    assert list(store.latest("BTC", 3).prices) == [40247.5, 40248.5, 40249.5]
+
+
+def test_persistence_and_reload(tmp_path):
+    """Test that flushed segments are reopened as memory maps."""
+    with TimeSeriesStore(tmp_path, segment_size=64) as store:
+        store.extend(ticks(100))
+        store.append_arrays(
+            "BTC",
+            np.array(["2024-01-01T02:00", "2024-01-01T02:01"], "datetime64[ns]"),
+            [1.0, 2.0],
+        )
+    reopened = TimeSeriesStore(tmp_path, segment_size=64)
+    assert reopened.count("BTC") == 102
+    first_hour = reopened.range("BTC", end=START + timedelta(hours=1))
+    assert isinstance(first_hour.prices, np.memmap)
+    reopened.append("BTC", "2024-01-01T03:00", Decimal("3"))
+    assert reopened.range("BTC", "2024-01-01T02:00").prices.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_buffer_slices_are_copies(tmp_path):
+    """Test that results never change when the buffer is sealed and reused."""
+    store = TimeSeriesStore(tmp_path, segment_size=10)
+    store.extend(ticks(5))
+    before = store.range("BTC")
+    store.extend(ticks(20, offset=5))
+    assert before.prices.tolist() == [40000.5 + i for i in range(5)]
+
+
+def test_rejects_bad_input(tmp_path):
+    """Test ordering, symbol and shape validation."""
+    store = TimeSeriesStore(tmp_path)
+    store.extend(ticks(3))
+    with pytest.raises(ValueError):
+        store.append("BTC", START, 1)
+    with pytest.raises(ValueError):
+        store.append_arrays("ETH", [3, 2], [1.0, 1.0])
+    with pytest.raises(ValueError):
+        store.append_arrays("ETH", [1, 2], [1.0])
+    with pytest.raises(ValueError):
+        store.append("../BTC", START, 1)
+    with pytest.raises(ValueError):
+        TimeSeriesStore(tmp_path, segment_size=0)
+    naive = datetime(2024, 1, 1)
+    assert to_nanoseconds(naive) == to_nanoseconds(START) == 1_704_067_200 * 10**9
@@ -0,0 +1,43 @@
+"""Suite-wide hooks for parallel test runs."""
+
+import pytest
+
+from utils.test_config import REPORT_SETTINGS
+from utils.workers import DurationRecorder, load_durations
+
+
+def pytest_addoption(parser):
+    """Add ``--record-durations`` for serial runs."""
+    parser.addoption(
+        "--record-durations", action="store_true",
+        help="merge this run's test durations into durations.json"
+    )
+
+
+def pytest_configure(config):
+    """Record test durations on the controlling process.
+
+    Only xdist runs, or runs given ``--record-durations``, record them, so
+    an ordinary serial or single-test run leaves the scheduler's data
+    alone. New timings are merged into the file, never replace it.
+    """
+    if hasattr(config, "workerinput"):
+        return
+    parallel = config.getoption("dist", "no") != "no"
+    if parallel or config.getoption("record_durations"):
+        config.pluginmanager.register(
+            DurationRecorder(REPORT_SETTINGS["durations_json"]),
+            "duration-recorder"
+        )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Schedule ``--dist load`` runs longest-test-first from past durations."""
+    if config.getvalue("dist") != "load":
+        return None
+    from utils.duration_scheduler import SUPPORTED, DurationScheduling
+    if not SUPPORTED:
+        return None
+    durations = load_durations(REPORT_SETTINGS["durations_json"])
+    return DurationScheduling(config, log, durations)
@@ -0,0 +1,196 @@
+"""Minimal benchmark harness with baseline regression checks.
+
+Each benchmark calls a function repeatedly: the number of calls per
+round is calibrated so a round lasts at least ``min_time`` seconds, and
+the fastest of ``repeat`` rounds is reported, as ``timeit`` recommends.
+Throughput is expressed in units (rows, keys, tokens...) per second so
+results from different batch sizes stay comparable.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (Any, Callable, Dict, List, Mapping, NamedTuple, Optional,
+                    Sequence, Union)
+
+
+class BenchmarkResult(NamedTuple):
+    """Timing of one benchmark."""
+    name: str
+    ops_per_sec: float
+    best: float
+    mean: float
+    rounds: int
+    iterations: int
+    unit: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON form stored in reports and baselines."""
+        data = self._asdict()
+        del data["name"]
+        return data
+
+
+class Regression(NamedTuple):
+    """A benchmark that got slower than its baseline allows."""
+    name: str
+    current: float
+    baseline: float
+    max_regression: float
+
+    @property
+    def slowdown(self) -> float:
+        """Fraction of baseline throughput that was lost."""
+        return 1 - self.current / self.baseline
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.current:,.0f} ops/s vs baseline "
+            f"{self.baseline:,.0f} ops/s ({self.slowdown:.0%} slower, "
+            f"limit {self.max_regression:.0%})"
+        )
+
+
+def measure(
+        name: str,
+        func: Callable[[], Any],
+        units: int = 1,
+        unit: str = "ops",
+        repeat: int = 3,
+        min_time: float = 0.02
+) -> BenchmarkResult:
+    """Time ``func``; ``units`` is how much work one call does."""
+    if units < 1 or repeat < 1:
+        raise ValueError("units and repeat must be positive")
+    func()  # warm caches and lazy imports outside the timed rounds
+    iterations = 1
+    while True:
+        elapsed = _time_round(func, iterations)
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed] + [
+        _time_round(func, iterations) for _ in range(repeat - 1)
+    ]
+    best = min(timings) / iterations
+    mean = sum(timings) / len(timings) / iterations
+    return BenchmarkResult(
+        name=name,
+        ops_per_sec=units / best if best > 0 else float("inf"),
+        best=best,
+        mean=mean,
+        rounds=repeat,
+        iterations=iterations,
+        unit=unit,
+    )
+
+
+def _time_round(func: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return time.perf_counter() - start
+
+
+class ImportTime(NamedTuple):
+    """One line of ``python -X importtime`` output, in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def import_times(
+        modules: Sequence[str],
+        cwd: Optional[Union[str, Path]] = None,
+        env: Optional[Mapping[str, str]] = None
+) -> List[ImportTime]:
+    """Import ``modules`` in a fresh interpreter and return its import times.
+
+    Modules already imported by the interpreter at startup (``site`` and
+    its dependencies) are reported by Python too; ``depth`` is 0 for
+    top-level imports. ``env`` replaces the interpreter's environment.
+    """
+    statement = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append(ImportTime(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+        ))
+    return times
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, float]:
+    """Read ``{name: ops_per_sec}`` from a report or baseline file."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        name: float(entry["ops_per_sec"])
+        for name, entry in data.get("benchmarks", {}).items()
+    }
+
+
+def check_regression(
+        result: BenchmarkResult,
+        baseline: Dict[str, float],
+        max_regression: float
+) -> Optional[Regression]:
+    """Compare a result to its baseline; None if it is within limits."""
+    expected = baseline.get(result.name)
+    if not expected or result.ops_per_sec >= expected * (1 - max_regression):
+        return None
+    return Regression(result.name, result.ops_per_sec, expected, max_regression)
+
+
+def write_report(
+        path: Union[str, Path],
+        results: List[BenchmarkResult],
+        regressions: Optional[List[Regression]] = None,
+        baseline_path: Optional[Union[str, Path]] = None,
+        merge: bool = False
+) -> None:
+    """Write results as JSON.
+
+    With ``merge`` the results are added to the benchmarks already in
+    the file, which is how baselines are updated from partial runs.
+    """
+    path = Path(path)
+    existing: Dict[str, Any] = {}
+    if merge:
+        try:
+            with open(path) as f:
+                existing = json.load(f).get("benchmarks", {})
+        except (OSError, ValueError):
+            pass
+    existing.update((result.name, result.to_dict()) for result in results)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "baseline": str(baseline_path) if baseline_path else None,
+        "regressions": [str(regression) for regression in regressions or []],
+        "benchmarks": dict(sorted(existing.items())),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,96 @@
+"""Fixtures for the benchmark suite.
+
+Every benchmark is compared with the stored baseline as it runs and
+fails when its throughput drops by more than the allowed fraction. All
+results are written to ``REPORT_SETTINGS["benchmark_json"]`` at the end
+of the session; with ``BENCHMARK_SAVE_BASELINE=1`` they also replace
+the matching entries of the baseline. A benchmark without a baseline
+entry cannot be checked, so it raises a warning rather than passing
+silently, or fails with ``BENCHMARK_REQUIRE_BASELINE=1`` (as in CI).
+"""
+
+import os
+import warnings
+from typing import Any, Callable, Dict, Generator, List
+
+import pytest
+
+from utils.test_config import BENCHMARK_SETTINGS, REPORT_SETTINGS
+from utils.test_data.db_utils import MASTER_WORKER_ID, get_worker_id
+
+from .benchmark import (BenchmarkResult, Regression, check_regression,
+                        load_results, measure, write_report)
+
+
+class BenchmarkSession:
+    """Results, baseline and limits shared by the benchmarks of a run."""
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.baseline_path = os.environ.get(
+            "BENCHMARK_BASELINE", settings["baseline_json"]
+        )
+        self.max_regression = float(os.environ.get(
+            "BENCHMARK_MAX_REGRESSION", settings["max_regression"]
+        ))
+        self.thresholds: Dict[str, float] = dict(settings["thresholds"])
+        self.repeat = settings["repeat"]
+        self.min_time = settings["min_time"]
+        self.save_baseline = os.environ.get("BENCHMARK_SAVE_BASELINE") == "1"
+        self.require_baseline = (
+            os.environ.get("BENCHMARK_REQUIRE_BASELINE") == "1"
+        )
+        self.baseline = load_results(self.baseline_path)
+        self.results: List[BenchmarkResult] = []
+        self.regressions: List[Regression] = []
+
+    def run(
+            self,
+            name: str,
+            func: Callable[[], Any],
+            units: int = 1,
+            unit: str = "ops"
+    ) -> BenchmarkResult:
+        """Measure and record a benchmark, failing the test on a regression."""
+        result = measure(
+            name, func, units=units, unit=unit,
+            repeat=self.repeat, min_time=self.min_time
+        )
+        self.results.append(result)
+        regression = None
+        if not self.save_baseline:
+            if name not in self.baseline:
+                message = (
+                    f"{name}: no baseline in {self.baseline_path}, regression "
+                    f"not checked; record one with BENCHMARK_SAVE_BASELINE=1"
+                )
+                if self.require_baseline:
+                    pytest.fail(message)
+                warnings.warn(message)
+            limit = self.thresholds.get(name, self.max_regression)
+            regression = check_regression(result, self.baseline, limit)
+        if regression is not None:
+            self.regressions.append(regression)
+            pytest.fail(str(regression))
+        return result
+
+
+@pytest.fixture(scope="session")
+def benchmark_session() -> Generator:
+    """Collect benchmark results and write the report at session end."""
+    if get_worker_id() != MASTER_WORKER_ID:
+        pytest.skip("benchmarks are timed in serial runs only")
+    session = BenchmarkSession(BENCHMARK_SETTINGS)
+    yield session
+    if session.results:
+        write_report(
+            REPORT_SETTINGS["benchmark_json"], session.results,
+            session.regressions, session.baseline_path
+        )
+        if session.save_baseline:
+            write_report(session.baseline_path, session.results, merge=True)
+
+
+@pytest.fixture(scope="function")
+def benchmark(benchmark_session: BenchmarkSession) -> Callable[..., BenchmarkResult]:
+    """Return ``run(name, func, units=1, unit="ops")`` for one benchmark."""
+    return benchmark_session.run
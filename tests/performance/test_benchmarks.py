@@ -0,0 +1,135 @@
+"""Throughput benchmarks for the shared test utilities."""
+
+import pytest
+
+from utils.auth_tokens import TokenFactory
+from utils.data_generator import generate_test_rows
+from utils.test_data.db_utils import clear_db_config_cache, load_db_config
+from utils.test_data.test_schemas import validate_many
+from utils.test_helpers import JWT_ALGORITHM, JWT_SECRET, MockDB, MockRedis
+
+pytestmark = pytest.mark.performance
+
+ROWS = 2_000
+
+
+@pytest.fixture(scope="module")
+def price_rows():
+    """Return generated crypto price rows."""
+    return generate_test_rows("crypto_prices", ROWS)
+
+
+@pytest.fixture(scope="module")
+def price_db(price_rows):
+    """Return a MockDB holding the price rows with hash and sorted indexes."""
+    db = MockDB()
+    db.create_index("prices", "id")
+    db.create_index("prices", "price", ordered=True)
+    db.insert_many("prices", [dict(row) for row in price_rows])
+    return db
+
+
+def test_mockdb_insert_many(benchmark, price_rows):
+    """Benchmark batch inserts into an indexed collection."""
+    def insert():
+        db = MockDB()
+        db.create_index("prices", "id")
+        db.insert_many("prices", [dict(row) for row in price_rows])
+
+    benchmark("mockdb_insert_many", insert, units=ROWS, unit="rows")
+
+
+def test_mockdb_indexed_find(benchmark, price_db, price_rows):
+    """Benchmark equality lookups served by a hash index."""
+    ids = [row["id"] for row in price_rows[::20]]
+
+    def find():
+        for doc_id in ids:
+            price_db.find_one("prices", {"id": doc_id})
+
+    benchmark("mockdb_indexed_find", find, units=len(ids), unit="queries")
+
+
+def test_mockdb_range_query(benchmark, price_db):
+    """Benchmark range queries served by a sorted index."""
+    benchmark(
+        "mockdb_range_query",
+        lambda: price_db.find("prices", {"price": {"$gte": 100, "$lt": 200}}).to_list(),
+        unit="queries"
+    )
+
+
+def test_mockdb_collection_scan(benchmark, price_db):
+    """Benchmark an unindexed query scanning every document."""
+    benchmark(
+        "mockdb_collection_scan",
+        lambda: price_db.find("prices", {"source": "binance"}).to_list(),
+        units=ROWS, unit="rows"
+    )
+
+
+def test_mockredis_set_get(benchmark):
+    """Benchmark single-key writes and reads."""
+    redis = MockRedis()
+    keys = [f"key:{i}" for i in range(1_000)]
+
+    def set_get():
+        for key in keys:
+            redis.set(key, "value")
+        for key in keys:
+            redis.get(key)
+
+    benchmark("mockredis_set_get", set_get, units=2 * len(keys))
+
+
+def test_mockredis_pipeline(benchmark):
+    """Benchmark batched writes through a pipeline."""
+    redis = MockRedis()
+    keys = [f"key:{i}" for i in range(1_000)]
+
+    def pipeline():
+        with redis.pipeline() as pipe:
+            for key in keys:
+                pipe.set(key, "value")
+            pipe.execute()
+
+    benchmark("mockredis_pipeline", pipeline, units=len(keys))
+
+
+@pytest.mark.parametrize("data_type", ["crypto_prices", "users"])
+def test_schema_validation(benchmark, data_type):
+    """Benchmark batch schema validation."""
+    rows = generate_test_rows(data_type, ROWS)
+    benchmark(
+        f"validate_{data_type}",
+        lambda: validate_many(data_type, rows),
+        units=ROWS, unit="rows"
+    )
+
+
+def test_config_loading(benchmark):
+    """Benchmark cached and uncached configuration loads."""
+    benchmark("load_db_config_cached", load_db_config, unit="loads")
+
+    def uncached():
+        clear_db_config_cache()
+        load_db_config()
+
+    benchmark("load_db_config_uncached", uncached, unit="loads")
+
+
+def test_token_minting(benchmark):
+    """Benchmark minting and verifying test tokens."""
+    factory = TokenFactory(JWT_SECRET, JWT_ALGORITHM)
+    user_ids = [f"user_{i}" for i in range(500)]
+    benchmark(
+        "token_mint_batch",
+        lambda: factory.mint_batch(user_ids),
+        units=len(user_ids), unit="tokens"
+    )
+    tokens = factory.mint_batch(user_ids)
+    benchmark(
+        "token_verify_cached",
+        lambda: [factory.verify(token) for token in tokens],
+        units=len(tokens), unit="tokens"
+    )
@@ -0,0 +1,73 @@
+"""Cold-start import budget for the modules every collection loads."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from utils.test_config import BENCHMARK_SETTINGS
+from utils.test_data.db_utils import MASTER_WORKER_ID, get_worker_id
+
+from .benchmark import import_times
+
+pytestmark = pytest.mark.performance
+
+TESTS_ROOT = Path(__file__).resolve().parent.parent
+
+# Imported by the conftests, i.e. by every pytest run
+STARTUP_MODULES = ["utils", "utils.test_config", "utils.workers", "utils.conftest"]
+
+# Already imported by the time pytest loads a conftest, so not counted
+PRELOADED_MODULES = ["pytest"]
+
+# Must only be imported once a test needs them
+DEFERRED_MODULES = ["fastapi", "jwt", "pydantic"]
+
+
+def _startup_cost():
+    """Return the startup import time in ms and the modules it imported."""
+    cost, imported, pending = 0, [], []
+    # Measure a serial start even on an xdist worker, whose conftest
+    # would rewrite the per-worker URLs
+    env = {k: v for k, v in os.environ.items() if k != "PYTEST_XDIST_WORKER"}
+    # Python prints each module after the imports it triggered
+    modules = PRELOADED_MODULES + STARTUP_MODULES
+    for entry in import_times(modules, cwd=TESTS_ROOT, env=env):
+        pending.append(entry)
+        if entry.depth:
+            continue
+        if any(
+                module == entry.module or module.startswith(entry.module + ".")
+                for module in STARTUP_MODULES
+        ):
+            cost += entry.cumulative_us
+            imported.extend(pending)
+        pending = []
+    return cost / 1000, imported
+
+
+def test_startup_defers_heavy_imports():
+    """Test that importing the package does not load heavy dependencies."""
+    _, times = _startup_cost()
+    imported = {entry.module.split(".")[0] for entry in times}
+    assert imported.isdisjoint(DEFERRED_MODULES)
+
+
+def test_startup_import_budget():
+    """Test that cold-start import time stays under the budget."""
+    if get_worker_id() != MASTER_WORKER_ID:
+        pytest.skip("import times are measured in serial runs only")
+    budget = float(os.environ.get(
+        "BENCHMARK_IMPORT_BUDGET_MS", BENCHMARK_SETTINGS["import_budget_ms"]
+    ))
+    runs = [_startup_cost() for _ in range(3)]
+    cost, times = min(runs, key=lambda run: run[0])
+    if cost > budget:
+        slowest = sorted(times, key=lambda entry: entry.self_us, reverse=True)[:10]
+        details = "\n".join(
+            f"  {entry.self_us / 1000:8.2f} ms  {entry.module}" for entry in slowest
+        )
+        pytest.fail(
+            f"cold-start imports took {cost:.1f} ms (budget {budget:.0f} ms); "
+            f"slowest modules by self time:\n{details}"
+        )
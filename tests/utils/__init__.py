@@ -1,36 +1,68 @@
-"""Test utilities package."""
+"""Test utilities package.
 
-from .test_config import get_test_settings
-from .test_helpers import (
-    MockDB,
-    MockRedis,
-    create_test_user,
-    generate_random_string,
-    generate_test_token,
-    load_test_data,
-    login_test_user,
-)
-from .test_data.db_utils import (
-    DBConfig,
-    RedisConfig,
-    RetryConfig,
-    TestConfig,
-    TestDBConfig,
-    TimeoutConfig,
-    get_db_url,
-    get_redis_url,
-    get_retry_config,
-    get_test_config,
-    get_timeout_config,
-    load_db_config,
-)
-from .test_data.test_schemas import (
-    Campaign,
-    CryptoPrice,
-    Document,
-    User,
-    validate_test_data,
-)
+Public names are imported on first access through ``__getattr__``, so
+importing the package (as every conftest does) does not pull in jwt,
+pydantic or the mocks until a test actually uses them.
+"""
+
+import importlib
+from typing import Any, Dict, List
+
+# Public name -> submodule that defines it
+_LAZY_IMPORTS: Dict[str, str] = {
+    "AsyncMockDB": ".async_mocks",
+    "AsyncMockRedis": ".async_mocks",
+    "TokenFactory": ".auth_tokens",
+    "SyntheticDataGenerator": ".data_generator",
+    "generate_test_rows": ".data_generator",
+    "compile_query": ".query_engine",
+    "PoolRegistry": ".db_pool",
+    "get_pool_registry": ".db_pool",
+    "get_test_settings": ".test_config",
+    **dict.fromkeys([
+        "MockDB",
+        "MockRedis",
+        "create_test_user",
+        "generate_random_string",
+        "generate_test_token",
+        "generate_test_tokens",
+        "load_test_data",
+        "login_test_user",
+        "verify_test_token",
+    ], ".test_helpers"),
+    **dict.fromkeys([
+        "DBConfig",
+        "RedisConfig",
+        "RetryConfig",
+        "TestConfig",
+        "TestDBConfig",
+        "TimeoutConfig",
+        "clear_db_config_cache",
+        "get_db_url",
+        "get_redis_url",
+        "get_retry_config",
+        "get_test_config",
+        "get_timeout_config",
+        "get_worker_db_config",
+        "get_worker_id",
+        "load_db_config",
+        "override_db_config",
+    ], ".test_data.db_utils"),
+    **dict.fromkeys([
+        "SampleStore",
+        "get_sample_store",
+        "write_ndjson_samples",
+    ], ".test_data.sample_store"),
+    **dict.fromkeys([
+        "Campaign",
+        "CryptoPrice",
+        "Document",
+        "User",
+        "validate_many",
+        "validate_stream",
+        "validate_test_data",
+    ], ".test_data.test_schemas"),
+}
 
 __version__ = "0.1.0"
 __author__ = "Your Name"
@@ -43,11 +75,17 @@
     # Test helpers
     "MockDB",
     "MockRedis",
+    "AsyncMockDB",
+    "AsyncMockRedis",
+    "TokenFactory",
     "create_test_user",
     "generate_random_string",
     "generate_test_token",
+    "generate_test_tokens",
     "load_test_data",
     "login_test_user",
+    "verify_test_token",
+    "compile_query",
 
     # Database utilities
     "DBConfig",
@@ -56,17 +94,46 @@
     "TestConfig",
     "TestDBConfig",
     "TimeoutConfig",
+    "clear_db_config_cache",
     "get_db_url",
     "get_redis_url",
     "get_retry_config",
     "get_test_config",
     "get_timeout_config",
+    "get_worker_db_config",
+    "get_worker_id",
     "load_db_config",
+    "override_db_config",
+    "PoolRegistry",
+    "get_pool_registry",
+
+    # Sample data
+    "SampleStore",
+    "SyntheticDataGenerator",
+    "generate_test_rows",
+    "get_sample_store",
+    "write_ndjson_samples",
 
     # Test schemas
     "Campaign",
     "CryptoPrice",
     "Document",
     "User",
+    "validate_many",
+    "validate_stream",
     "validate_test_data",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,220 @@
+"""Awaitable wrappers around ``MockDB`` and ``MockRedis``.
+
+Each operation is one simulated round trip: the caller takes a
+connection from an optional pool of ``max_connections``, sleeps for
+``latency`` plus up to ``jitter`` seconds, then the synchronous mock
+runs the command. The command itself never awaits, so it is atomic
+with respect to other tasks, just as a single server command is, while
+tasks interleave freely between round trips.
+
+``stats`` counts operations and records the peak number of connections
+in use and the total time spent waiting for one, which is what
+pool-sizing and concurrency-limit tests assert on.
+"""
+
+import asyncio
+import random
+import time
+from typing import (Any, AsyncIterator, Callable, Dict, List, Optional, Sequence,
+                    Tuple, Union)
+
+from .test_helpers import Cursor, MockDB, MockPipeline, MockRedis
+
+
+class _AsyncClient:
+    """Shared latency, jitter and connection pool simulation.
+
+    Methods named in ``async_methods`` are exposed as coroutines; any
+    other attribute is read from the wrapped mock unchanged, so
+    ``snapshot``, ``restore`` and the inspection helpers stay synchronous.
+    """
+
+    async_methods: Tuple[str, ...] = ()
+
+    def __init__(
+            self,
+            backend: Any,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            max_connections: Optional[int] = None,
+            seed: Optional[int] = None
+    ):
+        if latency < 0 or jitter < 0:
+            raise ValueError("latency and jitter must be non-negative")
+        if max_connections is not None and max_connections < 1:
+            raise ValueError("max_connections must be positive")
+        self.backend = backend
+        self.latency = latency
+        self.jitter = jitter
+        self.max_connections = max_connections
+        self.stats: Dict[str, Any] = {
+            "operations": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "pool_wait": 0.0,
+        }
+        self._rng = random.Random(seed)
+        self._pool = asyncio.Semaphore(max_connections) if max_connections else None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self.backend, name)
+        if name not in self.async_methods:
+            return attr
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(attr, *args, **kwargs)
+        call.__name__ = name
+        return call
+
+    def delay(self) -> float:
+        """Draw the duration of the next round trip."""
+        if not self.jitter:
+            return self.latency
+        return self.latency + self._rng.uniform(0, self.jitter)
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._pool is None:
+            return await self._round_trip(func, args, kwargs)
+        start = time.perf_counter()
+        async with self._pool:
+            self.stats["pool_wait"] += time.perf_counter() - start
+            return await self._round_trip(func, args, kwargs)
+
+    async def _round_trip(
+            self,
+            func: Callable[..., Any],
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+    ) -> Any:
+        stats = self.stats
+        stats["in_flight"] += 1
+        if stats["in_flight"] > stats["max_in_flight"]:
+            stats["max_in_flight"] = stats["in_flight"]
+        try:
+            # Always yield, so zero latency still lets other tasks run
+            await asyncio.sleep(self.delay())
+            return func(*args, **kwargs)
+        finally:
+            stats["in_flight"] -= 1
+            stats["operations"] += 1
+
+
+class AsyncCursor:
+    """Awaitable view of a ``Cursor``, shaped like Motor's.
+
+    ``sort``, ``skip`` and ``limit`` chain synchronously; the results
+    are fetched in a single round trip by ``to_list`` or on the first
+    step of ``async for``.
+    """
+
+    def __init__(self, client: "AsyncMockDB", cursor: Cursor):
+        self._client = client
+        self._cursor = cursor
+
+    def sort(
+            self,
+            key_or_list: Union[str, Sequence[Tuple[str, int]]],
+            direction: int = 1
+    ) -> "AsyncCursor":
+        """Sort by one key, or by a list of ``(key, direction)`` pairs."""
+        self._cursor.sort(key_or_list, direction)
+        return self
+
+    def skip(self, count: int) -> "AsyncCursor":
+        """Skip the first ``count`` results."""
+        self._cursor.skip(count)
+        return self
+
+    def limit(self, count: int) -> "AsyncCursor":
+        """Return at most ``count`` results; zero means no limit."""
+        self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fetch the results, at most ``length`` of them if given."""
+        if length is not None:
+            self._cursor.limit(length)
+        return await self._client._run(self._cursor.to_list)
+
+    def explain(self) -> Dict[str, Any]:
+        """Describe the query plan."""
+        return self._cursor.explain()
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Dict[str, Any]]:
+        for document in await self.to_list():
+            yield document
+
+
+class AsyncMockDB(_AsyncClient):
+    """Awaitable ``MockDB`` with simulated latency and connection pool."""
+
+    async_methods = (
+        "insert", "insert_many", "find_one",
+        "update_one", "update_many", "delete_one", "delete_many",
+        "bulk_write", "create_index", "drop_index", "compact",
+    )
+
+    def __init__(self, db: Optional[MockDB] = None, **kwargs: Any):
+        super().__init__(MockDB() if db is None else db, **kwargs)
+
+    def find(
+            self,
+            collection: str,
+            query: Optional[Dict[str, Any]] = None,
+            projection: Optional[Dict[str, Any]] = None
+    ) -> AsyncCursor:
+        """Return a cursor; no round trip happens until it is read."""
+        return AsyncCursor(self, self.backend.find(collection, query, projection))
+
+
+class AsyncPipeline:
+    """Queue commands synchronously and send them in one round trip."""
+
+    def __init__(self, client: "AsyncMockRedis", pipeline: MockPipeline):
+        self._client = client
+        self._pipeline = pipeline
+
+    def __getattr__(self, name: str) -> Callable[..., "AsyncPipeline"]:
+        if name not in MockRedis.pipeline_commands:
+            raise AttributeError(name)
+        queue = getattr(self._pipeline, name)
+
+        def queue_command(*args: Any, **kwargs: Any) -> "AsyncPipeline":
+            queue(*args, **kwargs)
+            return self
+        return queue_command
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run every queued command and return their results."""
+        return await self._client._run(self._pipeline.execute, raise_on_error)
+
+    def reset(self) -> None:
+        """Discard queued commands."""
+        self._pipeline.reset()
+
+    def __len__(self) -> int:
+        return len(self._pipeline)
+
+    async def __aenter__(self) -> "AsyncPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.reset()
+
+
+class AsyncMockRedis(_AsyncClient):
+    """Awaitable ``MockRedis`` with simulated latency and connection pool."""
+
+    async_methods = MockRedis.pipeline_commands + ("keys", "purge_expired")
+
+    def __init__(self, redis: Optional[MockRedis] = None, **kwargs: Any):
+        super().__init__(MockRedis() if redis is None else redis, **kwargs)
+
+    def pipeline(self, transaction: bool = True) -> AsyncPipeline:
+        """Create a pipeline whose ``execute`` is a single round trip."""
+        return AsyncPipeline(self, MockPipeline(self.backend, transaction))
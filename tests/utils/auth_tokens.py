@@ -0,0 +1,139 @@
+"""Cached JWT minting and verification for tests.
+
+HMAC tokens are encoded directly: the header segment and keyed HMAC are
+prepared once, so minting a token costs one ``json.dumps``, one base64
+encode and one HMAC update. The output is byte-for-byte what
+``jwt.encode`` produces for the same claims. PyJWT itself is only
+imported when a token has to be decoded or uses a non-HMAC algorithm.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Claims = Dict[str, Any]
+
+_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+class TokenFactory:
+    """Mint and verify test JWTs with per-identity and per-token caches.
+
+    ``token`` reuses the token issued for a ``(user_id, role,
+    exp_minutes)`` combination until less than half of its lifetime is
+    left. ``verify`` remembers decoded claims per token string and only
+    re-checks expiry on a cache hit.
+    """
+
+    cache_size = 4096
+
+    def __init__(
+            self,
+            secret: str,
+            algorithm: str = "HS256",
+            clock: Callable[[], float] = time.time
+    ):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.clock = clock
+        self._tokens: Dict[Tuple[str, str, int], Tuple[str, int]] = {}
+        self._claims: Dict[str, Claims] = {}
+        self._hmac = None
+        self._header = b""
+        digest = _DIGESTS.get(algorithm)
+        if digest is not None:
+            self._hmac = hmac.new(secret.encode("utf-8"), digestmod=digest)
+            header = {"alg": algorithm, "typ": "JWT"}
+            self._header = _b64url(
+                json.dumps(header, separators=(",", ":")).encode("utf-8")
+            )
+
+    def token(
+            self,
+            user_id: str = "test_user",
+            role: str = "user",
+            exp_minutes: int = 30
+    ) -> str:
+        """Return a cached token for an identity, minting one if needed."""
+        key = (user_id, role, exp_minutes)
+        now = int(self.clock())
+        cached = self._tokens.get(key)
+        if cached is not None and cached[1] - now >= exp_minutes * 30:
+            return cached[0]
+        if len(self._tokens) >= self.cache_size:
+            self._tokens.clear()
+        token = self.mint(user_id, role, exp_minutes, now=now)
+        self._tokens[key] = (token, now + exp_minutes * 60)
+        return token
+
+    def mint(
+            self,
+            user_id: str,
+            role: str = "user",
+            exp_minutes: int = 30,
+            now: Optional[int] = None
+    ) -> str:
+        """Mint a new token without consulting the identity cache."""
+        if now is None:
+            now = int(self.clock())
+        claims = {"sub": user_id, "role": role, "exp": now + exp_minutes * 60}
+        token = self.encode(claims)
+        self._remember(token, claims)
+        return token
+
+    def mint_batch(
+            self,
+            user_ids: Iterable[str],
+            role: str = "user",
+            exp_minutes: int = 30
+    ) -> List[str]:
+        """Mint one token per user id, sharing a single clock read."""
+        now = int(self.clock())
+        return [self.mint(user_id, role, exp_minutes, now=now) for user_id in user_ids]
+
+    def encode(self, claims: Claims) -> str:
+        """Encode claims as a signed JWT."""
+        if self._hmac is None:
+            import jwt
+            return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+        payload = _b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header + b"." + payload
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
+
+    def verify(self, token: str) -> Claims:
+        """Return the claims of a valid token.
+
+        Raises ``jwt.InvalidTokenError`` (``jwt.ExpiredSignatureError``
+        once it has expired) like ``jwt.decode``.
+        """
+        import jwt
+        claims = self._claims.get(token)
+        if claims is None:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+            self._remember(token, claims)
+        elif "exp" in claims and claims["exp"] <= self.clock():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return dict(claims)
+
+    def clear(self) -> None:
+        """Drop every cached token and decoded claim set."""
+        self._tokens.clear()
+        self._claims.clear()
+
+    def _remember(self, token: str, claims: Claims) -> None:
+        if len(self._claims) >= self.cache_size:
+            self._claims.clear()
+        self._claims[token] = claims
@@ -0,0 +1,307 @@
+"""Seeded synthetic data for the test schemas.
+
+Rows are built a chunk at a time: each random field is drawn as a whole
+column with one ``random.choices`` call (numbers as steps of a
+``range``) and the columns are then zipped into row dicts. ``random``
+has no vectorized path, so this saves call overhead per value rather
+than making the draws themselves faster; numpy is not used so that a
+seed gives the same rows everywhere.
+
+Every value satisfies the constraints of the matching model in
+``test_data/test_schemas.py``, and values are plain JSON types
+formatted like ``test_samples.json``.
+"""
+
+import csv
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .test_config import TEST_DATA_SETTINGS
+from .test_data.test_schemas import (SCHEMAS, CampaignStatus, DocumentStatus,
+                                     UserRole)
+from .test_helpers import MockDB, MockRedis
+
+Row = Dict[str, Any]
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ISO_UTC_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Base prices the generated quotes fluctuate around
+SYMBOL_PRICES = {
+    "BTC": 65000.0,
+    "ETH": 3500.0,
+    "SOL": 150.0,
+    "BNB": 580.0,
+    "XRP": 0.6,
+    "ADA": 0.45,
+    "DOGE": 0.15,
+    "AVAX": 35.0,
+    "DOT": 7.0,
+    "LINK": 15.0,
+}
+SOURCES = ("binance", "coinbase", "kraken", "test_exchange")
+WORDS = (
+    "sample", "document", "content", "testing", "invoice", "report",
+    "summary", "market", "price", "analysis", "customer", "quarterly",
+    "draft", "review", "scanned", "page", "total", "account", "data",
+    "campaign",
+)
+DOCUMENT_STATUSES = tuple(status.value for status in DocumentStatus)
+CAMPAIGN_STATUSES = tuple(status.value for status in CampaignStatus)
+USER_ROLES = tuple(role.value for role in UserRole)
+
+
+class SyntheticDataGenerator:
+    """Generate schema-valid rows for ``crypto_prices``, ``documents``,
+    ``campaigns`` and ``users``.
+
+    Output is reproducible: the same seed, data type and count always
+    give the same rows, whatever else the generator was used for.
+    ``Document``, ``Campaign`` and ``User`` ids only have three digits,
+    so they repeat every 1000 rows.
+    """
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            start: datetime = DEFAULT_START
+    ):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.seed = TEST_DATA_SETTINGS["seed"] if seed is None else seed
+        self.chunk_size = chunk_size
+        self.start = start
+        self._builders: Dict[str, Callable[[random.Random, int, int], List[Row]]] = {
+            "crypto_prices": self._crypto_prices,
+            "documents": self._documents,
+            "campaigns": self._campaigns,
+            "users": self._users,
+        }
+
+    def chunks(self, data_type: str, count: int) -> Iterator[List[Row]]:
+        """Yield ``count`` rows in lists of at most ``chunk_size``."""
+        builder = self._builders.get(data_type)
+        if builder is None:
+            raise ValueError(f"Unknown data type: {data_type}")
+        rng = random.Random(f"{self.seed}:{data_type}")
+        for offset in range(0, count, self.chunk_size):
+            yield builder(rng, offset, min(self.chunk_size, count - offset))
+
+    def rows(self, data_type: str, count: int) -> Iterator[Row]:
+        """Yield ``count`` rows one at a time."""
+        for chunk in self.chunks(data_type, count):
+            yield from chunk
+
+    def generate(self, data_type: str, count: int) -> List[Row]:
+        """Return ``count`` rows as a list."""
+        return list(self.rows(data_type, count))
+
+    def to_ndjson(
+            self,
+            data_type: str,
+            count: int,
+            path: Union[str, Path]
+    ) -> int:
+        """Write rows as newline-delimited JSON and return the row count."""
+        written = 0
+        with open(path, "w") as f:
+            for chunk in self.chunks(data_type, count):
+                f.write("\n".join(map(json.dumps, chunk)))
+                f.write("\n")
+                written += len(chunk)
+        return written
+
+    def to_csv(self, data_type: str, count: int, path: Union[str, Path]) -> int:
+        """Write rows as CSV with a header row and return the row count."""
+        written = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(SCHEMAS[data_type].model_fields))
+            writer.writeheader()
+            for chunk in self.chunks(data_type, count):
+                writer.writerows(chunk)
+                written += len(chunk)
+        return written
+
+    def to_parquet(
+            self,
+            data_type: str,
+            count: int,
+            path: Union[str, Path]
+    ) -> int:
+        """Write rows to a Parquet file and return the row count.
+
+        Requires ``pyarrow``; each chunk becomes one row group.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing Parquet requires pyarrow") from e
+
+        written = 0
+        writer = None
+        try:
+            for chunk in self.chunks(data_type, count):
+                table = pa.Table.from_pylist(chunk)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(path), table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+    def to_mock_db(
+            self,
+            db: MockDB,
+            data_type: str,
+            count: int,
+            collection: Optional[str] = None
+    ) -> int:
+        """Insert rows into a ``MockDB`` collection, one batch per chunk."""
+        written = 0
+        for chunk in self.chunks(data_type, count):
+            db.insert_many(collection or data_type, chunk)
+            written += len(chunk)
+        return written
+
+    def _timestamps(self, offset: int, n: int, step: timedelta) -> List[str]:
+        fmt = TEST_DATA_SETTINGS["datetime_format"]
+        base = self.start + step * offset
+        if fmt == ISO_UTC_FORMAT:
+            # isoformat() is several times faster than strftime()
+            base = base.astimezone(timezone.utc).replace(tzinfo=None)
+            return [
+                (base + step * i).isoformat(timespec="seconds") + "Z"
+                for i in range(n)
+            ]
+        return [(base + step * i).strftime(fmt) for i in range(n)]
+
+    def _crypto_prices(self, rng: random.Random, offset: int, n: int) -> List[Row]:
+        symbols = rng.choices(list(SYMBOL_PRICES), k=n)
+        # Quotes stay within +/-5% of the base price, so they are always > 0
+        steps = rng.choices(range(100_001), k=n)
+        prices = [
+            round(SYMBOL_PRICES[symbol] * (0.95 + step / 1_000_000), 6)
+            for symbol, step in zip(symbols, steps)
+        ]
+        timestamps = self._timestamps(offset, n, timedelta(minutes=1))
+        sources = rng.choices(SOURCES, k=n)
+        return [
+            {
+                "id": f"{symbol}_{(offset + i) % 10 ** 8:08d}",
+                "symbol": symbol,
+                "price": price,
+                "timestamp": timestamp,
+                "source": source,
+            }
+            for i, (symbol, price, timestamp, source) in enumerate(
+                zip(symbols, prices, timestamps, sources))
+        ]
+
+    def _documents(self, rng: random.Random, offset: int, n: int) -> List[Row]:
+        words = rng.choices(WORDS, k=n * 8)
+        statuses = rng.choices(DOCUMENT_STATUSES, k=n)
+        timestamps = self._timestamps(offset, n, timedelta(hours=1))
+        return [
+            {
+                "id": f"DOC{(offset + i) % 1000:03d}",
+                "title": f"Test Document {offset + i + 1}"[:100],
+                "content": " ".join(words[i * 8:i * 8 + 8]).capitalize(),
+                "created_at": timestamp,
+                "status": status,
+            }
+            for i, (timestamp, status) in enumerate(zip(timestamps, statuses))
+        ]
+
+    def _campaigns(self, rng: random.Random, offset: int, n: int) -> List[Row]:
+        fmt = TEST_DATA_SETTINGS["date_format"]
+        durations = rng.choices(range(7, 91), k=n)
+        cents = rng.choices(range(100_000, 10_000_001), k=n)
+        budgets = [amount / 100 for amount in cents]
+        statuses = rng.choices(CAMPAIGN_STATUSES, k=n)
+        # Dates repeat across rows, so each one is formatted only once
+        dates: Dict[int, str] = {}
+
+        def date(day: int) -> str:
+            text = dates.get(day)
+            if text is None:
+                text = dates[day] = (self.start + timedelta(days=day)).strftime(fmt)
+            return text
+
+        rows = []
+        for i, (days, budget, status) in enumerate(zip(durations, budgets, statuses)):
+            start = (offset + i) % 3650
+            rows.append({
+                "id": f"CAM{(offset + i) % 1000:03d}",
+                "name": f"Test Campaign {offset + i + 1}"[:50],
+                "start_date": date(start),
+                "end_date": date(start + days),
+                "budget": budget,
+                "status": status,
+            })
+        return rows
+
+    def _users(self, rng: random.Random, offset: int, n: int) -> List[Row]:
+        roles = rng.choices(USER_ROLES, k=n)
+        updated = rng.choices((True, False), k=n)
+        timestamps = self._timestamps(offset, n, timedelta(minutes=10))
+        return [
+            {
+                "id": f"USR{(offset + i) % 1000:03d}",
+                "email": f"user{offset + i + 1}@example.com",
+                "name": f"Test User {offset + i + 1}"[:50],
+                "role": role,
+                "created_at": timestamp,
+                "updated_at": timestamp if is_updated else None,
+            }
+            for i, (role, is_updated, timestamp) in enumerate(
+                zip(roles, updated, timestamps))
+        ]
+
+
+def generate_test_rows(
+        data_type: str,
+        count: int,
+        seed: Optional[int] = None
+) -> List[Row]:
+    """Generate ``count`` schema-valid rows with the default settings."""
+    return SyntheticDataGenerator(seed=seed).generate(data_type, count)
+
+
+def seed_mock_db(db: MockDB, count: Optional[int] = None) -> MockDB:
+    """Fill a ``MockDB`` with ``count`` rows of every data type.
+
+    Each collection is named after its data type and gets a hash index
+    on ``id``. ``count`` defaults to ``TEST_DATA_SETTINGS["max_samples"]``.
+    """
+    count = TEST_DATA_SETTINGS["max_samples"] if count is None else count
+    generator = SyntheticDataGenerator()
+    for data_type in SCHEMAS:
+        db.create_index(data_type, "id")
+        generator.to_mock_db(db, data_type, count)
+    return db
+
+
+def seed_mock_redis(redis: MockRedis, count: Optional[int] = None) -> MockRedis:
+    """Fill a ``MockRedis`` with generated users and prices.
+
+    Users are stored as ``user:<id>`` hashes and prices in one
+    ``prices:<symbol>`` sorted set per symbol, scored by price.
+    """
+    count = TEST_DATA_SETTINGS["max_samples"] if count is None else count
+    generator = SyntheticDataGenerator()
+    with redis.pipeline() as pipe:
+        for user in generator.rows("users", count):
+            mapping = {k: v for k, v in user.items() if v is not None}
+            pipe.hset(f"user:{user['id']}", mapping=mapping)
+        for price in generator.rows("crypto_prices", count):
+            pipe.zadd(f"prices:{price['symbol']}", {price["id"]: price["price"]})
+        pipe.execute()
+    return redis
@@ -0,0 +1,246 @@
+"""Shared SQLAlchemy engines for the test databases.
+
+``PoolRegistry`` creates one engine per logical database in
+``TEST_DB_SETTINGS`` the first time it is asked for, sized by that
+database's ``pool_size``, ``max_overflow`` and ``timeout``, and hands the
+same engine to every later caller. URLs come from
+``get_worker_db_settings``, so each xdist worker gets its own databases.
+
+Every engine uses ``MeteredQueuePool``, which times each checkout and
+tracks how many connections are in use, so tests can assert on checkout
+wait and pool saturation. When PostgreSQL is not available the registry
+falls back to one SQLite file per database, still behind a sized
+``QueuePool``, so pool limits behave the same.
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from .test_config import get_worker_db_settings
+
+# auto: use the configured server if its driver imports and it accepts
+# connections, otherwise SQLite
+BACKENDS = ("auto", "postgresql", "sqlite")
+BACKEND_ENV_VAR = "TEST_DB_BACKEND"
+
+
+class PoolMetrics:
+    """Checkout timing and occupancy counters for one pool."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, checked_out: int, timed_out: bool = False) -> None:
+        """Record one checkout attempt."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        with self._lock:
+            self.checkouts = self.timeouts = self.peak_checked_out = 0
+            self.wait_total = self.wait_max = 0.0
+
+
+class MeteredQueuePool(QueuePool):
+    """``QueuePool`` that records checkout waits into ``metrics``."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics(self.size() + max(self._max_overflow, 0))
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record(
+                time.perf_counter() - start, self.checkedout(), timed_out=True
+            )
+            raise
+        self.metrics.record(time.perf_counter() - start, self.checkedout())
+        return connection
+
+    def recreate(self) -> "MeteredQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def server_available(url: str, timeout: float = 0.2) -> bool:
+    """Check whether anything accepts TCP connections at a URL's host."""
+    parsed = make_url(url)
+    if not parsed.host:
+        return False
+    try:
+        with socket.create_connection((parsed.host, parsed.port or 5432), timeout):
+            return True
+    except OSError:
+        return False
+
+
+class PoolRegistry:
+    """Lazily created, shared engines keyed by logical database name.
+
+    ``backend`` is ``"auto"``, ``"postgresql"`` or ``"sqlite"`` and
+    defaults to ``$TEST_DB_BACKEND`` or ``"auto"``. SQLite files go in
+    ``sqlite_dir``, a temporary directory by default.
+    """
+
+    def __init__(
+            self,
+            settings: Optional[Dict[str, Dict[str, Any]]] = None,
+            backend: Optional[str] = None,
+            sqlite_dir: Optional[Union[str, Path]] = None
+    ):
+        backend = backend or os.environ.get(BACKEND_ENV_VAR, "auto")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown database backend: {backend}")
+        self.settings = settings if settings is not None else get_worker_db_settings()
+        self.backend = backend
+        self._sqlite_dir = Path(sqlite_dir) if sqlite_dir else None
+        self._owns_sqlite_dir = False
+        self._engines: Dict[str, Engine] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        """Logical database names this registry can serve."""
+        return list(self.settings)
+
+    def engine(self, name: str) -> Engine:
+        """Return the engine for a database, creating it on first use."""
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(name)
+            if engine is None:
+                engine = self._engines[name] = self._create_engine(name)
+        return engine
+
+    @contextmanager
+    def connect(self, name: str) -> Iterator[Connection]:
+        """Check out a connection from a database's pool."""
+        with self.engine(name).connect() as connection:
+            yield connection
+
+    def metrics(self, name: str) -> Dict[str, Any]:
+        """Return checkout and saturation statistics for a database."""
+        pool = self.engine(name).pool
+        metrics: PoolMetrics = pool.metrics
+        checked_out = pool.checkedout()
+        attempts = metrics.checkouts + metrics.timeouts
+        return {
+            "backend": self.engine(name).dialect.name,
+            "pool_size": pool.size(),
+            "capacity": metrics.capacity,
+            "checked_out": checked_out,
+            "peak_checked_out": metrics.peak_checked_out,
+            "saturation": checked_out / metrics.capacity,
+            "peak_saturation": metrics.peak_checked_out / metrics.capacity,
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_total": metrics.wait_total,
+            "wait_max": metrics.wait_max,
+            "wait_mean": metrics.wait_total / attempts if attempts else 0.0,
+        }
+
+    def all_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return ``metrics`` for every engine created so far."""
+        return {name: self.metrics(name) for name in list(self._engines)}
+
+    def dispose(self, name: Optional[str] = None) -> None:
+        """Close pooled connections and forget one engine, or all of them.
+
+        Disposing all engines also deletes a temporary SQLite directory.
+        """
+        with self._lock:
+            names = [name] if name is not None else list(self._engines)
+            for key in names:
+                engine = self._engines.pop(key, None)
+                if engine is not None:
+                    engine.dispose()
+            if name is None and self._owns_sqlite_dir:
+                shutil.rmtree(self._sqlite_dir, ignore_errors=True)
+                self._sqlite_dir = None
+                self._owns_sqlite_dir = False
+
+    def _create_engine(self, name: str) -> Engine:
+        if name not in self.settings:
+            raise KeyError(f"Unknown test database: {name}")
+        settings = self.settings[name]
+        url = settings["url"]
+        pool_options = {
+            "poolclass": MeteredQueuePool,
+            "pool_size": settings["pool_size"],
+            "max_overflow": settings["max_overflow"],
+            "pool_timeout": settings["timeout"],
+        }
+        if self.backend != "sqlite":
+            try:
+                engine = create_engine(url, **pool_options)
+            except ImportError:
+                if self.backend == "postgresql":
+                    raise
+            else:
+                if self.backend == "postgresql" or server_available(url):
+                    return engine
+                engine.dispose()
+        return create_engine(
+            self._sqlite_url(url),
+            connect_args={"check_same_thread": False},
+            **pool_options,
+        )
+
+    def _sqlite_url(self, url: str) -> str:
+        """Map a server URL to a SQLite file named after its database."""
+        if self._sqlite_dir is None:
+            self._sqlite_dir = Path(tempfile.mkdtemp(prefix="test_db_"))
+            self._owns_sqlite_dir = True
+        database = make_url(url).database or "test_db"
+        return f"sqlite:///{self._sqlite_dir / database}.sqlite3"
+
+
+_registry: Optional[PoolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_pool_registry() -> PoolRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PoolRegistry()
+    return _registry
+
+
+def dispose_pools() -> None:
+    """Dispose every engine of the process-wide registry."""
+    if _registry is not None:
+        _registry.dispose()
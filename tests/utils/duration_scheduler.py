@@ -0,0 +1,48 @@
+"""Duration-aware test scheduling for pytest-xdist.
+
+Imported only when xdist is running, since it subclasses xdist's own
+load scheduler. It hooks into ``LoadScheduling._send_tests``, which is
+private to xdist; ``SUPPORTED`` is false on a version without it, and
+the suite then falls back to plain ``--dist load``.
+"""
+
+from typing import Any, Dict, Optional
+
+from xdist.scheduler import LoadScheduling
+
+SUPPORTED = callable(getattr(LoadScheduling, "_send_tests", None))
+
+
+class DurationScheduling(LoadScheduling):
+    """``--dist load`` that hands out the slowest tests first.
+
+    Pending tests are ordered by their recorded duration, longest first
+    (longest-processing-time scheduling), before the first batch is
+    sent. Long tests then start early instead of leaving one worker busy
+    at the end of the run. Tests without history count as
+    ``default_duration`` and keep their collection order among equals,
+    so fixture reuse within a module is mostly preserved.
+    """
+
+    def __init__(
+            self,
+            config: Any,
+            log: Optional[Any] = None,
+            durations: Optional[Dict[str, float]] = None,
+            default_duration: float = 0.0
+    ):
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.default_duration = default_duration
+        self._ordered = False
+
+    def _send_tests(self, node: Any, num: int) -> None:
+        if not self._ordered and self.collection is not None:
+            self._ordered = True
+            collection = self.collection
+            self.pending.sort(
+                key=lambda i: -self.durations.get(
+                    collection[i], self.default_duration
+                )
+            )
+        super()._send_tests(node, num)
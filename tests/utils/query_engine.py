@@ -0,0 +1,308 @@
+"""Mongo-style query compilation for the mock database."""
+
+import copy
+import operator
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Marker for a path that does not resolve inside a document
+MISSING = object()
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+_COMPARISONS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+_CACHE_SIZE = 1024
+_compiled: Dict[Any, Predicate] = {}
+
+
+def freeze(value: Any) -> Any:
+    """Return a hashable representation of a document or query value.
+
+    Containers are tagged with their type, since values of different
+    container types never compare equal (``[1, 2] != (1, 2)``) and must
+    not share a key.
+    """
+    if isinstance(value, dict):
+        return ("dict", frozenset((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(freeze(v) for v in value))
+    if isinstance(value, tuple):
+        return ("tuple", tuple(freeze(v) for v in value))
+    if isinstance(value, set):
+        return ("set", frozenset(freeze(v) for v in value))
+    return value
+
+
+def is_operator_dict(condition: Any) -> bool:
+    """Check whether a field condition is an operator document."""
+    return (
+        isinstance(condition, dict)
+        and bool(condition)
+        and all(isinstance(k, str) and k.startswith("$") for k in condition)
+    )
+
+
+def equality_value(condition: Any) -> Tuple[bool, Any]:
+    """Return ``(True, value)`` if a condition is a plain equality match."""
+    if not is_operator_dict(condition):
+        return True, condition
+    if set(condition) == {"$eq"}:
+        return True, condition["$eq"]
+    return False, None
+
+
+def get_path(document: Dict[str, Any], path: str) -> Any:
+    """Resolve a dotted path, returning ``MISSING`` if any step is absent."""
+    if "." not in path:
+        return document.get(path, MISSING)
+    value: Any = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            index = int(part)
+            value = value[index] if index < len(value) else MISSING
+        else:
+            return MISSING
+        if value is MISSING:
+            return MISSING
+    return value
+
+
+def set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    """Set a dotted path, creating intermediate documents as needed."""
+    parts = path.split(".")
+    target = document
+    for part in parts[:-1]:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            child = target[part] = {}
+        target = child
+    target[parts[-1]] = value
+
+
+def paths_overlap(first: str, second: str) -> bool:
+    """Check whether writing one path can change the value at the other."""
+    return (
+        first == second
+        or first.startswith(second + ".")
+        or second.startswith(first + ".")
+    )
+
+
+def compile_query(query: Dict[str, Any]) -> Predicate:
+    """Compile a query document into a reusable predicate.
+
+    Supports plain equality, ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``,
+    ``$lte``, ``$in``, ``$nin`` and ``$exists`` on (dotted) field paths,
+    combined with top-level ``$and``, ``$or`` and ``$nor``. Compiled
+    predicates are cached by query shape and value, and built from a copy
+    of the query so later changes to its operands cannot leak into them.
+    """
+    try:
+        key = freeze(query)
+        hash(key)
+    except TypeError:
+        return _compile(query)
+    predicate = _compiled.get(key)
+    if predicate is None:
+        if len(_compiled) >= _CACHE_SIZE:
+            _compiled.clear()
+        predicate = _compiled[key] = _compile(copy.deepcopy(query))
+    return predicate
+
+
+def _compile(query: Dict[str, Any]) -> Predicate:
+    """Build the predicate for a query document without caching."""
+    clauses: List[Predicate] = []
+    for key, condition in query.items():
+        if key in ("$and", "$or", "$nor"):
+            clauses.append(_compile_logical(key, condition))
+        elif key.startswith("$"):
+            raise ValueError(f"Unknown query operator: {key}")
+        else:
+            clauses.append(_compile_field(key, condition))
+
+    if not clauses:
+        return lambda doc: True
+    if len(clauses) == 1:
+        return clauses[0]
+    return lambda doc: all(clause(doc) for clause in clauses)
+
+
+def _compile_logical(op: str, conditions: Any) -> Predicate:
+    """Compile ``$and``/``$or``/``$nor`` over a list of sub-queries."""
+    if not isinstance(conditions, list) or not conditions:
+        raise ValueError(f"{op} needs a non-empty list of queries")
+    parts = [_compile(condition) for condition in conditions]
+    if op == "$and":
+        return lambda doc: all(part(doc) for part in parts)
+    if op == "$or":
+        return lambda doc: any(part(doc) for part in parts)
+    return lambda doc: not any(part(doc) for part in parts)
+
+
+def _compile_field(path: str, condition: Any) -> Predicate:
+    """Compile the condition on a single field path."""
+    if "." in path:
+        def getter(doc: Dict[str, Any]) -> Any:
+            return get_path(doc, path)
+    else:
+        def getter(doc: Dict[str, Any]) -> Any:
+            return doc.get(path, MISSING)
+
+    if not is_operator_dict(condition):
+        test = _compile_operator("$eq", condition)
+        return lambda doc: test(getter(doc))
+
+    tests = [_compile_operator(op, arg) for op, arg in condition.items()]
+    if len(tests) == 1:
+        test = tests[0]
+        return lambda doc: test(getter(doc))
+    return lambda doc: all(t(getter(doc)) for t in tests)
+
+
+def _compile_operator(op: str, arg: Any) -> Callable[[Any], bool]:
+    """Compile one operator into a test on a resolved field value."""
+    if op == "$eq":
+        return lambda value: (None if value is MISSING else value) == arg
+    if op == "$ne":
+        return lambda value: (None if value is MISSING else value) != arg
+    if op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+
+        def test(value: Any) -> bool:
+            if value is MISSING or value is None:
+                return False
+            try:
+                return bool(compare(value, arg))
+            except TypeError:
+                return False
+        return test
+    if op in ("$in", "$nin"):
+        contains = _membership(arg)
+        if op == "$in":
+            return contains
+        return lambda value: not contains(value)
+    if op == "$exists":
+        return lambda value: (value is not MISSING) == bool(arg)
+    raise ValueError(f"Unknown query operator: {op}")
+
+
+def _membership(values: Any) -> Callable[[Any], bool]:
+    """Build a membership test, hashing the candidates when possible."""
+    if not isinstance(values, (list, tuple, set, frozenset)):
+        raise ValueError("$in and $nin need a list of values")
+    candidates = list(values)
+    lookup: Optional[set] = None
+    try:
+        lookup = set(candidates)
+    except TypeError:
+        pass
+
+    def contains(value: Any) -> bool:
+        if value is MISSING:
+            value = None
+        if lookup is not None:
+            try:
+                return value in lookup
+            except TypeError:
+                pass
+        return any(value == candidate for candidate in candidates)
+    return contains
+
+
+def sort_value(value: Any) -> Tuple[int, Any]:
+    """Map any value to a key that orders across types like Mongo does."""
+    if value is MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float, Decimal)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, dict):
+        return (3, repr(value))
+    if isinstance(value, (list, tuple)):
+        return (4, repr(value))
+    if isinstance(value, datetime):
+        return (5 if value.tzinfo else 6, value)
+    return (9, repr(value))
+
+
+class _SortKey:
+    """Comparable wrapper for sorts that mix ascending and descending keys."""
+
+    __slots__ = ("values", "directions")
+
+    def __init__(self, values: Tuple[Any, ...], directions: Tuple[int, ...]):
+        self.values = values
+        self.directions = directions
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        for mine, theirs, direction in zip(
+                self.values, other.values, self.directions):
+            if mine == theirs:
+                continue
+            return mine < theirs if direction > 0 else theirs < mine
+        return False
+
+
+def sort_key_for(
+        spec: Sequence[Tuple[str, int]]
+) -> Callable[[Dict[str, Any]], Any]:
+    """Build a key function for a ``[(path, direction), ...]`` sort spec."""
+    paths = tuple(path for path, _ in spec)
+    directions = tuple(direction for _, direction in spec)
+    if all(direction > 0 for direction in directions):
+        return lambda doc: tuple(sort_value(get_path(doc, p)) for p in paths)
+    return lambda doc: _SortKey(
+        tuple(sort_value(get_path(doc, p)) for p in paths), directions
+    )
+
+
+def project(
+        document: Dict[str, Any],
+        projection: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Apply an inclusion or exclusion projection to a document copy.
+
+    ``_id`` is kept unless explicitly excluded, matching Mongo.
+    """
+    include_id = bool(projection.get("_id", True))
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        result: Dict[str, Any] = {}
+        if include_id and "_id" in document:
+            result["_id"] = document["_id"]
+        for path in fields:
+            value = get_path(document, path)
+            if value is not MISSING:
+                set_path(result, path, value)
+        return result
+    if any(fields.values()):
+        raise ValueError("Cannot mix inclusion and exclusion in a projection")
+
+    result = dict(document)
+    if not include_id:
+        result.pop("_id", None)
+    for path in fields:
+        parts = path.split(".")
+        target = result
+        for part in parts[:-1]:
+            child = target.get(part)
+            if not isinstance(child, dict):
+                break
+            target[part] = child = dict(child)
+            target = child
+        else:
+            target.pop(parts[-1], None)
+    return result
@@ -0,0 +1,266 @@
+"""Redis value types for the mock Redis client.
+
+Each type matches the asymptotic cost of its Redis counterpart: hashes
+are dicts, lists are deques, sorted sets are a dict plus a skiplist and
+streams are append-only arrays searched with bisect.
+"""
+
+import bisect
+import random
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+Score = Union[float, int, str]
+StreamID = Tuple[int, int]
+
+
+class RedisHash(dict):
+    """Hash value: O(1) HSET/HGET/HDEL."""
+
+    def copy(self) -> "RedisHash":
+        """Return a shallow copy that is still a ``RedisHash``."""
+        return RedisHash(self)
+
+
+class RedisList(deque):
+    """List value: O(1) push and pop at either end."""
+
+
+class _SkipNode:
+    """Skiplist node holding one ``(score, member)`` pair."""
+
+    __slots__ = ("score", "member", "forward")
+
+    def __init__(self, score: float, member: str, level: int):
+        self.score = score
+        self.member = member
+        self.forward: List[Optional["_SkipNode"]] = [None] * level
+
+
+class SortedSet:
+    """Sorted set value backed by a skiplist, as in Redis.
+
+    ZADD, ZREM and ZSCORE are O(log n) or better and ZRANGEBYSCORE is
+    O(log n + m) for m returned members.
+    """
+
+    max_level = 32
+    branching = 0.25
+
+    def __init__(self) -> None:
+        self.scores: Dict[str, float] = {}
+        self._head = _SkipNode(float("-inf"), "", self.max_level)
+        self._level = 1
+        self._random = random.Random()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, member: str, score: float) -> bool:
+        """Add or rescore a member; return True if it is new."""
+        current = self.scores.get(member)
+        if current is not None:
+            if current == score:
+                return False
+            self._unlink(member, current)
+        self._link(member, score)
+        self.scores[member] = score
+        return current is None
+
+    def remove(self, member: str) -> bool:
+        """Remove a member; return True if it was present."""
+        score = self.scores.pop(member, None)
+        if score is None:
+            return False
+        self._unlink(member, score)
+        return True
+
+    def copy(self) -> "SortedSet":
+        """Return an independent copy in O(n).
+
+        Members are linked in score order, appending to the tail of each
+        level, so no search is needed per member.
+        """
+        clone = SortedSet()
+        tails = [clone._head] * self.max_level
+        node = self._head.forward[0]
+        while node is not None:
+            level = clone._random_level()
+            clone._level = max(clone._level, level)
+            copy = _SkipNode(node.score, node.member, level)
+            for i in range(level):
+                tails[i].forward[i] = copy
+                tails[i] = copy
+            node = node.forward[0]
+        clone.scores = dict(self.scores)
+        return clone
+
+    def range_by_score(
+            self,
+            min_score: Score,
+            max_score: Score,
+            offset: int = 0,
+            count: Optional[int] = None
+    ) -> Iterator[Tuple[str, float]]:
+        """Yield ``(member, score)`` pairs with scores in the given range.
+
+        Bounds accept numbers, ``"-inf"``/``"+inf"`` and ``"(x"`` for an
+        exclusive bound, like ZRANGEBYSCORE.
+        """
+        low, low_open = parse_score_bound(min_score)
+        high, high_open = parse_score_bound(max_score)
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            while True:
+                nxt = node.forward[level]
+                if nxt is None:
+                    break
+                if nxt.score < low or (low_open and nxt.score == low):
+                    node = nxt
+                else:
+                    break
+        node = node.forward[0]
+        skipped = returned = 0
+        while node is not None:
+            if node.score > high or (high_open and node.score == high):
+                return
+            if skipped < offset:
+                skipped += 1
+            else:
+                if count is not None and returned >= count:
+                    return
+                returned += 1
+                yield node.member, node.score
+            node = node.forward[0]
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.max_level and self._random.random() < self.branching:
+            level += 1
+        return level
+
+    def _predecessors(self, member: str, score: float) -> List[_SkipNode]:
+        """Find the last node before ``(score, member)`` on every level."""
+        update = [self._head] * self.max_level
+        node = self._head
+        for level in range(self._level - 1, -1, -1):
+            while True:
+                nxt = node.forward[level]
+                if nxt is None or (nxt.score, nxt.member) >= (score, member):
+                    break
+                node = nxt
+            update[level] = node
+        return update
+
+    def _link(self, member: str, score: float) -> None:
+        update = self._predecessors(member, score)
+        level = self._random_level()
+        if level > self._level:
+            self._level = level
+        node = _SkipNode(score, member, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+
+    def _unlink(self, member: str, score: float) -> None:
+        update = self._predecessors(member, score)
+        target = update[0].forward[0]
+        if target is None or target.member != member:
+            return
+        for i in range(self._level):
+            if update[i].forward[i] is not target:
+                break
+            update[i].forward[i] = target.forward[i]
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+
+def parse_score_bound(bound: Score) -> Tuple[float, bool]:
+    """Parse a ZRANGEBYSCORE bound into ``(value, exclusive)``."""
+    if isinstance(bound, str):
+        text = bound.strip()
+        exclusive = text.startswith("(")
+        if exclusive:
+            text = text[1:]
+        return float(text), exclusive
+    return float(bound), False
+
+
+class Stream:
+    """Stream value: append-only entries ordered by ``ms-seq`` ids.
+
+    XADD is O(1) amortized and XRANGE is O(log n + m) via bisect over the
+    id array.
+    """
+
+    def __init__(self) -> None:
+        self.ids: List[StreamID] = []
+        self.entries: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def copy(self) -> "Stream":
+        """Return an independent copy; entries are never modified in place."""
+        clone = Stream()
+        clone.ids = list(self.ids)
+        clone.entries = list(self.entries)
+        return clone
+
+    def next_id(self, entry_id: str = "*") -> StreamID:
+        """Resolve ``"*"``, ``"ms-*"`` or an explicit id for the next entry."""
+        last = self.ids[-1] if self.ids else (0, 0)
+        if entry_id == "*":
+            ms = max(int(time.time() * 1000), last[0])
+            return (ms, last[1] + 1) if ms == last[0] else (ms, 0)
+        new_id = parse_stream_id(entry_id, default_seq=0)
+        if entry_id.endswith("-*"):
+            seq = last[1] + 1 if new_id[0] == last[0] else 0
+            new_id = (new_id[0], seq)
+        if new_id <= last:
+            raise ValueError(
+                "The ID specified in XADD is equal or smaller than the "
+                "target stream top item"
+            )
+        return new_id
+
+    def add(self, fields: Dict[str, Any], entry_id: str = "*") -> str:
+        """Append an entry and return its id."""
+        new_id = self.next_id(entry_id)
+        self.ids.append(new_id)
+        self.entries.append(dict(fields))
+        return format_stream_id(new_id)
+
+    def range(
+            self,
+            start: str = "-",
+            end: str = "+",
+            count: Optional[int] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return entries with ids between ``start`` and ``end`` inclusive."""
+        lo = 0 if start == "-" else bisect.bisect_left(
+            self.ids, parse_stream_id(start, default_seq=0)
+        )
+        hi = len(self.ids) if end == "+" else bisect.bisect_right(
+            self.ids, parse_stream_id(end, default_seq=2 ** 64 - 1)
+        )
+        if count is not None:
+            hi = min(hi, lo + count)
+        return [
+            (format_stream_id(self.ids[i]), dict(self.entries[i]))
+            for i in range(lo, hi)
+        ]
+
+
+def parse_stream_id(entry_id: str, default_seq: int) -> StreamID:
+    """Parse ``"ms-seq"`` (or ``"ms"``/``"ms-*"``) into a tuple."""
+    ms, _, seq = entry_id.partition("-")
+    if seq in ("", "*"):
+        return int(ms), default_seq
+    return int(ms), int(seq)
+
+
+def format_stream_id(entry_id: StreamID) -> str:
+    """Format a stream id tuple as ``"ms-seq"``."""
+    return f"{entry_id[0]}-{entry_id[1]}"
@@ -2,7 +2,9 @@
 
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from .workers import worker_database_url, worker_redis_url
 
 # Test directories
 TEST_ROOT = Path(__file__).parent
@@ -71,7 +73,21 @@
     "junit_xml": str(REPORTS_DIR / "junit.xml"),
     "coverage_html": str(REPORTS_DIR / "coverage"),
     "coverage_xml": str(REPORTS_DIR / "coverage.xml"),
-    "benchmark_json": str(REPORTS_DIR / "benchmark.json")
+    "benchmark_json": str(REPORTS_DIR / "benchmark.json"),
+    "durations_json": str(REPORTS_DIR / "durations.json")
+}
+
+# Benchmark settings; BENCHMARK_BASELINE, BENCHMARK_MAX_REGRESSION,
+# BENCHMARK_SAVE_BASELINE and BENCHMARK_REQUIRE_BASELINE override them
+# from the environment
+BENCHMARK_SETTINGS = {
+    "baseline_json": str(TEST_ROOT.parent / "performance" / "baseline.json"),
+    "max_regression": 0.25,
+    "thresholds": {},
+    "repeat": 3,
+    "min_time": 0.02,
+    # Cold-start import budget for the package and the top-level conftest
+    "import_budget_ms": 50
 }
 
 # Test timeouts (in seconds)
@@ -94,15 +110,32 @@
 }
 
 
+def get_worker_db_settings(worker_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get database settings pointing at this xdist worker's databases."""
+    return {
+        name: {**settings, "url": worker_database_url(settings["url"], worker_id)}
+        for name, settings in TEST_DB_SETTINGS.items()
+    }
+
+
+def get_worker_redis_settings(worker_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get Redis settings pointing at this xdist worker's database."""
+    return {
+        **REDIS_SETTINGS,
+        "url": worker_redis_url(REDIS_SETTINGS["url"], worker_id),
+    }
+
+
 def get_test_settings() -> Dict[str, Any]:
-    """Get all test settings."""
+    """Get all test settings for the current xdist worker."""
     return {
-        "databases": TEST_DB_SETTINGS,
-        "redis": REDIS_SETTINGS,
+        "databases": get_worker_db_settings(),
+        "redis": get_worker_redis_settings(),
         "test_data": TEST_DATA_SETTINGS,
         "mocking": MOCK_SETTINGS,
         "environment": TEST_ENV_VARS,
         "reports": REPORT_SETTINGS,
+        "benchmarks": BENCHMARK_SETTINGS,
         "timeouts": TIMEOUTS,
         "retries": RETRIES,
         "paths": {
@@ -2,7 +2,8 @@
 
 import json
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from pydantic import BaseModel as PydanticBaseModel
 
@@ -68,20 +69,131 @@ class TestDBConfig(BaseModel):
     retries: RetryConfig
 
 
-def load_db_config() -> TestDBConfig:
-    """Load database configuration from JSON file."""
-    config_path = os.path.join(
-        os.path.dirname(__file__),
-        "test_db_config.json"
-    )
-    with open(config_path) as f:
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "test_db_config.json"
+)
+
+# Worker id outside pytest-xdist; resources keep their configured names
+MASTER_WORKER_ID = "master"
+
+# Redis servers have 16 logical databases unless configured otherwise
+REDIS_DATABASES = 16
+
+# Parsed configs keyed by path, tagged with the file's (mtime_ns, size)
+_config_cache: Dict[str, Tuple[Tuple[int, int], TestDBConfig]] = {}
+_config_override: Optional[TestDBConfig] = None
+# Last per-worker view: (source config, worker id, worker config)
+_worker_config: Optional[Tuple[TestDBConfig, str, TestDBConfig]] = None
+
+
+def load_db_config(config_path: Optional[str] = None) -> TestDBConfig:
+    """Load database configuration from JSON file.
+
+    The parsed model is cached per path and reused until the file's
+    modification time or size changes, so repeated calls cost one
+    ``os.stat``. The returned model is shared and should be treated as
+    read-only.
+    """
+    if _config_override is not None:
+        return _config_override
+    path = config_path or DEFAULT_CONFIG_PATH
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(path) as f:
         config_data = json.load(f)
-    return TestDBConfig(**config_data)
+    config = TestDBConfig(**config_data)
+    _config_cache[path] = (stamp, config)
+    return config
+
+
+def clear_db_config_cache() -> None:
+    """Drop every cached configuration so the next load re-reads the file."""
+    _config_cache.clear()
+
+
+@contextmanager
+def override_db_config(config: TestDBConfig) -> Iterator[TestDBConfig]:
+    """Make ``load_db_config`` and the helpers use ``config`` temporarily."""
+    global _config_override
+    previous = _config_override
+    _config_override = config
+    try:
+        yield config
+    finally:
+        _config_override = previous
+
+
+def get_worker_id() -> str:
+    """Return the xdist worker id, or ``"master"`` outside xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", MASTER_WORKER_ID)
+
+
+def get_worker_index(worker_id: Optional[str] = None) -> int:
+    """Return the worker's number (``gw3`` -> 3); the master is 0."""
+    worker_id = worker_id or get_worker_id()
+    digits = worker_id[2:]
+    return int(digits) if worker_id.startswith("gw") and digits.isdigit() else 0
+
+
+def worker_db_name(name: str, worker_id: Optional[str] = None) -> str:
+    """Suffix a database name with the worker id."""
+    worker_id = worker_id or get_worker_id()
+    return name if worker_id == MASTER_WORKER_ID else f"{name}_{worker_id}"
+
+
+def worker_redis_db(db: int, worker_id: Optional[str] = None) -> int:
+    """Spread workers over the Redis databases from ``db`` upwards."""
+    worker_id = worker_id or get_worker_id()
+    if worker_id == MASTER_WORKER_ID:
+        return db
+    return db + get_worker_index(worker_id) % max(REDIS_DATABASES - db, 1)
+
+
+def worker_redis_prefix(prefix: str, worker_id: Optional[str] = None) -> str:
+    """Namespace a key prefix by worker.
+
+    Workers can share a Redis database once there are more workers than
+    databases, so the prefix is what keeps their keys apart.
+    """
+    worker_id = worker_id or get_worker_id()
+    return prefix if worker_id == MASTER_WORKER_ID else f"{prefix}{worker_id}:"
+
+
+def get_worker_db_config(worker_id: Optional[str] = None) -> TestDBConfig:
+    """Return the configuration as seen by one pytest-xdist worker.
+
+    Database names get a ``_<worker id>`` suffix and Redis moves to the
+    worker's database shard with a ``<prefix><worker id>:`` key prefix.
+    Outside xdist this is the configuration unchanged.
+    """
+    global _worker_config
+    worker_id = worker_id or get_worker_id()
+    config = load_db_config()
+    if (_worker_config is not None and _worker_config[0] is config
+            and _worker_config[1] == worker_id):
+        return _worker_config[2]
+    databases = {
+        key: db.model_copy(update={"name": worker_db_name(db.name, worker_id)})
+        for key, db in config.databases.items()
+    }
+    redis = config.redis.model_copy(update={
+        "db": worker_redis_db(config.redis.db, worker_id),
+        "prefix": worker_redis_prefix(config.redis.prefix, worker_id),
+    })
+    worker_config = config.model_copy(
+        update={"databases": databases, "redis": redis}
+    )
+    _worker_config = (config, worker_id, worker_config)
+    return worker_config
 
 
 def get_db_url(db_name: str) -> str:
     """Get database URL for given database."""
-    config = load_db_config()
+    config = get_worker_db_config()
     db_config = config.databases.get(db_name)
     if not db_config:
         raise ValueError(f"Unknown database: {db_name}")
@@ -94,7 +206,7 @@ def get_db_url(db_name: str) -> str:
 
 def get_redis_url() -> str:
     """Get Redis URL from configuration."""
-    config = load_db_config()
+    config = get_worker_db_config()
     redis = config.redis
     password_part = f":{redis.password}@" if redis.password else "@"
     return f"redis://{password_part}{redis.host}:{redis.port}/{redis.db}"
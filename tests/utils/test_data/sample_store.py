@@ -0,0 +1,211 @@
+"""Lazily loaded, indexed access to sample test data.
+
+Two layouts are supported:
+
+* a JSON file mapping section names to lists of rows, like
+  ``test_samples.json``; it is parsed once per process and then served
+  from memory;
+* a directory of ``<section>.ndjson`` files, one row per line. Each file
+  is memory-mapped and indexed by the byte offset of every line, so row
+  ``n`` of a section is read and decoded on its own and sections can be
+  iterated without parsing the rest of the data.
+"""
+
+import json
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_SAMPLES_PATH = Path(__file__).parent / "test_samples.json"
+
+NDJSON_SUFFIX = ".ndjson"
+
+
+class _NDJSONSection:
+    """Memory-mapped NDJSON file with a line offset index."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.stamp = _stamp(path)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size else None
+        )
+        self.offsets = self._index(size)
+
+    def _index(self, size: int) -> array:
+        """Record where every non-blank line starts, plus the end offset."""
+        offsets = array("q")
+        if self._map is None:
+            offsets.append(0)
+            return offsets
+        start = 0
+        while start < size:
+            end = self._map.find(b"\n", start)
+            end = size if end == -1 else end
+            if self._map[start:end].strip():
+                offsets.append(start)
+            start = end + 1
+        offsets.append(size)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Decode the row at ``index``."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Row {index} out of range for {self.path.name}")
+        assert self._map is not None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return json.loads(self._map[start:end])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def close(self) -> None:
+        """Release the mapping and file handle."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class SampleStore:
+    """Per-process cache of sample data sections.
+
+    Sections are loaded on first use and reused until the backing file
+    changes on disk. Rows returned by ``section`` and ``row`` are shared
+    with the cache and should be treated as read-only.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_SAMPLES_PATH):
+        self.path = Path(path)
+        self._json_stamp: Optional[Tuple[int, int]] = None
+        self._json_data: Dict[str, List[Dict[str, Any]]] = {}
+        self._ndjson: Dict[str, _NDJSONSection] = {}
+        self._sections: Dict[str, List[Dict[str, Any]]] = {}
+
+    @property
+    def is_ndjson(self) -> bool:
+        """Whether the store reads a directory of NDJSON sections."""
+        return self.path.is_dir()
+
+    def sections(self) -> List[str]:
+        """List the available section names."""
+        if self.is_ndjson:
+            return sorted(p.stem for p in self.path.glob(f"*{NDJSON_SUFFIX}"))
+        return list(self._load_json())
+
+    def section(self, name: str) -> List[Dict[str, Any]]:
+        """Return every row of a section, loading it on first use."""
+        if not self.is_ndjson:
+            return self._json_section(name)
+        ndjson = self._ndjson_section(name)
+        cached = self._sections.get(name)
+        if cached is None:
+            cached = self._sections[name] = list(ndjson)
+        return cached
+
+    def row(self, name: str, index: int) -> Dict[str, Any]:
+        """Return one row of a section without loading the others."""
+        if not self.is_ndjson:
+            return self._json_section(name)[index]
+        ndjson = self._ndjson_section(name)
+        cached = self._sections.get(name)
+        if cached is not None:
+            return cached[index]
+        return ndjson.row(index)
+
+    def iter_section(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Iterate a section's rows, streaming them for NDJSON stores."""
+        if self.is_ndjson:
+            return iter(self._ndjson_section(name))
+        return iter(self._json_section(name))
+
+    def count(self, name: str) -> int:
+        """Number of rows in a section."""
+        if self.is_ndjson:
+            return len(self._ndjson_section(name))
+        return len(self._json_section(name))
+
+    def load_all(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return every section, as ``load_test_data`` does."""
+        return {name: self.section(name) for name in self.sections()}
+
+    def clear(self) -> None:
+        """Forget cached sections and close memory maps."""
+        for ndjson in self._ndjson.values():
+            ndjson.close()
+        self._ndjson.clear()
+        self._sections.clear()
+        self._json_data = {}
+        self._json_stamp = None
+
+    def _load_json(self) -> Dict[str, List[Dict[str, Any]]]:
+        stamp = _stamp(self.path)
+        if stamp != self._json_stamp:
+            with open(self.path) as f:
+                self._json_data = json.load(f)
+            self._json_stamp = stamp
+        return self._json_data
+
+    def _json_section(self, name: str) -> List[Dict[str, Any]]:
+        data = self._load_json()
+        if name not in data:
+            raise KeyError(f"Unknown sample section: {name}")
+        return data[name]
+
+    def _ndjson_section(self, name: str) -> _NDJSONSection:
+        path = self.path / f"{name}{NDJSON_SUFFIX}"
+        ndjson = self._ndjson.get(name)
+        if ndjson is not None and ndjson.stamp == _stamp(path):
+            return ndjson
+        if ndjson is not None:
+            ndjson.close()
+            self._sections.pop(name, None)
+        if not path.exists():
+            raise KeyError(f"Unknown sample section: {name}")
+        ndjson = self._ndjson[name] = _NDJSONSection(path)
+        return ndjson
+
+
+_stores: Dict[Path, SampleStore] = {}
+
+
+def get_sample_store(path: Union[str, Path, None] = None) -> SampleStore:
+    """Return the process-wide store for a samples file or directory."""
+    key = Path(path or DEFAULT_SAMPLES_PATH).resolve()
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = SampleStore(key)
+    return store
+
+
+def write_ndjson_samples(
+        sections: Dict[str, Iterable[Dict[str, Any]]],
+        directory: Union[str, Path]
+) -> Path:
+    """Write sections as ``<section>.ndjson`` files for an NDJSON store."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, rows in sections.items():
+        with open(directory / f"{name}{NDJSON_SUFFIX}", "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str))
+                f.write("\n")
+    return directory
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    """Identify a file version by its modification time and size."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
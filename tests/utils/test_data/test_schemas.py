@@ -1,11 +1,16 @@
 """Pydantic models for test data validation."""
 
+import json
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import (IO, Any, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Type, Union)
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
 
 class CryptoPrice(BaseModel):
@@ -69,21 +74,201 @@ class User(BaseModel):
     updated_at: Optional[datetime] = None
 
 
-def validate_test_data(data_type: str, data: dict) -> bool:
-    """Validate test data against schemas."""
-    schema_map = {
-        "crypto_prices": CryptoPrice,
-        "documents": Document,
-        "campaigns": Campaign,
-        "users": User,
-    }
+SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "crypto_prices": CryptoPrice,
+    "documents": Document,
+    "campaigns": Campaign,
+    "users": User,
+}
+
+
+class RowResult(NamedTuple):
+    """Validation outcome for one row of a streamed input."""
+    index: int
+    model: Optional[BaseModel]
+    errors: List[Dict[str, Any]]
+
+    @property
+    def valid(self) -> bool:
+        """Whether the row passed validation."""
+        return not self.errors
+
+
+class _InvalidLine(NamedTuple):
+    """An NDJSON line that is not valid JSON, reported as a failed row."""
+    error: Dict[str, Any]
+
 
-    schema = schema_map.get(data_type)
+def get_schema(data_type: str) -> Type[BaseModel]:
+    """Get the schema registered for a data type."""
+    schema = SCHEMAS.get(data_type)
     if not schema:
         raise ValueError(f"Unknown data type: {data_type}")
+    return schema
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(data_type: str) -> TypeAdapter:
+    """Build (once) the adapter that validates a list of rows in one call."""
+    return TypeAdapter(List[get_schema(data_type)])  # type: ignore[misc]
+
+
+def validate_test_data(data_type: str, data: dict) -> bool:
+    """Validate test data against schemas."""
+    schema = get_schema(data_type)
 
     try:
         schema(**data)
         return True
     except Exception:
         return False
+
+
+def validate_many(data_type: str, rows: Iterable[dict]) -> List[BaseModel]:
+    """Validate a whole batch of rows in a single pydantic call.
+
+    Raises ``pydantic.ValidationError`` listing every failing row; error
+    locations start with the row's index in the batch.
+    """
+    return _list_adapter(data_type).validate_python(list(rows))
+
+
+def validate_stream(
+        data_type: str,
+        source: Union[str, Path, IO[str], Iterable[dict]],
+        batch_size: int = 1000,
+        only_errors: bool = False
+) -> Iterator[RowResult]:
+    """Validate rows from a large input, yielding one result per row.
+
+    ``source`` may be an iterable of dicts, an open text file, or a path.
+    Files ending in ``.ndjson``/``.jsonl`` are read line by line; other
+    files must hold a top-level JSON array, which is decoded incrementally.
+    Rows are validated ``batch_size`` at a time through ``validate_many``.
+    An NDJSON line that does not decode fails as a row of its own, with a
+    ``json_invalid`` error giving its line number. With ``only_errors``
+    only failing rows are yielded.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    adapter = _list_adapter(data_type)
+    offset = 0
+    for batch in _batched(_iter_rows(source), batch_size):
+        for result in _validate_batch(adapter, batch, offset):
+            if not only_errors or result.errors:
+                yield result
+        offset += len(batch)
+
+
+def _validate_batch(
+        adapter: TypeAdapter,
+        batch: List[Any],
+        offset: int
+) -> List[RowResult]:
+    """Validate one batch, re-running only the good rows if any fail."""
+    failures: Dict[int, List[Dict[str, Any]]] = {
+        i: [row.error] for i, row in enumerate(batch)
+        if isinstance(row, _InvalidLine)
+    }
+    positions = [i for i in range(len(batch)) if i not in failures]
+    try:
+        models = adapter.validate_python([batch[i] for i in positions])
+    except ValidationError as e:
+        for error in e.errors(include_url=False):
+            index, *loc = error["loc"]
+            failures.setdefault(positions[int(index)], []).append({
+                "loc": tuple(loc),
+                "msg": error["msg"],
+                "type": error["type"],
+            })
+        positions = [i for i in positions if i not in failures]
+        models = adapter.validate_python([batch[i] for i in positions])
+    validated = dict(zip(positions, models))
+    return [
+        RowResult(offset + i, validated.get(i), failures.get(i, []))
+        for i in range(len(batch))
+    ]
+
+
+def _batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most ``size`` items."""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_rows(
+        source: Union[str, Path, IO[str], Iterable[dict]]
+) -> Iterator[Any]:
+    """Yield rows from a path, an open file or an iterable."""
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        with open(path) as f:
+            if path.suffix in (".ndjson", ".jsonl"):
+                yield from _iter_ndjson(f)
+            else:
+                yield from _iter_json_array(f)
+    elif hasattr(source, "read"):
+        name = str(getattr(source, "name", ""))
+        if name.endswith((".ndjson", ".jsonl")):
+            yield from _iter_ndjson(source)  # type: ignore[arg-type]
+        else:
+            yield from _iter_json_array(source)  # type: ignore[arg-type]
+    else:
+        yield from source  # type: ignore[misc]
+
+
+def _iter_ndjson(f: IO[str]) -> Iterator[Any]:
+    """Yield one decoded row per non-blank line, or an ``_InvalidLine``."""
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield _InvalidLine({
+                "loc": (),
+                "msg": f"Invalid JSON on line {number}: {e.msg}",
+                "type": "json_invalid",
+                "line": number,
+            })
+
+
+def _iter_json_array(f: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if started and position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            if position >= len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, position)
+            item, end = decoder.raw_decode(buffer, position)
+            if end == len(buffer) and not eof:
+                # A scalar at the end of the buffer may be cut short
+                raise json.JSONDecodeError("Need more data", buffer, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
@@ -1,13 +1,29 @@
 """Common test utilities and helper functions."""
 
-import json
-import os
+import bisect
+import copy
+import fnmatch
+import functools
+import heapq
+import itertools
 import random
 import string
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import (Any, Callable, ContextManager, Dict, Iterable, Iterator, List,
+                    Optional, Sequence, Set, Tuple, TypeVar, Union)
 
-import jwt
+from .auth_tokens import TokenFactory
+from .query_engine import (MISSING, RANGE_OPERATORS, compile_query,
+                           equality_value, freeze, get_path, paths_overlap,
+                           project, set_path, sort_key_for, sort_value)
+from .redis_structures import (RedisHash, RedisList, SortedSet, Stream,
+                               format_stream_id)
+from .test_data.db_utils import RedisConfig
+from .test_data.sample_store import get_sample_store
 
 # Constants
 TEST_USER_EMAIL = "test@example.com"
@@ -15,6 +31,10 @@
 JWT_SECRET = "test_secret"
 JWT_ALGORITHM = "HS256"
 
+_token_factory = TokenFactory(JWT_SECRET, JWT_ALGORITHM)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
 
 def generate_random_string(length: int = 10) -> str:
     """Generate a random string of given length."""
@@ -26,26 +46,41 @@ def generate_test_token(
         role: str = "user",
         exp_minutes: int = 30
 ) -> str:
-    """Generate a test JWT token."""
-    now = datetime.now(timezone.utc)
-    exp_time = now + timedelta(minutes=exp_minutes)
-    payload = {
-        "sub": user_id,
-        "role": role,
-        "exp": int(exp_time.timestamp())
-    }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    """Generate a test JWT token.
 
+    Tokens are cached per ``(user_id, role, exp_minutes)`` and reused
+    while at least half of their lifetime is left.
+    """
+    return _token_factory.token(user_id, role, exp_minutes)
 
-def load_test_data() -> Dict[str, Any]:
-    """Load test data from JSON file."""
-    test_data_path = os.path.join(
-        os.path.dirname(__file__),
-        "test_data",
-        "test_samples.json"
-    )
-    with open(test_data_path) as f:
-        return json.load(f)
+
+def generate_test_tokens(
+        user_ids: Iterable[str],
+        role: str = "user",
+        exp_minutes: int = 30
+) -> List[str]:
+    """Mint one fresh token per user id in a single batch."""
+    return _token_factory.mint_batch(user_ids, role, exp_minutes)
+
+
+def verify_test_token(token: str) -> Dict[str, Any]:
+    """Decode and validate a test token, caching the decoded claims."""
+    return _token_factory.verify(token)
+
+
+def load_test_data(section: Optional[str] = None) -> Any:
+    """Load test data from the sample store.
+
+    The samples file is parsed once per process; each call gets its own
+    deep copies of the rows so tests can modify them freely, nested
+    values included. Pass ``section``
+    to load a single section, or use ``get_sample_store()`` directly to
+    fetch individual rows.
+    """
+    store = get_sample_store()
+    if section is not None:
+        return copy.deepcopy(store.section(section))
+    return copy.deepcopy(store.load_all())
 
 
 def create_test_user(
@@ -79,47 +114,485 @@ def login_test_user(
     return response.json()
 
 
+class HashIndex:
+    """Hash index over one or more document fields."""
+
+    def __init__(self, name: str, fields: Sequence[str]):
+        self.name = name
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.buckets: Dict[Any, Dict[int, Dict[str, Any]]] = {}
+
+    def key_for(self, document: Dict[str, Any]) -> Any:
+        """Build the bucket key for a document."""
+        values = (get_path(document, f) for f in self.fields)
+        return tuple(None if v is MISSING else freeze(v) for v in values)
+
+    def add(self, document: Dict[str, Any]) -> None:
+        """Add a document to the index."""
+        key = self.key_for(document)
+        self.buckets.setdefault(key, {})[id(document)] = document
+
+    def remove(self, document: Dict[str, Any]) -> None:
+        """Remove a document from the index."""
+        key = self.key_for(document)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(id(document), None)
+        if not bucket:
+            del self.buckets[key]
+
+    def covers(self, query: Dict[str, Any]) -> bool:
+        """Check whether every indexed field has an equality condition."""
+        return all(
+            field in query and equality_value(query[field])[0]
+            for field in self.fields
+        )
+
+    def lookup(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return candidate documents for an equality query."""
+        try:
+            key = tuple(
+                freeze(equality_value(query[f])[1]) for f in self.fields
+            )
+            return list(self.buckets.get(key, {}).values())
+        except TypeError:
+            return []
+
+
+class SortedIndex:
+    """Ordered single-field index serving range, equality and sort queries.
+
+    Keys are kept in a sorted list next to their documents so lookups are
+    a pair of binary searches. Every document is indexed under
+    ``sort_value`` of its field, which ranks values by type first, so the
+    index order is also the order ``Cursor.sort`` produces.
+    """
+
+    # sort_value ranks whose values compare meaningfully with < and ==
+    orderable_ranks = (0, 1, 2, 5, 6)
+
+    def __init__(self, name: str, field: str):
+        self.name = name
+        self.fields: Tuple[str, ...] = (field,)
+        self.keys: List[Tuple[int, Any]] = []
+        self.docs: List[Dict[str, Any]] = []
+
+    def add(self, document: Dict[str, Any]) -> None:
+        """Add a document to the index."""
+        key = sort_value(get_path(document, self.fields[0]))
+        position = bisect.bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.docs.insert(position, document)
+
+    def remove(self, document: Dict[str, Any]) -> None:
+        """Remove a document from the index."""
+        key = sort_value(get_path(document, self.fields[0]))
+        position = bisect.bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.docs[position] is document:
+                del self.keys[position]
+                del self.docs[position]
+                return
+            position += 1
+
+    def covers(self, query: Dict[str, Any]) -> bool:
+        """Check whether the query bounds the indexed field."""
+        condition = query.get(self.fields[0], MISSING)
+        if condition is MISSING:
+            return False
+        is_equality, value = equality_value(condition)
+        if is_equality:
+            return sort_value(value)[0] in self.orderable_ranks
+        return any(op in condition for op in RANGE_OPERATORS)
+
+    def lookup(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return candidate documents inside the queried key range."""
+        lo, hi = self.bounds(query.get(self.fields[0]))
+        return self.docs[lo:hi]
+
+    def ordered(
+            self,
+            direction: int,
+            query: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield documents in index order, optionally within query bounds."""
+        lo, hi = 0, len(self.docs)
+        if query is not None and self.covers(query):
+            lo, hi = self.bounds(query[self.fields[0]])
+        docs = self.docs[lo:hi]
+        return iter(docs) if direction > 0 else reversed(docs)
+
+    def bounds(self, condition: Any) -> Tuple[int, int]:
+        """Translate a field condition into a slice of the sorted keys."""
+        lo, hi = 0, len(self.keys)
+        is_equality, value = equality_value(condition)
+        limits = {"$eq": value} if is_equality else condition
+        for op, arg in limits.items():
+            if op not in ("$eq",) + RANGE_OPERATORS:
+                continue
+            key = sort_value(arg)
+            rank = key[0]
+            if rank not in self.orderable_ranks:
+                return 0, 0
+            if rank == 0 and op != "$eq":
+                return 0, 0
+            lo = max(lo, bisect.bisect_left(self.keys, (rank,)))
+            hi = min(hi, bisect.bisect_left(self.keys, (rank + 1,)))
+            if op in ("$gte", "$eq"):
+                lo = max(lo, bisect.bisect_left(self.keys, key))
+            if op == "$gt":
+                lo = max(lo, bisect.bisect_right(self.keys, key))
+            if op in ("$lte", "$eq"):
+                hi = min(hi, bisect.bisect_right(self.keys, key))
+            if op == "$lt":
+                hi = min(hi, bisect.bisect_left(self.keys, key))
+        return lo, max(lo, hi)
+
+
+Index = Union[HashIndex, SortedIndex]
+
+
+class Cursor:
+    """Lazy result set returned by ``MockDB.find``.
+
+    Documents are produced one at a time as the cursor is iterated.
+    ``sort``, ``skip`` and ``limit`` chain like their pymongo counterparts
+    and must be called before iteration starts. A single-key sort walks a
+    sorted index on that field when one exists; otherwise a limited sort
+    keeps only the top ``skip + limit`` documents in a heap.
+    """
+
+    def __init__(
+            self,
+            db: "MockDB",
+            collection: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None
+    ):
+        self._db = db
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[Iterator[Dict[str, Any]]] = None
+
+    def sort(
+            self,
+            key_or_list: Union[str, Sequence[Tuple[str, int]]],
+            direction: int = 1
+    ) -> "Cursor":
+        """Sort by one key, or by a list of ``(key, direction)`` pairs."""
+        self._check_unstarted()
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = [(key, dir_) for key, dir_ in key_or_list]
+        return self
+
+    def skip(self, count: int) -> "Cursor":
+        """Skip the first ``count`` results."""
+        self._check_unstarted()
+        if count < 0:
+            raise ValueError("skip must be non-negative")
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "Cursor":
+        """Return at most ``count`` results; zero means no limit."""
+        self._check_unstarted()
+        if count < 0:
+            raise ValueError("limit must be non-negative")
+        self._limit = count
+        return self
+
+    def clone(self) -> "Cursor":
+        """Return an unstarted copy of this cursor."""
+        cursor = Cursor(
+            self._db, self._collection, self._query, self._projection
+        )
+        cursor._sort = list(self._sort)
+        cursor._skip = self._skip
+        cursor._limit = self._limit
+        return cursor
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Exhaust the cursor into a list."""
+        return list(self)
+
+    def explain(self) -> Dict[str, Any]:
+        """Describe the query plan, including how the sort is done."""
+        plan = self._db.explain(self._collection, self._query)
+        plan["sort_stage"] = self._sort_strategy()[0] if self._sort else None
+        return plan
+
+    def __iter__(self) -> "Cursor":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        # Each step runs under the collection lock, so a document is never
+        # matched while another thread is half way through updating it
+        with self._db._lock(self._collection):
+            if self._results is None:
+                self._results = self._execute()
+            return next(self._results)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.clone())
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            raise IndexError("Cursor indexes must be non-negative")
+        if self._limit and index >= self._limit:
+            raise IndexError("Cursor index out of range")
+        cursor = self.clone()
+        cursor._skip += index
+        cursor._limit = 1
+        for doc in cursor:
+            return doc
+        raise IndexError("Cursor index out of range")
+
+    def _check_unstarted(self) -> None:
+        if self._results is not None:
+            raise RuntimeError("Cannot modify a cursor after iterating it")
+
+    def _sort_strategy(self) -> Tuple[str, Optional[SortedIndex]]:
+        """Pick an index walk, a heap top-k, or a full in-memory sort."""
+        if len(self._sort) == 1:
+            field, _ = self._sort[0]
+            stage, planned = self._db._plan(self._collection, self._query)
+            for index in self._db.indexes.get(self._collection, {}).values():
+                if (isinstance(index, SortedIndex)
+                        and index.fields == (field,)
+                        and (stage == "COLLSCAN" or planned is index)):
+                    return "INDEX", index
+        return ("TOP_K" if self._limit else "SORT"), None
+
+    def _execute(self) -> Iterator[Dict[str, Any]]:
+        """Build the lazy pipeline of matching, ordered documents."""
+        docs: Iterable[Dict[str, Any]]
+        if not self._sort:
+            docs = self._db._iter_matches(self._collection, self._query)
+        else:
+            strategy, index = self._sort_strategy()
+            if index is not None:
+                matches = compile_query(self._query)
+                docs = (
+                    doc for doc in index.ordered(self._sort[0][1], self._query)
+                    if matches(doc)
+                )
+            else:
+                key = sort_key_for(self._sort)
+                found = self._db._iter_matches(self._collection, self._query)
+                if strategy == "TOP_K":
+                    docs = heapq.nsmallest(self._skip + self._limit, found, key)
+                else:
+                    docs = sorted(found, key=key)
+        stop = self._skip + self._limit if self._limit else None
+        docs = itertools.islice(docs, self._skip, stop)
+        if self._projection is None:
+            return iter(docs)
+        projection = self._projection
+        return (project(doc, projection) for doc in docs)
+
+
+def _same_value(current: Any, value: Any) -> bool:
+    """Check whether ``$set`` of ``value`` over ``current`` is a no-op."""
+    return type(current) is type(value) and current == value
+
+
+def _collection_locked(method: F) -> F:
+    """Run a ``MockDB`` method under the lock of its collection argument."""
+    @functools.wraps(method)
+    def wrapper(self: "MockDB", collection: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock(collection):
+            return method(self, collection, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+
 class MockDB:
-    """Mock database for testing."""
+    """Mock database for testing.
+
+    Documents live in per-collection slot lists. Deletes leave a ``None``
+    tombstone in place and the list is compacted once tombstones make up
+    more than ``compact_ratio`` of it, so removal stays O(1) amortized.
+    ``ids`` maps each ``_id`` to its slot for constant-time primary key
+    lookups.
+
+    ``snapshot`` starts an undo journal: while a snapshot is open every
+    write records how to reverse itself (updated documents are copied
+    before their first change), and ``restore`` replays the journal
+    backwards. Both cost time proportional to the writes made in between,
+    not to the size of the database.
+
+    Every operation holds the re-entrant lock of its collection, so
+    threads working on different collections never wait for each other.
+    Cursors take the lock for each document they produce. ``snapshot``
+    and ``restore`` hold every collection lock at once.
+    """
+
+    compact_ratio = 0.5
+    compact_min_tombstones = 64
 
     def __init__(self):
-        self.data: Dict[str, List[Dict[str, Any]]] = {}
+        self.data: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+        self.ids: Dict[str, Dict[str, int]] = {}
+        self.tombstones: Dict[str, int] = {}
+        self.indexes: Dict[str, Dict[str, Index]] = {}
+        self._journal: Optional[List[Callable[[], None]]] = None
+        self._savepoints: List[int] = []
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def snapshot(self) -> int:
+        """Open a snapshot and return its token for ``restore``."""
+        with self._all_locks():
+            if self._journal is None:
+                self._journal = []
+            self._savepoints.append(len(self._journal))
+            return len(self._savepoints)
+
+    def restore(self, snapshot: int) -> None:
+        """Undo every write made since the most recent open snapshot."""
+        with self._all_locks():
+            if snapshot != len(self._savepoints) or self._journal is None:
+                raise ValueError("Snapshots must be restored most recent first")
+            journal = self._journal
+            mark = self._savepoints.pop()
+            while len(journal) > mark:
+                journal.pop()()
+            if not self._savepoints:
+                self._journal = None
+
+    @_collection_locked
+    def create_index(
+            self,
+            collection: str,
+            keys: Union[str, Sequence[str]],
+            ordered: bool = False
+    ) -> str:
+        """Create an index on a collection.
+
+        By default this is a single-field or compound hash index used for
+        equality lookups. With ``ordered=True`` it is a single-field sorted
+        index that also serves ``$gt``/``$gte``/``$lt``/``$lte`` queries.
+        """
+        fields = [keys] if isinstance(keys, str) else list(keys)
+        if not fields:
+            raise ValueError("An index needs at least one field")
+        if ordered and len(fields) > 1:
+            raise ValueError("Sorted indexes cover a single field")
+        if ordered:
+            name = f"{fields[0]}_sorted"
+        else:
+            name = "_".join(f"{field}_1" for field in fields)
+        indexes = self.indexes.setdefault(collection, {})
+        if name not in indexes:
+            index: Index = (
+                SortedIndex(name, fields[0]) if ordered
+                else HashIndex(name, fields)
+            )
+            for doc in self._documents(collection):
+                index.add(doc)
+            indexes[name] = index
+            if self._journal is not None:
+                self._journal.append(lambda: indexes.pop(name, None))
+        return name
+
+    @_collection_locked
+    def drop_index(self, collection: str, name: str) -> bool:
+        """Drop an index by name."""
+        indexes = self.indexes.get(collection, {})
+        index = indexes.pop(name, None)
+        if index is not None and self._journal is not None:
+            self._journal.append(lambda: indexes.__setitem__(name, index))
+        return index is not None
+
+    @_collection_locked
+    def index_information(self, collection: str) -> Dict[str, List[str]]:
+        """Return the indexed fields for each index on a collection."""
+        return {
+            name: list(index.fields)
+            for name, index in self.indexes.get(collection, {}).items()
+        }
+
+    @_collection_locked
+    def explain(
+            self,
+            collection: str,
+            query: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Report how a query would be executed and what it touched."""
+        stage, index = self._plan(collection, query)
+        candidates = list(self._candidates(collection, query, stage, index))
+        matches = compile_query(query)
+        matched = [doc for doc in candidates if matches(doc)]
+        index_name = index.name if index else None
+        if stage == "IDHACK":
+            index_name = "_id_"
+        return {
+            "collection": collection,
+            "query": query,
+            "stage": stage,
+            "index": index_name,
+            "docs_examined": len(candidates),
+            "n_returned": len(matched),
+        }
 
     def insert(self, collection: str, document: Dict[str, Any]) -> str:
         """Insert a document into a collection."""
-        if collection not in self.data:
-            self.data[collection] = []
-        doc_id = generate_random_string()
-        document["_id"] = doc_id
-        self.data[collection].append(document)
-        return doc_id
+        return self.insert_many(collection, [document])[0]
+
+    @_collection_locked
+    def insert_many(
+            self,
+            collection: str,
+            documents: Iterable[Dict[str, Any]]
+    ) -> List[str]:
+        """Insert a batch of documents and return their ids in order."""
+        documents = list(documents)
+        created = collection not in self.data
+        slots = self.data.setdefault(collection, [])
+        ids = self.ids.setdefault(collection, {})
+        doc_ids = self._generate_ids(len(documents), ids)
+        for doc_id, document in zip(doc_ids, documents):
+            document["_id"] = doc_id
+            ids[doc_id] = len(slots)
+            slots.append(document)
+        for index in self.indexes.get(collection, {}).values():
+            for document in documents:
+                index.add(document)
+        if self._journal is not None:
+            self._journal.append(
+                lambda: self._undo_insert(collection, documents, created)
+            )
+        return doc_ids
 
+    @_collection_locked
     def find_one(
             self,
             collection: str,
-            query: Dict[str, Any]
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """Find a single document in a collection."""
-        if collection not in self.data:
-            return None
-        for doc in self.data[collection]:
-            if all(doc.get(k) == v for k, v in query.items()):
-                return doc
-        return None
+        doc = next(self._iter_matches(collection, query), None)
+        if doc is None or projection is None:
+            return doc
+        return project(doc, projection)
 
     def find(
             self,
             collection: str,
-            query: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Find all documents in a collection matching the query."""
-        if collection not in self.data:
-            return []
-        return [
-            doc for doc in self.data[collection]
-            if all(doc.get(k) == v for k, v in query.items())
-        ]
+            query: Optional[Dict[str, Any]] = None,
+            projection: Optional[Dict[str, Any]] = None
+    ) -> Cursor:
+        """Return a lazy cursor over documents matching the query."""
+        return Cursor(self, collection, query or {}, projection)
 
+    @_collection_locked
     def update_one(
             self,
             collection: str,
@@ -127,41 +600,507 @@ def update_one(
             update: Dict[str, Any]
     ) -> bool:
         """Update a single document in a collection."""
-        if collection not in self.data:
+        self._check_update(update)
+        doc = self.find_one(collection, query)
+        if doc is None:
             return False
-        for doc in self.data[collection]:
-            if all(doc.get(k) == v for k, v in query.items()):
-                doc.update(update.get("$set", {}))
-                return True
-        return False
+        self._apply_update(collection, [doc], update)
+        return True
+
+    @_collection_locked
+    def update_many(
+            self,
+            collection: str,
+            query: Dict[str, Any],
+            update: Dict[str, Any]
+    ) -> int:
+        """Update every matching document and return how many changed."""
+        self._check_update(update)
+        docs = list(self._iter_matches(collection, query))
+        return self._apply_update(collection, docs, update)
 
+    @_collection_locked
     def delete_one(
             self,
             collection: str,
             query: Dict[str, Any]
     ) -> bool:
         """Delete a single document from a collection."""
-        if collection not in self.data:
+        doc = self.find_one(collection, query)
+        if doc is None:
             return False
-        for i, doc in enumerate(self.data[collection]):
-            if all(doc.get(k) == v for k, v in query.items()):
-                del self.data[collection][i]
-                return True
-        return False
+        self._remove(collection, [doc])
+        self._maybe_compact(collection)
+        return True
+
+    @_collection_locked
+    def delete_many(
+            self,
+            collection: str,
+            query: Dict[str, Any]
+    ) -> int:
+        """Delete every matching document and return how many went."""
+        docs = list(self._iter_matches(collection, query))
+        self._remove(collection, docs)
+        self._maybe_compact(collection)
+        return len(docs)
+
+    @_collection_locked
+    def bulk_write(
+            self,
+            collection: str,
+            operations: Iterable[Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, int]:
+        """Run a Mongo-style list of write operations in order.
+
+        Each operation is a single-key dict such as
+        ``{"insert_one": {"document": {...}}}``,
+        ``{"update_many": {"filter": {...}, "update": {"$set": {...}}}}`` or
+        ``{"delete_one": {"filter": {...}}}``. Runs of consecutive inserts
+        are written as one batch and compaction is deferred to the end.
+        """
+        result = {
+            "inserted_count": 0,
+            "matched_count": 0,
+            "modified_count": 0,
+            "deleted_count": 0,
+        }
+        pending: List[Dict[str, Any]] = []
+
+        def flush_inserts() -> None:
+            if pending:
+                result["inserted_count"] += len(
+                    self.insert_many(collection, pending)
+                )
+                pending.clear()
+
+        for operation in operations:
+            if len(operation) != 1:
+                raise ValueError(f"Invalid bulk operation: {operation}")
+            (op, args), = operation.items()
+            if op == "insert_one":
+                pending.append(args["document"])
+                continue
+            flush_inserts()
+            if op in ("update_one", "update_many"):
+                self._check_update(args["update"])
+                docs = self._select(collection, args["filter"], op)
+                result["matched_count"] += len(docs)
+                result["modified_count"] += self._apply_update(
+                    collection, docs, args["update"]
+                )
+            elif op in ("delete_one", "delete_many"):
+                docs = self._select(collection, args["filter"], op)
+                self._remove(collection, docs)
+                result["deleted_count"] += len(docs)
+            else:
+                raise ValueError(f"Unknown bulk operation: {op}")
+        flush_inserts()
+        if collection in self.data:
+            self._maybe_compact(collection)
+        return result
+
+    @_collection_locked
+    def compact(self, collection: str) -> None:
+        """Drop tombstones from a collection and renumber its slots."""
+        live = list(self._documents(collection))
+        if self._journal is not None:
+            layout = (
+                self.data[collection],
+                self.ids[collection],
+                self.tombstones.get(collection, 0),
+            )
+            self._journal.append(lambda: self._undo_compact(collection, layout))
+        self.data[collection] = live
+        self.ids[collection] = {doc["_id"]: slot for slot, doc in enumerate(live)}
+        self.tombstones[collection] = 0
+
+    def _lock(self, collection: str) -> threading.RLock:
+        """Return the lock guarding one collection, creating it if needed."""
+        lock = self._locks.get(collection)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(collection, threading.RLock())
+        return lock
+
+    @contextmanager
+    def _all_locks(self) -> Iterator[None]:
+        """Hold every collection lock, in name order to avoid deadlocks."""
+        with self._locks_guard:
+            with _holding([self._locks[name] for name in sorted(self._locks)]):
+                yield
+
+    def _select(
+            self,
+            collection: str,
+            query: Dict[str, Any],
+            op: str
+    ) -> List[Dict[str, Any]]:
+        """Return the documents a ``*_one`` or ``*_many`` operation targets."""
+        if op.endswith("_many"):
+            return list(self._iter_matches(collection, query))
+        doc = self.find_one(collection, query)
+        return [] if doc is None else [doc]
+
+    @staticmethod
+    def _generate_ids(count: int, taken: Dict[str, int]) -> List[str]:
+        """Generate ``count`` unused document ids from one random draw."""
+        length = 10
+        alphabet = string.ascii_letters + string.digits
+        chars = "".join(random.choices(alphabet, k=count * length))
+        ids = [chars[i:i + length] for i in range(0, count * length, length)]
+        minted: Set[str] = set()
+        for i, doc_id in enumerate(ids):
+            while doc_id in taken or doc_id in minted:
+                doc_id = generate_random_string(length)
+            minted.add(doc_id)
+            ids[i] = doc_id
+        return ids
+
+    @staticmethod
+    def _check_update(update: Dict[str, Any]) -> None:
+        """Reject updates that would change a document's _id."""
+        if any(
+            paths_overlap(path, "_id") for path in update.get("$set", {})
+        ):
+            raise ValueError("The _id field is immutable")
+
+    def _apply_update(
+            self,
+            collection: str,
+            docs: List[Dict[str, Any]],
+            update: Dict[str, Any]
+    ) -> int:
+        """Apply ``$set`` to documents, reindexing each touched index once.
+
+        Documents that already hold every new value are left alone; the
+        number of documents actually changed is returned.
+        """
+        changes = update.get("$set", {})
+        docs = [
+            doc for doc in docs
+            if any(
+                not _same_value(get_path(doc, path), value)
+                for path, value in changes.items()
+            )
+        ]
+        touched = [
+            index for index in self.indexes.get(collection, {}).values()
+            if any(
+                paths_overlap(path, field)
+                for path in changes for field in index.fields
+            )
+        ]
+        if self._journal is not None:
+            originals = [(doc, copy.deepcopy(doc)) for doc in docs]
+            self._journal.append(lambda: self._undo_update(originals, touched))
+        for index in touched:
+            for doc in docs:
+                index.remove(doc)
+        for doc in docs:
+            for path, value in changes.items():
+                set_path(doc, path, value)
+        for index in touched:
+            for doc in docs:
+                index.add(doc)
+        return len(docs)
+
+    def _remove(self, collection: str, docs: List[Dict[str, Any]]) -> None:
+        """Tombstone documents and drop them from every index."""
+        if not docs:
+            return
+        ids = self.ids[collection]
+        slots = self.data[collection]
+        removed = []
+        for doc in docs:
+            slot = ids.pop(doc["_id"])
+            slots[slot] = None
+            removed.append((slot, doc))
+        self.tombstones[collection] = (
+            self.tombstones.get(collection, 0) + len(docs)
+        )
+        for index in self.indexes.get(collection, {}).values():
+            for doc in docs:
+                index.remove(doc)
+        if self._journal is not None:
+            self._journal.append(lambda: self._undo_remove(collection, removed))
+
+    def _undo_insert(
+            self,
+            collection: str,
+            documents: List[Dict[str, Any]],
+            created: bool
+    ) -> None:
+        """Reverse ``insert_many``; the documents are the last slots."""
+        for index in self.indexes.get(collection, {}).values():
+            for document in documents:
+                index.remove(document)
+        ids = self.ids[collection]
+        for document in documents:
+            del ids[document["_id"]]
+        del self.data[collection][len(self.data[collection]) - len(documents):]
+        if created:
+            del self.data[collection]
+            del self.ids[collection]
+            self.tombstones.pop(collection, None)
+
+    def _undo_update(
+            self,
+            originals: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+            touched: List[Index]
+    ) -> None:
+        """Put updated documents back to their saved contents."""
+        for index in touched:
+            for doc, _ in originals:
+                index.remove(doc)
+        for doc, original in originals:
+            doc.clear()
+            doc.update(original)
+        for index in touched:
+            for doc, _ in originals:
+                index.add(doc)
+
+    def _undo_remove(
+            self,
+            collection: str,
+            removed: List[Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """Put removed documents back into their tombstoned slots."""
+        ids = self.ids[collection]
+        slots = self.data[collection]
+        for slot, doc in removed:
+            slots[slot] = doc
+            ids[doc["_id"]] = slot
+        self.tombstones[collection] -= len(removed)
+        for index in self.indexes.get(collection, {}).values():
+            for _, doc in removed:
+                index.add(doc)
+
+    def _undo_compact(
+            self,
+            collection: str,
+            layout: Tuple[List[Optional[Dict[str, Any]]], Dict[str, int], int]
+    ) -> None:
+        """Reinstate the slot list and id map replaced by ``compact``."""
+        self.data[collection], self.ids[collection], dead = layout
+        self.tombstones[collection] = dead
+
+    def _maybe_compact(self, collection: str) -> None:
+        """Compact a collection once tombstones dominate its slot list."""
+        dead = self.tombstones.get(collection, 0)
+        if (dead >= self.compact_min_tombstones
+                and dead > len(self.data[collection]) * self.compact_ratio):
+            self.compact(collection)
+
+    def _documents(self, collection: str) -> Iterator[Dict[str, Any]]:
+        """Yield the live documents of a collection in insertion order."""
+        for doc in self.data.get(collection, []):
+            if doc is not None:
+                yield doc
+
+    def _plan(
+            self,
+            collection: str,
+            query: Dict[str, Any]
+    ) -> Tuple[str, Optional[Index]]:
+        """Pick the primary key, the best covering index, or a scan.
+
+        Hash indexes are preferred over sorted ones, and wider hash
+        indexes over narrower ones.
+        """
+        if "_id" in query and equality_value(query["_id"])[0]:
+            return "IDHACK", None
+        best: Optional[Index] = None
+        for index in self.indexes.get(collection, {}).values():
+            if not index.covers(query):
+                continue
+            if best is None or self._rank(index) > self._rank(best):
+                best = index
+        return ("IXSCAN" if best else "COLLSCAN"), best
+
+    @staticmethod
+    def _rank(index: Index) -> Tuple[bool, int]:
+        """Order candidate indexes by expected selectivity."""
+        return isinstance(index, HashIndex), len(index.fields)
+
+    def _candidates(
+            self,
+            collection: str,
+            query: Dict[str, Any],
+            stage: str,
+            index: Optional[Index]
+    ) -> Iterable[Dict[str, Any]]:
+        """Return the documents a query has to examine."""
+        if stage == "IDHACK":
+            try:
+                doc_id = equality_value(query["_id"])[1]
+                slot = self.ids.get(collection, {}).get(doc_id)
+            except TypeError:
+                return []
+            return [] if slot is None else [self.data[collection][slot]]
+        if index is not None:
+            return index.lookup(query)
+        return self._documents(collection)
+
+    def _iter_matches(
+            self,
+            collection: str,
+            query: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield documents matching the query, using an index when possible."""
+        matches = compile_query(query)
+        stage, index = self._plan(collection, query)
+        for doc in self._candidates(collection, query, stage, index):
+            if matches(doc):
+                yield doc
+
+
+_STRUCTURES = (RedisHash, RedisList, SortedSet, Stream)
+
+
+def _sizeof(*values: Any) -> int:
+    """Estimate the memory held by some keys or values."""
+    return sum(sys.getsizeof(value) for value in values)
+
+
+def _copy_value(value: Any) -> Any:
+    """Copy a Redis value; strings and other scalars are shared."""
+    return value.copy() if isinstance(value, _STRUCTURES) else value
+
+
+@contextmanager
+def _holding(locks: Sequence[Any]) -> Iterator[None]:
+    """Acquire locks in the given order and release them in reverse."""
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+class _ThreadBatch(threading.local):
+    """Per-thread clock reading shared by the commands of a pipeline."""
+    batch_now: Optional[datetime] = None
+
+
+def _key_locked(method: F) -> F:
+    """Run a ``MockRedis`` command under the stripe lock of its key."""
+    @functools.wraps(method)
+    def wrapper(self: "MockRedis", key: str, *args: Any, **kwargs: Any) -> Any:
+        with self._stripe(key):
+            return method(self, key, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
 
 
 class MockRedis:
-    """Mock Redis for testing."""
+    """Mock Redis for testing.
 
-    def __init__(self):
+    Expired keys are reclaimed lazily on access and actively from a
+    min-heap of expiry times, ``active_expire_batch`` keys per command, so
+    unread keys do not pile up. With ``maxmemory`` set, writes evict keys
+    according to ``maxmemory_policy`` once the estimated memory use would
+    exceed the limit, like Redis does.
+
+    Besides strings it supports hashes, lists, sorted sets and streams from
+    ``redis_structures``. All keys live under ``prefix``, so ``data`` and
+    ``expires`` hold namespaced keys while commands take bare ones.
+
+    ``snapshot`` is copy-on-write at key granularity: the first write to a
+    key after a snapshot saves a copy of its value, size and expiry, and
+    ``restore`` puts back only those keys. LRU/LFU access history is not
+    rolled back.
+
+    For threads, each key maps to one of ``lock_stripes`` re-entrant
+    locks. A command holds its keys' stripes while it reads or changes
+    their values, so commands on keys in different stripes run
+    independently. The shared keyspace bookkeeping (memory accounting,
+    expiry heap, eviction order, snapshots) is updated under a separate
+    short-lived lock, always taken after the stripes. Transactional
+    pipelines hold the stripes of every queued key for the whole batch.
+    Expiry and eviction can drop a key another thread is writing; that
+    write then lands on the dropped value, as if it had come just before.
+    """
+
+    eviction_policies = ("noeviction", "allkeys-lru", "allkeys-lfu", "volatile-ttl")
+    active_expire_batch = 20
+    lock_stripes = 64
+    pipeline_commands = (
+        "get", "set", "delete", "mget", "mset",
+        "hset", "hget", "hgetall", "hdel", "hlen",
+        "zadd", "zrem", "zscore", "zcard", "zrangebyscore",
+        "lpush", "rpush", "lpop", "rpop", "llen",
+        "xadd", "xrange", "xlen",
+    )
+
+    def __init__(
+            self,
+            maxmemory: int = 0,
+            maxmemory_policy: str = "noeviction",
+            prefix: str = ""
+    ):
+        if maxmemory_policy not in self.eviction_policies:
+            raise ValueError(f"Unknown maxmemory policy: {maxmemory_policy}")
+        self.prefix = prefix
         self.data: Dict[str, Any] = {}
         self.expires: Dict[str, datetime] = {}
+        self.maxmemory = maxmemory
+        self.maxmemory_policy = maxmemory_policy
+        self.used_memory = 0
+        self.stats: Dict[str, int] = {"expired_keys": 0, "evicted_keys": 0}
+        self._sizes: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._freq: Dict[str, int] = {}
+        self._freq_buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+        self._snapshots: List[Dict[str, Any]] = []
+        self._stripes = [threading.RLock() for _ in range(self.lock_stripes)]
+        self._keyspace_lock = threading.RLock()
+        self._local = _ThreadBatch()
 
+    def snapshot(self) -> int:
+        """Open a snapshot and return its token for ``restore``."""
+        with self._all_stripes():
+            self._snapshots.append({"keys": {}, "stats": dict(self.stats)})
+            return len(self._snapshots)
+
+    def restore(self, snapshot: int) -> None:
+        """Undo every write made since the most recent open snapshot."""
+        with self._all_stripes():
+            if snapshot != len(self._snapshots):
+                raise ValueError("Snapshots must be restored most recent first")
+            layer = self._snapshots.pop()
+            for key, saved in layer["keys"].items():
+                if key in self.data:
+                    self._remove(key)
+                if saved is None:
+                    continue
+                value, size, expire_at = saved
+                if self._snapshots:
+                    # Outer snapshots share the saved copy, so keep it pristine
+                    value = _copy_value(value)
+                self.data[key] = value
+                self._sizes[key] = size
+                self.used_memory += size
+                if expire_at is not None:
+                    self.expires[key] = expire_at
+                    heapq.heappush(self._expiry_heap, (expire_at, key))
+                self._track(key)
+            self.stats = layer["stats"]
+
+    @classmethod
+    def from_config(cls, config: RedisConfig, **kwargs: Any) -> "MockRedis":
+        """Create a client namespaced by ``config.prefix``."""
+        return cls(prefix=config.prefix, **kwargs)
+
+    @_key_locked
     def get(self, key: str) -> Optional[str]:
         """Get a value from Redis."""
-        self._check_expiry(key)
-        return self.data.get(key)
+        return self._get(key, self._begin())
 
+    @_key_locked
     def set(
             self,
             key: str,
@@ -169,21 +1108,599 @@ def set(
             ex: Optional[int] = None
     ) -> bool:
         """Set a value in Redis with optional expiry."""
-        self.data[key] = value
-        if ex:
-            self.expires[key] = datetime.now(timezone.utc) + timedelta(seconds=ex)
-        return True
+        return self._set(key, value, ex, self._begin())
 
+    @_key_locked
     def delete(self, key: str) -> bool:
         """Delete a key from Redis."""
-        if key in self.data:
-            del self.data[key]
-            if key in self.expires:
-                del self.expires[key]
-            return True
-        return False
+        return self._delete(key, self._begin())
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """Get several values, reading the clock once for all of them."""
+        with self._stripes_for(keys):
+            return self._mget(keys, self._begin())
+
+    def mset(self, mapping: Dict[str, Any]) -> bool:
+        """Set several values without expiry."""
+        with self._stripes_for(mapping):
+            return self._mset(mapping, self._begin())
+
+    def pipeline(self, transaction: bool = True) -> "MockPipeline":
+        """Create a pipeline that buffers commands until ``execute``."""
+        return MockPipeline(self, transaction=transaction)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        """Return live keys in this namespace matching a glob pattern."""
+        with self._keyspace_lock:
+            now = self._begin()
+            found = []
+            for pkey in list(self.data):
+                if not pkey.startswith(self.prefix):
+                    continue
+                self._check_expiry(pkey, now)
+                key = pkey[len(self.prefix):]
+                if pkey in self.data and fnmatch.fnmatchcase(key, pattern):
+                    found.append(key)
+            return found
+
+    @_key_locked
+    def hset(
+            self,
+            key: str,
+            field: Optional[str] = None,
+            value: Any = None,
+            mapping: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Set hash fields; return how many were new. O(1) per field."""
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        if not items:
+            raise ValueError("hset needs a field/value pair or a mapping")
+        now = self._begin()
+        current = self._lookup(key, RedisHash, now) or {}
+        grow = sum(
+            _sizeof(v) - _sizeof(current[f]) if f in current else _sizeof(f, v)
+            for f, v in items.items()
+        )
+        target = self._writable(key, RedisHash, grow, now)
+        added = sum(1 for f in items if f not in target)
+        target.update(items)
+        return added
+
+    @_key_locked
+    def hget(self, key: str, field: str) -> Optional[Any]:
+        """Get one hash field. O(1)."""
+        target = self._lookup(key, RedisHash, self._begin())
+        return None if target is None else target.get(field)
+
+    @_key_locked
+    def hgetall(self, key: str) -> Dict[str, Any]:
+        """Get every field of a hash. O(n)."""
+        target = self._lookup(key, RedisHash, self._begin())
+        return {} if target is None else dict(target)
+
+    @_key_locked
+    def hdel(self, key: str, *fields: str) -> int:
+        """Delete hash fields; return how many existed. O(1) per field."""
+        target = self._lookup(key, RedisHash, self._begin())
+        if target is None:
+            return 0
+        self._preserve(self.prefix + key)
+        removed = [(f, target.pop(f)) for f in fields if f in target]
+        self._shrink(key, target, sum(_sizeof(f, v) for f, v in removed))
+        return len(removed)
+
+    @_key_locked
+    def hlen(self, key: str) -> int:
+        """Count hash fields. O(1)."""
+        target = self._lookup(key, RedisHash, self._begin())
+        return 0 if target is None else len(target)
+
+    @_key_locked
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        """Add or rescore members; return how many were new. O(log n) each."""
+        scores = {member: float(score) for member, score in mapping.items()}
+        now = self._begin()
+        current = self._lookup(key, SortedSet, now)
+        known = current.scores if current is not None else {}
+        grow = sum(_sizeof(m, s) for m, s in scores.items() if m not in known)
+        target = self._writable(key, SortedSet, grow, now)
+        return sum(target.add(member, score) for member, score in scores.items())
+
+    @_key_locked
+    def zrem(self, key: str, *members: str) -> int:
+        """Remove members; return how many existed. O(log n) each."""
+        target = self._lookup(key, SortedSet, self._begin())
+        if target is None:
+            return 0
+        self._preserve(self.prefix + key)
+        freed = 0
+        removed = 0
+        for member in members:
+            score = target.scores.get(member)
+            if score is not None and target.remove(member):
+                freed += _sizeof(member, score)
+                removed += 1
+        self._shrink(key, target, freed)
+        return removed
+
+    @_key_locked
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        """Get a member's score. O(1)."""
+        target = self._lookup(key, SortedSet, self._begin())
+        return None if target is None else target.scores.get(member)
+
+    @_key_locked
+    def zcard(self, key: str) -> int:
+        """Count members. O(1)."""
+        target = self._lookup(key, SortedSet, self._begin())
+        return 0 if target is None else len(target)
+
+    @_key_locked
+    def zrangebyscore(
+            self,
+            key: str,
+            min: Union[float, str],
+            max: Union[float, str],
+            start: Optional[int] = None,
+            num: Optional[int] = None,
+            withscores: bool = False
+    ) -> List[Any]:
+        """Members with scores in ``[min, max]``. O(log n + m).
+
+        Bounds accept ``"-inf"``, ``"+inf"`` and ``"(x"`` for exclusive
+        ranges; ``start``/``num`` work like LIMIT offset count.
+        """
+        target = self._lookup(key, SortedSet, self._begin())
+        if target is None:
+            return []
+        found = target.range_by_score(min, max, start or 0, num)
+        if withscores:
+            return list(found)
+        return [member for member, _ in found]
+
+    @_key_locked
+    def lpush(self, key: str, *values: Any) -> int:
+        """Prepend values; return the new length. O(1) each."""
+        target = self._writable(
+            key, RedisList, _sizeof(*values), self._begin()
+        )
+        target.extendleft(values)
+        return len(target)
+
+    @_key_locked
+    def rpush(self, key: str, *values: Any) -> int:
+        """Append values; return the new length. O(1) each."""
+        target = self._writable(
+            key, RedisList, _sizeof(*values), self._begin()
+        )
+        target.extend(values)
+        return len(target)
+
+    @_key_locked
+    def lpop(self, key: str) -> Optional[Any]:
+        """Pop from the head of a list. O(1)."""
+        return self._pop(key, left=True)
+
+    @_key_locked
+    def rpop(self, key: str) -> Optional[Any]:
+        """Pop from the tail of a list. O(1)."""
+        return self._pop(key, left=False)
+
+    @_key_locked
+    def llen(self, key: str) -> int:
+        """Length of a list. O(1)."""
+        target = self._lookup(key, RedisList, self._begin())
+        return 0 if target is None else len(target)
+
+    @_key_locked
+    def xadd(
+            self,
+            key: str,
+            fields: Dict[str, Any],
+            id: str = "*"
+    ) -> str:
+        """Append a stream entry and return its id. O(1)."""
+        now = self._begin()
+        current = self._lookup(key, Stream, now)
+        entry_id = format_stream_id((current or Stream()).next_id(id))
+        grow = _sizeof(*fields.keys(), *fields.values())
+        return self._writable(key, Stream, grow, now).add(fields, entry_id)
+
+    @_key_locked
+    def xrange(
+            self,
+            key: str,
+            min: str = "-",
+            max: str = "+",
+            count: Optional[int] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Entries with ids in ``[min, max]``. O(log n + m)."""
+        target = self._lookup(key, Stream, self._begin())
+        return [] if target is None else target.range(min, max, count)
+
+    @_key_locked
+    def xlen(self, key: str) -> int:
+        """Number of stream entries. O(1)."""
+        target = self._lookup(key, Stream, self._begin())
+        return 0 if target is None else len(target)
+
+    def purge_expired(self) -> int:
+        """Reclaim every key whose expiry has passed; return how many."""
+        with self._keyspace_lock:
+            return self._active_expire(limit=None)
+
+    def info(self) -> Dict[str, Any]:
+        """Return memory and keyspace statistics like Redis INFO."""
+        with self._keyspace_lock:
+            return {
+                "keys": len(self.data),
+                "expires": len(self.expires),
+                "used_memory": self.used_memory,
+                "maxmemory": self.maxmemory,
+                "maxmemory_policy": self.maxmemory_policy,
+                **self.stats,
+            }
+
+    def _stripe(self, key: str) -> threading.RLock:
+        """Return the lock for the stripe a key hashes to."""
+        return self._stripes[hash(key) % self.lock_stripes]
+
+    def _stripes_for(self, keys: Iterable[str]) -> ContextManager[None]:
+        """Hold the stripes of several keys, in stripe order."""
+        positions = sorted({hash(key) % self.lock_stripes for key in keys})
+        return _holding([self._stripes[position] for position in positions])
 
-    def _check_expiry(self, key: str) -> None:
+    def _all_stripes(self) -> ContextManager[None]:
+        """Hold every stripe and the keyspace lock, stopping all commands."""
+        return _holding(self._stripes + [self._keyspace_lock])
+
+    def _check_expiry(self, key: str, now: Optional[datetime] = None) -> None:
         """Check if a key has expired."""
-        if key in self.expires and datetime.now(timezone.utc) > self.expires[key]:
-            self.delete(key)
+        if key in self.expires and (now or self._now()) > self.expires[key]:
+            self._remove(key)
+            self.stats["expired_keys"] += 1
+
+    def _begin(self) -> datetime:
+        """Read the clock once for a command and run active expiry.
+
+        Inside a pipeline the clock was already read for the whole batch.
+        """
+        now = self._local.batch_now
+        if now is not None:
+            return now
+        now = self._now()
+        if self._expiry_heap:
+            with self._keyspace_lock:
+                self._active_expire(now)
+        return now
+
+    def _lookup(self, key: str, kind: type, now: datetime) -> Any:
+        """Return the live value of a key if it holds ``kind``, else None."""
+        with self._keyspace_lock:
+            pkey = self.prefix + key
+            self._check_expiry(pkey, now)
+            if pkey not in self.data:
+                return None
+            value = self.data[pkey]
+            if not isinstance(value, kind):
+                raise TypeError(
+                    "WRONGTYPE Operation against a key holding the wrong kind "
+                    "of value"
+                )
+            self._touch(pkey)
+            return value
+
+    def _writable(
+            self,
+            key: str,
+            kind: type,
+            grow: int,
+            now: datetime
+    ) -> Any:
+        """Return the value at a key, creating it, after making room."""
+        with self._keyspace_lock:
+            pkey = self.prefix + key
+            self._lookup(key, kind, now)
+            self._preserve(pkey)
+            if self.maxmemory:
+                new_key = 0 if pkey in self.data else _sizeof(pkey)
+                self._make_room(grow + new_key)
+            if pkey not in self.data:
+                self.data[pkey] = kind()
+                self._sizes[pkey] = _sizeof(pkey)
+                self.used_memory += self._sizes[pkey]
+                self._track(pkey)
+            self._sizes[pkey] += grow
+            self.used_memory += grow
+            return self.data[pkey]
+
+    def _shrink(self, key: str, value: Any, freed: int) -> None:
+        """Release memory after removing elements; drop emptied keys."""
+        with self._keyspace_lock:
+            pkey = self.prefix + key
+            if self.data.get(pkey) is not value:
+                return  # expired or evicted by another thread meanwhile
+            self._sizes[pkey] -= freed
+            self.used_memory -= freed
+            if not value:
+                self._remove(pkey)
+
+    def _pop(self, key: str, left: bool) -> Optional[Any]:
+        """Pop one list element from either end."""
+        target = self._lookup(key, RedisList, self._begin())
+        if target is None:
+            return None
+        self._preserve(self.prefix + key)
+        value = target.popleft() if left else target.pop()
+        self._shrink(key, target, _sizeof(value))
+        return value
+
+    def _get(self, key: str, now: datetime) -> Optional[str]:
+        """GET against an already-read clock."""
+        with self._keyspace_lock:
+            key = self.prefix + key
+            self._check_expiry(key, now)
+            if key not in self.data:
+                return None
+            value = self.data[key]
+            if isinstance(value, _STRUCTURES):
+                raise TypeError(
+                    "WRONGTYPE Operation against a key holding the wrong kind "
+                    "of value"
+                )
+            self._touch(key)
+            return value
+
+    def _set(
+            self,
+            key: str,
+            value: Any,
+            ex: Optional[int],
+            now: datetime
+    ) -> bool:
+        """SET against an already-read clock."""
+        with self._keyspace_lock:
+            key = self.prefix + key
+            self._preserve(key)
+            size = sys.getsizeof(key) + sys.getsizeof(value)
+            if self.maxmemory:
+                self._make_room(size - self._sizes.get(key, 0))
+            is_new = key not in self.data
+            self.data[key] = value
+            self.used_memory += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            if ex:
+                expire_at = now + timedelta(seconds=ex)
+                self.expires[key] = expire_at
+                heapq.heappush(self._expiry_heap, (expire_at, key))
+            else:
+                self.expires.pop(key, None)
+            if is_new:
+                self._track(key)
+            else:
+                self._touch(key)
+            return True
+
+    def _delete(self, key: str, now: datetime) -> bool:
+        """DEL against an already-read clock."""
+        with self._keyspace_lock:
+            key = self.prefix + key
+            self._check_expiry(key, now)
+            if key in self.data:
+                self._remove(key)
+                return True
+            return False
+
+    def _mget(self, keys: Sequence[str], now: datetime) -> List[Optional[str]]:
+        """MGET against an already-read clock."""
+        return [self._get(key, now) for key in keys]
+
+    def _mset(self, mapping: Dict[str, Any], now: datetime) -> bool:
+        """MSET against an already-read clock."""
+        for key, value in mapping.items():
+            self._set(key, value, None, now)
+        return True
+
+    @staticmethod
+    def _now() -> datetime:
+        """Return the current time used for expiry decisions."""
+        return datetime.now(timezone.utc)
+
+    def _active_expire(
+            self,
+            now: Optional[datetime] = None,
+            limit: Optional[int] = -1
+    ) -> int:
+        """Pop due entries off the expiry heap, at most ``limit`` keys.
+
+        Heap entries go stale when a key is deleted or re-set; those are
+        skipped by checking them against ``expires``. A ``limit`` of -1
+        means ``active_expire_batch`` and ``None`` means no limit.
+        """
+        if limit == -1:
+            limit = self.active_expire_batch
+        now = now or self._now()
+        heap = self._expiry_heap
+        reclaimed = 0
+        while heap and heap[0][0] < now and (limit is None or reclaimed < limit):
+            expire_at, key = heapq.heappop(heap)
+            if self.expires.get(key) == expire_at:
+                self._remove(key)
+                self.stats["expired_keys"] += 1
+                reclaimed += 1
+        if len(heap) > 2 * len(self.expires) + 64:
+            self._expiry_heap = [(at, key) for key, at in self.expires.items()]
+            heapq.heapify(self._expiry_heap)
+        return reclaimed
+
+    def _remove(self, key: str) -> None:
+        """Drop a key and all of its bookkeeping."""
+        self._preserve(key, copy_value=False)
+        del self.data[key]
+        self.expires.pop(key, None)
+        self.used_memory -= self._sizes.pop(key, 0)
+        self._lru.pop(key, None)
+        freq = self._freq.pop(key, None)
+        if freq is not None:
+            bucket = self._freq_buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._freq_buckets[freq]
+
+    def _preserve(self, key: str, copy_value: bool = True) -> None:
+        """Save a key's state in open snapshots before its first change.
+
+        A key saved in the innermost snapshot is already saved in every
+        outer one, so only that layer needs checking. A key about to be
+        removed can keep its value object instead of a copy.
+        """
+        with self._keyspace_lock:
+            if not self._snapshots or key in self._snapshots[-1]["keys"]:
+                return
+            saved = None
+            if key in self.data:
+                value = self.data[key]
+                saved = (
+                    _copy_value(value) if copy_value else value,
+                    self._sizes.get(key, 0),
+                    self.expires.get(key),
+                )
+            for layer in self._snapshots:
+                layer["keys"].setdefault(key, saved)
+
+    def _track(self, key: str) -> None:
+        """Start tracking a new key for the eviction policy."""
+        if self.maxmemory_policy == "allkeys-lru":
+            self._lru[key] = None
+        elif self.maxmemory_policy == "allkeys-lfu":
+            self._freq[key] = 1
+            self._freq_buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_freq = 1
+
+    def _touch(self, key: str) -> None:
+        """Record an access to an existing key in O(1)."""
+        if self.maxmemory_policy == "allkeys-lru":
+            self._lru.move_to_end(key)
+        elif self.maxmemory_policy == "allkeys-lfu":
+            freq = self._freq[key]
+            bucket = self._freq_buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self._freq_buckets[freq]
+                if self._min_freq == freq:
+                    self._min_freq = freq + 1
+            self._freq[key] = freq + 1
+            self._freq_buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def _make_room(self, needed: int) -> None:
+        """Evict keys until ``needed`` more bytes fit under ``maxmemory``."""
+        while self.used_memory + needed > self.maxmemory:
+            victim = self._eviction_candidate()
+            if victim is None:
+                raise RuntimeError(
+                    "OOM command not allowed when used memory > 'maxmemory'"
+                )
+            self._remove(victim)
+            self.stats["evicted_keys"] += 1
+
+    def _eviction_candidate(self) -> Optional[str]:
+        """Pick the key the configured policy would evict next."""
+        if self.maxmemory_policy == "allkeys-lru":
+            return next(iter(self._lru), None)
+        if self.maxmemory_policy == "allkeys-lfu":
+            if not self._freq_buckets:
+                return None
+            if self._min_freq not in self._freq_buckets:
+                self._min_freq = min(self._freq_buckets)
+            return next(iter(self._freq_buckets[self._min_freq]))
+        if self.maxmemory_policy == "volatile-ttl":
+            heap = self._expiry_heap
+            while heap:
+                expire_at, key = heap[0]
+                if self.expires.get(key) == expire_at:
+                    return key
+                heapq.heappop(heap)
+        return None
+
+
+class MockPipeline:
+    """Buffered command pipeline for ``MockRedis``.
+
+    Any command in ``MockRedis.pipeline_commands`` can be queued; queuing
+    returns the pipeline so calls chain. ``execute`` runs the batch back to
+    back against a single clock reading and returns the results in order.
+    With ``transaction`` the batch is one MULTI/EXEC unit that no other
+    command can interleave with; without it commands are merely sent
+    together. As with redis-py, a failing command does not stop the rest:
+    its exception is placed in the results and, with ``raise_on_error``,
+    the first one is raised after the batch.
+    """
+
+    def __init__(self, redis: MockRedis, transaction: bool = True):
+        self.redis = redis
+        self.transaction = transaction
+        self.commands: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., "MockPipeline"]:
+        if name not in MockRedis.pipeline_commands:
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> "MockPipeline":
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run every queued command and return their results."""
+        commands, self.commands = self.commands, []
+        if not commands:
+            return []
+        redis = self.redis
+        keys: List[str] = []
+        if self.transaction:
+            for name, args, kwargs in commands:
+                keys.extend(self._keys_of(name, args, kwargs))
+        results: List[Any] = []
+        with redis._stripes_for(keys):
+            redis._local.batch_now = redis._begin()
+            try:
+                for name, args, kwargs in commands:
+                    try:
+                        results.append(getattr(redis, name)(*args, **kwargs))
+                    except Exception as e:
+                        results.append(e)
+            finally:
+                redis._local.batch_now = None
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def reset(self) -> None:
+        """Discard queued commands."""
+        self.commands = []
+
+    @staticmethod
+    def _keys_of(
+            name: str,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any]
+    ) -> Iterable[str]:
+        """Return the keys a queued command touches."""
+        if name == "mget":
+            return args[0] if args else kwargs["keys"]
+        if name == "mset":
+            return args[0] if args else kwargs["mapping"]
+        return [args[0] if args else kwargs["key"]]
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __enter__(self) -> "MockPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.reset()
@@ -0,0 +1,83 @@
+"""Tests for the awaitable MockDB and MockRedis wrappers."""
+
+import asyncio
+import time
+
+import pytest
+
+from ..async_mocks import AsyncMockDB, AsyncMockRedis
+
+
+@pytest.mark.asyncio
+async def test_async_db_operations(async_db):
+    """Test CRUD, cursors and synchronous passthrough."""
+    await async_db.create_index("users", "age", ordered=True)
+    await async_db.insert_many(
+        "users", [{"name": f"user{i}", "age": i} for i in range(10)]
+    )
+    assert (await async_db.find_one("users", {"name": "user3"}))["age"] == 3
+
+    cursor = async_db.find("users", {"age": {"$gte": 5}}).sort("age", -1).skip(1)
+    assert [doc["age"] for doc in await cursor.to_list(2)] == [8, 7]
+    young = async_db.find("users", {"age": {"$lt": 2}})
+    assert [doc["age"] async for doc in young] == [0, 1]
+
+    snapshot = async_db.snapshot()
+    result = await async_db.update_many("users", {}, {"$set": {"active": True}})
+    assert result == 10
+    async_db.restore(snapshot)
+    assert await async_db.find_one("users", {"active": True}) is None
+    assert "age_sorted" in async_db.index_information("users")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_with_jitter():
+    """Test that many interleaved tasks neither lose nor duplicate writes."""
+    db = AsyncMockDB(latency=0.001, jitter=0.002, seed=1)
+
+    async def worker(n):
+        doc_id = await db.insert("events", {"worker": n})
+        await db.update_one("events", {"_id": doc_id}, {"$set": {"done": True}})
+        return doc_id
+
+    ids = await asyncio.gather(*(worker(n) for n in range(200)))
+    assert len(set(ids)) == 200
+    assert len(await db.find("events", {"done": True}).to_list()) == 200
+    assert db.stats["operations"] == 401
+    assert db.stats["max_in_flight"] > 1
+    assert db.stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_connection_pool_limits_concurrency():
+    """Test that max_connections caps in-flight operations."""
+    redis = AsyncMockRedis(latency=0.01, max_connections=5)
+    start = time.perf_counter()
+    await asyncio.gather(*(redis.set(f"key:{i}", i) for i in range(50)))
+    elapsed = time.perf_counter() - start
+    assert redis.stats["max_in_flight"] == 5
+    assert elapsed >= 0.09
+    assert redis.stats["pool_wait"] > 0
+    assert await redis.get("key:49") == 49
+
+    with pytest.raises(ValueError):
+        AsyncMockRedis(max_connections=0)
+    with pytest.raises(ValueError):
+        AsyncMockDB(latency=-1)
+
+
+@pytest.mark.asyncio
+async def test_async_redis_pipeline(async_redis):
+    """Test that a pipeline is sent in a single round trip."""
+    async with async_redis.pipeline() as pipe:
+        for i in range(100):
+            pipe.set(f"key:{i}", i)
+        pipe.hset("user:1", mapping={"name": "ada"})
+        assert len(pipe) == 101
+        results = await pipe.execute()
+    assert results[:2] == [True, True]
+    assert async_redis.stats["operations"] == 1
+    assert await async_redis.hget("user:1", "name") == "ada"
+    assert len(await async_redis.keys("key:*")) == 100
+    with pytest.raises(AttributeError):
+        async_redis.pipeline().not_a_command
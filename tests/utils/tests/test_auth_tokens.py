@@ -0,0 +1,74 @@
+"""Tests for cached JWT minting and verification."""
+
+import jwt
+import pytest
+
+from ..auth_tokens import TokenFactory
+from ..test_helpers import (JWT_ALGORITHM, JWT_SECRET, generate_test_token,
+                            generate_test_tokens, verify_test_token)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 1_700_000_000):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_tokens_match_pyjwt():
+    """Test that fast-path tokens are identical to jwt.encode output."""
+    factory = TokenFactory(JWT_SECRET, JWT_ALGORITHM)
+    claims = {"sub": "user_1", "role": "admin", "exp": 4_000_000_000}
+    assert factory.encode(claims) == jwt.encode(claims, JWT_SECRET, algorithm="HS256")
+    for algorithm in ("HS384", "HS512"):
+        other = TokenFactory(JWT_SECRET, algorithm)
+        assert jwt.decode(
+            other.encode(claims), JWT_SECRET, algorithms=[algorithm]
+        ) == claims
+
+
+def test_token_cache_refreshes_near_expiry():
+    """Test per-identity reuse until half the lifetime has passed."""
+    clock = FakeClock()
+    factory = TokenFactory(JWT_SECRET, clock=clock)
+    token = factory.token("user_1", "user", exp_minutes=30)
+    assert factory.token("user_1", "user", exp_minutes=30) == token
+    assert factory.token("user_1", "admin", exp_minutes=30) != token
+
+    clock.now += 15 * 60
+    assert factory.token("user_1", "user", exp_minutes=30) == token
+    clock.now += 1
+    refreshed = factory.token("user_1", "user", exp_minutes=30)
+    assert refreshed != token
+    assert factory.verify(refreshed)["exp"] == int(clock.now) + 30 * 60
+
+
+def test_verify_caches_claims():
+    """Test verification of minted, foreign, expired and forged tokens."""
+    clock = FakeClock()
+    factory = TokenFactory(JWT_SECRET, clock=clock)
+    tokens = factory.mint_batch([f"user_{i}" for i in range(100)], role="guest")
+    assert len(set(tokens)) == 100
+    assert factory.verify(tokens[42]) == {
+        "sub": "user_42", "role": "guest", "exp": int(clock.now) + 30 * 60
+    }
+
+    clock.now += 30 * 60
+    with pytest.raises(jwt.ExpiredSignatureError):
+        factory.verify(tokens[0])
+
+    factory.clear()
+    with pytest.raises(jwt.InvalidSignatureError):
+        factory.verify(jwt.encode({"sub": "x"}, "wrong_secret", algorithm="HS256"))
+
+
+def test_test_token_helpers():
+    """Test the module-level helpers built on the shared factory."""
+    token = generate_test_token(user_id="cached_user")
+    assert generate_test_token(user_id="cached_user") == token
+    assert verify_test_token(token)["sub"] == "cached_user"
+    tokens = generate_test_tokens(["a", "b", "c"], role="admin")
+    assert [verify_test_token(t)["sub"] for t in tokens] == ["a", "b", "c"]
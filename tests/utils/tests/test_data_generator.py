@@ -0,0 +1,52 @@
+"""Tests for the synthetic data generator."""
+
+import csv
+import json
+
+import pytest
+
+from ..data_generator import SyntheticDataGenerator, generate_test_rows
+from ..test_data.test_schemas import SCHEMAS, validate_many
+from ..test_helpers import MockDB
+
+
+@pytest.mark.parametrize("data_type", sorted(SCHEMAS))
+def test_generated_rows_are_valid(data_type):
+    """Test that every data type produces schema-valid rows."""
+    rows = generate_test_rows(data_type, 2500)
+    assert len(rows) == 2500
+    assert len(validate_many(data_type, rows)) == 2500
+
+
+def test_generator_is_seeded():
+    """Test reproducibility and chunking."""
+    generator = SyntheticDataGenerator(chunk_size=300)
+    first = generator.generate("crypto_prices", 1000)
+    assert generator.generate("crypto_prices", 1000) == first
+    assert SyntheticDataGenerator(seed=7).generate("crypto_prices", 1000) != first
+    assert [len(c) for c in generator.chunks("users", 1000)] == [300, 300, 300, 100]
+    assert len({row["id"] for row in first}) == 1000
+    with pytest.raises(ValueError):
+        generator.generate("unknown", 1)
+    with pytest.raises(ValueError):
+        SyntheticDataGenerator(chunk_size=0)
+
+
+def test_generator_outputs(tmp_path):
+    """Test NDJSON, CSV and MockDB output."""
+    generator = SyntheticDataGenerator(chunk_size=64)
+    expected = generator.generate("users", 200)
+
+    ndjson_path = tmp_path / "users.ndjson"
+    assert generator.to_ndjson("users", 200, ndjson_path) == 200
+    with open(ndjson_path) as f:
+        assert [json.loads(line) for line in f] == expected
+
+    csv_path = tmp_path / "campaigns.csv"
+    assert generator.to_csv("campaigns", 200, csv_path) == 200
+    with open(csv_path, newline="") as f:
+        assert len(validate_many("campaigns", list(csv.DictReader(f)))) == 200
+
+    db = MockDB()
+    assert generator.to_mock_db(db, "users", 200, collection="people") == 200
+    assert db.find_one("people", {"email": "user200@example.com"})["id"] == "USR199"
@@ -1,9 +1,11 @@
 """Tests for test data validation schemas."""
 
+import json
 from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
+from pydantic import ValidationError
 
 from ..test_data.test_schemas import (
     Campaign,
@@ -13,6 +15,8 @@
     DocumentStatus,
     User,
     UserRole,
+    validate_many,
+    validate_stream,
     validate_test_data,
 )
 
@@ -136,3 +140,78 @@ def test_validate_test_data():
         "source": ""
     }
     assert validate_test_data("crypto_prices", invalid_data) is False
+
+def test_validate_many():
+    """Test whole-batch validation."""
+    rows = [
+        {
+            "id": f"BTC_202403{day:02d}",
+            "symbol": "BTC",
+            "price": "65432.10",
+            "timestamp": "2024-03-25T00:00:00Z",
+            "source": "test_exchange"
+        }
+        for day in range(1, 11)
+    ]
+    models = validate_many("crypto_prices", rows)
+    assert len(models) == 10
+    assert all(isinstance(m, CryptoPrice) for m in models)
+
+    rows[3]["price"] = -1
+    with pytest.raises(ValidationError) as exc_info:
+        validate_many("crypto_prices", rows)
+    assert exc_info.value.errors()[0]["loc"] == (3, "price")
+
+    with pytest.raises(ValueError):
+        validate_many("invalid_type", [])
+
+def test_validate_stream(tmp_path):
+    """Test streaming validation of JSON and NDJSON inputs."""
+    rows = [
+        {
+            "id": f"USR{i:03d}",
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "role": "user",
+            "created_at": "2024-03-25T00:00:00Z"
+        }
+        for i in range(25)
+    ]
+    rows[7]["email"] = "invalid_email"
+    rows[19]["role"] = "invalid_role"
+
+    ndjson_path = tmp_path / "users.ndjson"
+    ndjson_path.write_text("\n".join(json.dumps(row) for row in rows))
+    json_path = tmp_path / "users.json"
+    json_path.write_text(json.dumps(rows))
+
+    for source in (ndjson_path, str(json_path), rows):
+        results = list(validate_stream("users", source, batch_size=10))
+        assert [r.index for r in results] == list(range(25))
+        assert [r.index for r in results if not r.valid] == [7, 19]
+        assert results[7].errors[0]["loc"] == ("email",)
+        assert results[8].model.name == "User 8"
+
+    errors = list(validate_stream("users", json_path, only_errors=True))
+    assert [(r.index, r.model) for r in errors] == [(7, None), (19, None)]
+
+def test_validate_stream_reports_corrupt_lines(tmp_path):
+    """Test that a malformed NDJSON line fails alone, with its line number."""
+    row = {
+        "id": "USR001",
+        "email": "user1@example.com",
+        "name": "User 1",
+        "role": "user",
+        "created_at": "2024-03-25T00:00:00Z"
+    }
+    path = tmp_path / "users.jsonl"
+    path.write_text("\n".join([
+        json.dumps(row), "", '{"id": "USR002", "email":', json.dumps(row)
+    ]))
+
+    results = list(validate_stream("users", path))
+    assert [r.valid for r in results] == [True, False, True]
+    assert results[1].model is None
+    assert results[1].errors[0]["type"] == "json_invalid"
+    assert results[1].errors[0]["line"] == 3
+    assert results[2].model.name == "User 1"
@@ -0,0 +1,67 @@
+"""Tests for duration-aware xdist scheduling."""
+
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+pytest.importorskip("xdist")
+
+from ..duration_scheduler import SUPPORTED, DurationScheduling  # noqa: E402
+
+
+class FakeConfig:
+    """The options ``LoadScheduling`` reads from a pytest config."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+
+    def getvalue(self, name: str) -> List[str]:
+        return [f"{self.workers}*popen"]
+
+    def getoption(self, name: str) -> None:
+        return None
+
+
+class FakeNode:
+    """Worker controller recording the test indexes it is sent."""
+
+    def __init__(self, name: str):
+        self.gateway = SimpleNamespace(id=name)
+        self.sent: List[int] = []
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices: List[int]) -> None:
+        self.sent.extend(indices)
+
+    def shutdown(self) -> None:
+        self.shutting_down = True
+
+
+def test_slowest_tests_are_sent_first():
+    """Test that recorded durations decide the initial distribution."""
+    assert SUPPORTED
+    collection = [f"test_mod.py::test_{i}" for i in range(8)]
+    durations = {
+        "test_mod.py::test_5": 9.0,
+        "test_mod.py::test_2": 7.0,
+        "test_mod.py::test_7": 5.0,
+        "test_mod.py::test_0": 3.0,
+    }
+    scheduler = DurationScheduling(FakeConfig(2), durations=durations)
+    nodes = [FakeNode("gw0"), FakeNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    scheduler.schedule()
+
+    first = [collection[i] for node in nodes for i in node.sent]
+    assert first == [
+        "test_mod.py::test_5", "test_mod.py::test_2",
+        "test_mod.py::test_7", "test_mod.py::test_0",
+    ]
+    # Tests without history follow in collection order
+    assert [collection[i] for i in scheduler.pending] == [
+        "test_mod.py::test_1", "test_mod.py::test_3",
+        "test_mod.py::test_4", "test_mod.py::test_6",
+    ]
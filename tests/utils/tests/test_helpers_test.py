@@ -2,9 +2,13 @@
 
 import base64
 import json
+import sys
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+import pytest
+
+from ..test_data.db_utils import load_db_config
 from ..test_helpers import (
     MockDB,
     MockRedis,
@@ -180,3 +184,441 @@ def test_mock_redis():
     # Test non-existent key
     assert redis.get("nonexistent") is None
     assert redis.delete("nonexistent") is False
+
+def test_mock_db_indexes():
+    """Test hash indexes on the mock database."""
+    db = MockDB()
+    collection = "prices"
+    for i in range(20):
+        db.insert(collection, {"symbol": f"SYM{i % 4}", "day": i % 5, "n": i})
+
+    # Single-field index is picked up automatically
+    assert db.create_index(collection, "symbol") == "symbol_1"
+    plan = db.explain(collection, {"symbol": "SYM1"})
+    assert plan["stage"] == "IXSCAN"
+    assert plan["index"] == "symbol_1"
+    assert plan["docs_examined"] == 5
+    assert plan["n_returned"] == 5
+
+    # Compound index is preferred when it covers more of the query
+    assert db.create_index(collection, ["symbol", "day"]) == "symbol_1_day_1"
+    plan = db.explain(collection, {"symbol": "SYM1", "day": 1})
+    assert plan["index"] == "symbol_1_day_1"
+    assert plan["docs_examined"] == plan["n_returned"] == 1
+
+    # Queries on unindexed fields fall back to a scan
+    plan = db.explain(collection, {"n": 3})
+    assert plan["stage"] == "COLLSCAN"
+    assert plan["index"] is None
+    assert plan["docs_examined"] == 20
+
+    # Indexes stay correct across updates, inserts and deletes
+    db.update_one(collection, {"n": 1}, {"$set": {"symbol": "NEW"}})
+    assert [d["n"] for d in db.find(collection, {"symbol": "NEW"})] == [1]
+    assert len(db.find(collection, {"symbol": "SYM1"})) == 4
+
+    db.insert(collection, {"symbol": "NEW", "day": 0, "n": 20})
+    assert len(db.find(collection, {"symbol": "NEW"})) == 2
+
+    assert db.delete_one(collection, {"symbol": "NEW", "n": 1}) is True
+    assert [d["n"] for d in db.find(collection, {"symbol": "NEW"})] == [20]
+    assert db.explain(collection, {"symbol": "NEW"})["docs_examined"] == 1
+
+    assert db.drop_index(collection, "symbol_1") is True
+    assert list(db.index_information(collection)) == ["symbol_1_day_1"]
+
+def test_mock_db_primary_key_and_compaction():
+    """Test _id lookups, tombstones and compaction."""
+    db = MockDB()
+    collection = "items"
+    ids = [db.insert(collection, {"n": i}) for i in range(200)]
+
+    plan = db.explain(collection, {"_id": ids[10]})
+    assert plan["stage"] == "IDHACK"
+    assert plan["index"] == "_id_"
+    assert plan["docs_examined"] == 1
+
+    # Deletes leave tombstones until compaction kicks in
+    for doc_id in ids[:50]:
+        assert db.delete_one(collection, {"_id": doc_id}) is True
+    assert len(db.data[collection]) == 200
+    assert db.tombstones[collection] == 50
+    assert db.find_one(collection, {"_id": ids[0]}) is None
+    assert db.find_one(collection, {"n": 0}) is None
+
+    for doc_id in ids[50:150]:
+        db.delete_one(collection, {"_id": doc_id})
+    assert db.tombstones[collection] < db.compact_min_tombstones
+    assert len(db.data[collection]) < 200
+
+    # Slots stay consistent after compaction
+    assert [d["n"] for d in db.find(collection, {})] == list(range(150, 200))
+    assert db.find_one(collection, {"_id": ids[199]})["n"] == 199
+    assert db.update_one(collection, {"_id": ids[150]}, {"$set": {"n": -1}})
+    assert db.find_one(collection, {"_id": ids[150]})["n"] == -1
+
+    with pytest.raises(ValueError):
+        db.update_one(collection, {"_id": ids[150]}, {"$set": {"_id": "x"}})
+
+def test_mock_db_bulk_operations():
+    """Test batch inserts, updates, deletes and bulk_write."""
+    db = MockDB()
+    collection = "prices"
+    db.create_index(collection, "symbol")
+
+    ids = db.insert_many(
+        collection,
+        [{"symbol": "BTC" if i % 2 else "ETH", "n": i} for i in range(100)]
+    )
+    assert len(ids) == len(set(ids)) == 100
+    assert db.find_one(collection, {"_id": ids[42]})["n"] == 42
+    assert len(db.find(collection, {"symbol": "BTC"})) == 50
+
+    assert db.update_many(
+        collection, {"symbol": "ETH"}, {"$set": {"symbol": "SOL"}}
+    ) == 50
+    assert list(db.find(collection, {"symbol": "ETH"})) == []
+    assert db.explain(collection, {"symbol": "SOL"})["docs_examined"] == 50
+
+    assert db.delete_many(collection, {"symbol": "SOL"}) == 50
+    assert db.delete_many(collection, {"symbol": "SOL"}) == 0
+    assert len(db.find(collection, {})) == 50
+
+    result = db.bulk_write(collection, [
+        {"insert_one": {"document": {"symbol": "ADA", "n": 100}}},
+        {"insert_one": {"document": {"symbol": "ADA", "n": 101}}},
+        {"update_one": {"filter": {"symbol": "ADA"},
+                        "update": {"$set": {"n": 0}}}},
+        {"update_many": {"filter": {"symbol": "BTC"},
+                         "update": {"$set": {"seen": True}}}},
+        {"update_many": {"filter": {"symbol": "BTC", "n": {"$lt": 10}},
+                         "update": {"$set": {"seen": True}}}},
+        {"delete_one": {"filter": {"n": 1}}},
+        {"delete_many": {"filter": {"symbol": "missing"}}},
+    ])
+    # The second update_many matches 5 documents but changes none
+    assert result == {
+        "inserted_count": 2,
+        "matched_count": 56,
+        "modified_count": 51,
+        "deleted_count": 1,
+    }
+    assert db.update_many(
+        collection, {"symbol": "BTC"}, {"$set": {"seen": True, "n": 7}}
+    ) == 48  # all but the one with n == 7
+    assert sorted(d["n"] for d in db.find(collection, {"symbol": "ADA"})) == [0, 101]
+
+    with pytest.raises(ValueError):
+        db.bulk_write(collection, [{"replace_one": {"filter": {}}}])
+
+def test_mock_db_range_queries():
+    """Test operator queries and sorted indexes on the mock database."""
+    db = MockDB()
+    collection = "crypto_prices"
+    start = datetime(2024, 3, 25, tzinfo=timezone.utc)
+    db.insert_many(collection, [
+        {
+            "symbol": "BTC" if i % 2 else "ETH",
+            "timestamp": start + timedelta(hours=i),
+            "meta": {"source": "test_exchange"},
+        }
+        for i in range(48)
+    ])
+    window = {
+        "timestamp": {
+            "$gte": start + timedelta(hours=10),
+            "$lt": start + timedelta(hours=20),
+        },
+        "meta.source": "test_exchange",
+    }
+    assert db.explain(collection, window)["stage"] == "COLLSCAN"
+    assert len(db.find(collection, window)) == 10
+
+    assert db.create_index(collection, "timestamp", ordered=True) == (
+        "timestamp_sorted"
+    )
+    plan = db.explain(collection, window)
+    assert plan["stage"] == "IXSCAN"
+    assert plan["index"] == "timestamp_sorted"
+    assert plan["docs_examined"] == plan["n_returned"] == 10
+
+    # Hash indexes win for equality, sorted indexes follow updates
+    db.create_index(collection, "symbol")
+    plan = db.explain(collection, {**window, "symbol": "BTC"})
+    assert plan["index"] == "symbol_1"
+    assert plan["n_returned"] == 5
+
+    db.update_many(
+        collection,
+        {"timestamp": {"$lt": start + timedelta(hours=5)}},
+        {"$set": {"timestamp": start + timedelta(days=7)}}
+    )
+    late = {"timestamp": {"$gt": start + timedelta(days=6)}}
+    assert db.explain(collection, late)["docs_examined"] == 5
+    assert len(db.find(collection, {"$or": [late, {"symbol": "none"}]})) == 5
+
+def test_mock_db_cursor():
+    """Test lazy cursors with sort, skip, limit and projection."""
+    db = MockDB()
+    collection = "campaigns"
+    db.insert_many(collection, [
+        {"name": f"Campaign {i:03d}", "budget": (i * 37) % 100, "status": "active"}
+        for i in range(100)
+    ])
+    db.insert(collection, {"name": "No budget", "status": "draft"})
+
+    cursor = db.find(collection, {"status": "active"})
+    assert next(cursor)["name"] == "Campaign 000"
+    with pytest.raises(RuntimeError):
+        cursor.limit(5)
+
+    # Top-k through a heap when a limit is set
+    page = db.find(collection).sort("budget", -1).skip(2).limit(3)
+    assert page.explain()["sort_stage"] == "TOP_K"
+    assert [d["budget"] for d in page] == [97, 96, 95]
+
+    # Missing values sort first, like Mongo's null ordering
+    first = db.find(collection, projection={"name": 1, "_id": 0}).sort("budget")
+    assert first[0] == {"name": "No budget"}
+    assert len(first) == 101
+
+    # A sorted index on the sort key is walked instead of sorting
+    db.create_index(collection, "budget", ordered=True)
+    cursor = db.find(collection, {"budget": {"$gte": 90}}).sort("budget", -1)
+    assert cursor.explain()["sort_stage"] == "INDEX"
+    assert [d["budget"] for d in cursor.limit(3)] == [99, 98, 97]
+
+    ordered = db.find(collection, {"status": "active"}).sort(
+        [("status", 1), ("budget", -1), ("name", 1)]
+    ).limit(2)
+    assert ordered.explain()["sort_stage"] == "TOP_K"
+    assert [d["budget"] for d in ordered] == [99, 98]
+
+    # Exclusion projections copy documents rather than mutating them
+    doc = db.find(collection, {"budget": 0}, projection={"status": 0})[0]
+    assert "status" not in doc
+    assert db.find_one(collection, {"budget": 0})["status"] == "active"
+    with pytest.raises(ValueError):
+        db.find_one(collection, {}, projection={"name": 1, "status": 0})
+
+def test_mock_redis_active_expiry():
+    """Test that expired keys are reclaimed without being read."""
+    redis = MockRedis()
+    for i in range(50):
+        redis.set(f"soak:{i}", i, ex=60)
+    redis.set("keep", "value", ex=60)
+    redis.set("keep", "value")  # SET without ex clears the TTL
+
+    # Pretend the TTLs passed by rewinding the heap entries
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    redis._expiry_heap = [(past, key) for key in redis.expires]
+    redis.expires = {key: past for key in redis.expires}
+
+    redis.set("other", "value")
+    assert redis.info()["expired_keys"] == redis.active_expire_batch
+    assert redis.purge_expired() == 50 - redis.active_expire_batch
+    assert set(redis.data) == {"keep", "other"}
+    assert redis.expires == {}
+    assert redis.info()["keys"] == 2
+
+def test_mock_redis_eviction_policies():
+    """Test maxmemory eviction policies."""
+    size = sys.getsizeof("k0") + sys.getsizeof("v" * 10)
+
+    lru = MockRedis(maxmemory=size * 3, maxmemory_policy="allkeys-lru")
+    for i in range(3):
+        lru.set(f"k{i}", "v" * 10)
+    lru.get("k0")
+    lru.set("k3", "v" * 10)
+    assert set(lru.data) == {"k0", "k2", "k3"}
+    assert lru.info()["evicted_keys"] == 1
+    assert lru.used_memory <= lru.maxmemory
+
+    lfu = MockRedis(maxmemory=size * 3, maxmemory_policy="allkeys-lfu")
+    for i in range(3):
+        lfu.set(f"k{i}", "v" * 10)
+    for _ in range(3):
+        lfu.get("k0")
+        lfu.get("k2")
+    lfu.set("k3", "v" * 10)
+    assert set(lfu.data) == {"k0", "k2", "k3"}
+
+    ttl = MockRedis(maxmemory=size * 3, maxmemory_policy="volatile-ttl")
+    ttl.set("k0", "v" * 10)
+    ttl.set("k1", "v" * 10, ex=100)
+    ttl.set("k2", "v" * 10, ex=10)
+    ttl.set("k3", "v" * 10)
+    assert set(ttl.data) == {"k0", "k1", "k3"}
+    ttl.delete("k1")
+    ttl.set("k1", "v" * 10)
+    with pytest.raises(RuntimeError):
+        ttl.set("k4", "v" * 10)
+
+    full = MockRedis(maxmemory=size, maxmemory_policy="noeviction")
+    full.set("k0", "v" * 10)
+    with pytest.raises(RuntimeError):
+        full.set("k1", "v" * 10)
+    with pytest.raises(ValueError):
+        MockRedis(maxmemory_policy="allkeys-random")
+
+def test_mock_redis_batch_commands():
+    """Test MGET/MSET and pipelines."""
+    redis = MockRedis()
+    assert redis.mset({"a": "1", "b": "2"}) is True
+    assert redis.mget(["a", "missing", "b"]) == ["1", None, "2"]
+
+    calls = []
+    now = MockRedis._now
+
+    def counting_now():
+        calls.append(1)
+        return now()
+    redis._now = counting_now
+
+    with redis.pipeline() as pipe:
+        pipe.set("c", "3", ex=60).get("c").delete("a").mget(["a", "b", "c"])
+        assert len(pipe) == 4
+        assert pipe.execute() == [True, "3", True, [None, "2", "3"]]
+        assert len(pipe) == 0
+    assert len(calls) == 1
+    assert "c" in redis.expires
+
+    # Errors are collected per command and raised after the batch
+    full = MockRedis(maxmemory=1)
+    pipe = full.pipeline().set("x", "1").get("x")
+    results = pipe.execute(raise_on_error=False)
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] is None
+    with pytest.raises(RuntimeError):
+        full.pipeline().set("x", "1").execute()
+
+def test_mock_redis_data_structures():
+    """Test hashes, sorted sets, lists and streams."""
+    config = load_db_config().redis
+    redis = MockRedis.from_config(config)
+
+    assert redis.hset("user:1", mapping={"name": "Test", "role": "user"}) == 2
+    assert redis.hset("user:1", "role", "admin") == 0
+    assert redis.hget("user:1", "role") == "admin"
+    assert redis.hgetall("user:1") == {"name": "Test", "role": "admin"}
+    assert redis.hdel("user:1", "name", "missing") == 1
+    assert redis.hlen("user:1") == 1
+
+    assert redis.zadd("leaderboard", {"BTC": 65432.1, "ETH": 3456.78}) == 2
+    assert redis.zadd("leaderboard", {"SOL": 150, "ETH": 3500}) == 1
+    assert redis.zrangebyscore("leaderboard", 100, 5000) == ["SOL", "ETH"]
+    assert redis.zrangebyscore(
+        "leaderboard", "(150", "+inf", withscores=True
+    ) == [("ETH", 3500.0), ("BTC", 65432.1)]
+    assert redis.zrem("leaderboard", "SOL") == 1
+    assert redis.zcard("leaderboard") == 2
+    assert redis.zscore("leaderboard", "BTC") == 65432.1
+
+    assert redis.lpush("queue", "a", "b") == 2
+    assert redis.rpush("queue", "c") == 3
+    assert [redis.rpop("queue"), redis.lpop("queue")] == ["c", "b"]
+    assert redis.rpop("queue") == "a"
+    assert redis.rpop("queue") is None
+    assert redis.llen("queue") == 0
+
+    first = redis.xadd("ticks", {"symbol": "BTC", "price": "65432.10"})
+    redis.xadd("ticks", {"symbol": "ETH", "price": "3456.78"})
+    assert redis.xlen("ticks") == 2
+    assert redis.xrange("ticks", count=1) == [
+        (first, {"symbol": "BTC", "price": "65432.10"})
+    ]
+
+    # Keys are namespaced by the configured prefix
+    assert sorted(redis.keys()) == ["leaderboard", "ticks", "user:1"]
+    assert all(key.startswith(config.prefix) for key in redis.data)
+    assert redis.keys("user:*") == ["user:1"]
+
+    with pytest.raises(TypeError):
+        redis.get("leaderboard")
+    with pytest.raises(TypeError):
+        redis.hset("ticks", "field", "value")
+
+    with redis.pipeline() as pipe:
+        pipe.zadd("leaderboard", {"ADA": 1}).zcard("leaderboard")
+        assert pipe.execute() == [1, 3]
+
+def test_mock_db_snapshot_restore():
+    """Test rolling MockDB back to a snapshot."""
+    db = MockDB()
+    db.compact_min_tombstones = 1
+    db.create_index("users", "role")
+    ids = db.insert_many("users", [
+        {"name": f"user{i}", "role": "admin" if i % 2 else "user",
+         "profile": {"age": 20 + i}}
+        for i in range(10)
+    ])
+    before = [dict(doc, profile=dict(doc["profile"])) for doc in db.find("users")]
+
+    outer = db.snapshot()
+    db.update_many("users", {"role": "admin"}, {"$set": {"profile.age": 99}})
+    inner = db.snapshot()
+    db.delete_many("users", {"role": "user"})  # triggers compaction
+    db.insert("users", {"name": "new", "role": "user"})
+    db.insert("events", {"kind": "login"})
+    db.drop_index("users", "role_1")
+    db.create_index("users", "name")
+    with pytest.raises(ValueError):
+        db.restore(outer)
+
+    db.restore(inner)
+    assert "events" not in db.data
+    assert db.index_information("users") == {"role_1": ["role"]}
+    assert len(db.find("users", {"role": "user"})) == 5
+    assert db.find_one("users", {"_id": ids[1]})["profile"]["age"] == 99
+
+    db.restore(outer)
+    assert list(db.find("users")) == before
+    assert db.explain("users", {"role": "admin"})["n_returned"] == 5
+    assert db.find_one("users", {"_id": ids[0]})["name"] == "user0"
+    assert db._journal is None
+
+def test_mock_redis_snapshot_restore():
+    """Test rolling MockRedis back to a snapshot."""
+    redis = MockRedis()
+    redis.set("counter", "1", ex=60)
+    redis.hset("user:1", mapping={"name": "Alice"})
+    redis.zadd("scores", {"a": 1, "b": 2})
+    redis.rpush("queue", "x", "y")
+    memory = redis.info()["used_memory"]
+
+    snapshot = redis.snapshot()
+    redis.set("counter", "2")
+    redis.hset("user:1", "name", "Bob")
+    redis.zadd("scores", {"c": 3})
+    redis.zrem("scores", "a")
+    redis.lpop("queue")
+    redis.delete("queue")
+    redis.set("temp", "value")
+    redis.xadd("events", {"kind": "login"})
+    redis.restore(snapshot)
+
+    assert redis.get("counter") == "1"
+    assert "counter" in redis.expires
+    assert redis.hgetall("user:1") == {"name": "Alice"}
+    assert redis.zrangebyscore("scores", "-inf", "+inf", withscores=True) == [
+        ("a", 1.0), ("b", 2.0)
+    ]
+    assert redis.info()["used_memory"] == memory
+    assert [redis.lpop("queue"), redis.lpop("queue")] == ["x", "y"]
+    assert redis.get("temp") is None
+    assert redis.xlen("events") == 0
+    with pytest.raises(ValueError):
+        redis.restore(snapshot)
+
+def test_seeded_fixtures_roll_back(seeded_db, seeded_redis):
+    """Test the session-seeded fixtures and that they start clean."""
+    assert len(seeded_db.find("users")) == 1000
+    assert seeded_db.explain("users", {"id": "USR001"})["stage"] == "IXSCAN"
+    assert seeded_redis.hget("user:USR001", "id") == "USR001"
+    seeded_db.delete_many("users", {})
+    seeded_redis.delete("user:USR001")
+
+def test_seeded_fixtures_are_isolated(seeded_db, seeded_redis):
+    """Test that writes from the previous test were rolled back."""
+    assert len(seeded_db.find("users")) == 1000
+    assert seeded_redis.hget("user:USR001", "id") == "USR001"
@@ -0,0 +1,92 @@
+"""Tests for the mock database query engine."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from ..query_engine import MISSING, compile_query, get_path, set_path
+
+
+def test_get_and_set_path():
+    """Test dotted path resolution and assignment."""
+    doc = {"a": {"b": [{"c": 1}, {"c": 2}]}, "x": None}
+    assert get_path(doc, "a.b.1.c") == 2
+    assert get_path(doc, "x") is None
+    assert get_path(doc, "a.missing") is MISSING
+    assert get_path(doc, "a.b.5.c") is MISSING
+
+    set_path(doc, "meta.source.name", "test_exchange")
+    assert doc["meta"] == {"source": {"name": "test_exchange"}}
+
+
+def test_comparison_operators():
+    """Test comparison, membership and existence operators."""
+    doc = {"price": 100, "symbol": "BTC", "tags": ["a"], "meta": {"v": 2}}
+
+    assert compile_query({"price": {"$gt": 50, "$lte": 100}})(doc)
+    assert not compile_query({"price": {"$lt": 100}})(doc)
+    assert compile_query({"symbol": {"$in": ["BTC", "ETH"]}})(doc)
+    assert compile_query({"symbol": {"$nin": ["ETH"]}})(doc)
+    assert compile_query({"symbol": {"$ne": "ETH"}})(doc)
+    assert compile_query({"tags": {"$in": [["a"], ["b"]]}})(doc)
+    assert compile_query({"meta.v": {"$gte": 2}})(doc)
+    assert compile_query({"volume": {"$exists": False}})(doc)
+    assert not compile_query({"volume": {"$exists": True}})(doc)
+
+    # Missing fields behave like null, mismatched types never match
+    assert compile_query({"volume": None})(doc)
+    assert compile_query({"volume": {"$ne": 1}})(doc)
+    assert not compile_query({"volume": {"$gt": 0}})(doc)
+    assert not compile_query({"symbol": {"$gt": 5}})(doc)
+
+
+def test_logical_operators():
+    """Test $and, $or and $nor."""
+    doc = {"symbol": "ETH", "price": 3000}
+    assert compile_query({"$or": [{"symbol": "BTC"}, {"price": {"$gt": 10}}]})(doc)
+    assert not compile_query({"$and": [{"symbol": "ETH"}, {"price": 1}]})(doc)
+    assert compile_query({"$nor": [{"symbol": "BTC"}]})(doc)
+    assert compile_query({})(doc)
+
+
+def test_compiled_queries_are_cached():
+    """Test that equal queries reuse one compiled predicate."""
+    when = datetime(2024, 3, 25, tzinfo=timezone.utc)
+    first = compile_query({"timestamp": {"$gte": when}, "symbol": "BTC"})
+    second = compile_query({"symbol": "BTC", "timestamp": {"$gte": when}})
+    assert first is second
+
+
+def test_container_types_are_cached_apart():
+    """Test that list and tuple operands do not share a compiled predicate."""
+    doc = {"a": [1, 2]}
+    assert compile_query({"a": [1, 2]})(doc)
+    assert not compile_query({"a": (1, 2)})(doc)
+    assert compile_query({"a": [1, 2]}) is not compile_query({"a": (1, 2)})
+
+
+def test_cached_queries_ignore_later_changes():
+    """Test that mutating a query's operands does not change its predicate."""
+    symbols = ["BTC", "ETH"]
+    meta = {"v": 2}
+    query = {"symbol": {"$in": symbols}, "meta": {"$eq": meta}}
+    predicate = compile_query(query)
+    doc = {"symbol": "ETH", "meta": {"v": 2}}
+    symbols.remove("ETH")
+    meta["v"] = 3
+    assert predicate(doc)
+    assert compile_query({"symbol": {"$in": ["BTC"]}, "meta": {"v": 3}})(
+        {"symbol": "BTC", "meta": {"v": 3}}
+    )
+
+
+def test_invalid_queries():
+    """Test that unknown operators are rejected."""
+    with pytest.raises(ValueError):
+        compile_query({"price": {"$regex": "1"}})
+    with pytest.raises(ValueError):
+        compile_query({"$where": "true"})
+    with pytest.raises(ValueError):
+        compile_query({"$or": []})
+    with pytest.raises(ValueError):
+        compile_query({"symbol": {"$in": "BTC"}})
@@ -0,0 +1,85 @@
+"""Tests for mock Redis value types."""
+
+import random
+
+import pytest
+
+from ..redis_structures import SortedSet, Stream, parse_score_bound
+
+
+def test_sorted_set_matches_reference():
+    """Test the skiplist against a plain sorted list."""
+    rng = random.Random(42)
+    zset = SortedSet()
+    reference = {}
+    for _ in range(2000):
+        member = f"m{rng.randrange(300)}"
+        if rng.random() < 0.3:
+            assert zset.remove(member) == (member in reference)
+            reference.pop(member, None)
+        else:
+            score = rng.randrange(100)
+            assert zset.add(member, score) == (member not in reference)
+            reference[member] = score
+
+    expected = sorted((s, m) for m, s in reference.items() if 10 <= s <= 50)
+    found = list(zset.range_by_score(10, 50))
+    assert found == [(m, s) for s, m in expected]
+    assert len(zset) == len(reference)
+
+    exclusive = list(zset.range_by_score("(10", "(50"))
+    assert all(10 < score < 50 for _, score in exclusive)
+    page = list(zset.range_by_score("-inf", "+inf", offset=5, count=3))
+    assert page == [(m, s) for s, m in sorted(
+        (s, m) for m, s in reference.items()
+    )][5:8]
+
+
+def test_parse_score_bound():
+    """Test ZRANGEBYSCORE bound parsing."""
+    assert parse_score_bound(1) == (1.0, False)
+    assert parse_score_bound("(1.5") == (1.5, True)
+    assert parse_score_bound("-inf") == (float("-inf"), False)
+
+
+def test_stream_ids_and_ranges():
+    """Test XADD id generation and XRANGE slicing."""
+    stream = Stream()
+    assert stream.add({"price": "1"}, "1000-0") == "1000-0"
+    assert stream.add({"price": "2"}, "1000-*") == "1000-1"
+    assert stream.add({"price": "3"}, "2000") == "2000-0"
+    auto = stream.add({"price": "4"})
+    assert tuple(map(int, auto.split("-"))) > (2000, 0)
+
+    with pytest.raises(ValueError):
+        stream.add({"price": "5"}, "1500-0")
+
+    assert [i for i, _ in stream.range("1000", "1000")] == ["1000-0", "1000-1"]
+    assert [i for i, _ in stream.range("1000-1", "+", count=2)] == [
+        "1000-1", "2000-0"
+    ]
+    assert stream.range("-", "+")[0][1] == {"price": "1"}
+    assert len(stream) == 4
+
+
+def test_structure_copies_are_independent():
+    """Test copies used by MockRedis snapshots."""
+    original = SortedSet()
+    for i in range(200):
+        original.add(f"m{i}", float(i % 17))
+    clone = original.copy()
+    assert list(clone.range_by_score("-inf", "+inf")) == list(
+        original.range_by_score("-inf", "+inf")
+    )
+    clone.add("new", 5.0)
+    clone.remove("m0")
+    assert "new" not in original.scores
+    assert original.scores["m0"] == 0.0
+    assert list(clone.range_by_score(5, 5))[-1] == ("new", 5.0)
+
+    stream = Stream()
+    stream.add({"a": 1}, "1-1")
+    stream_clone = stream.copy()
+    stream_clone.add({"b": 2}, "2-1")
+    assert len(stream) == 1
+    assert len(stream_clone) == 2
@@ -0,0 +1,86 @@
+"""Tests for the sample data store."""
+
+import json
+import os
+
+import pytest
+
+from ..test_data.sample_store import (SampleStore, get_sample_store,
+                                      write_ndjson_samples)
+from .. import test_helpers
+from ..test_helpers import load_test_data
+
+
+def test_json_store_sections():
+    """Test lazy, cached access to the JSON samples file."""
+    store = get_sample_store()
+    assert store is get_sample_store()
+    assert not store.is_ndjson
+    assert set(store.sections()) == {
+        "crypto_prices", "documents", "campaigns", "users"
+    }
+    users = store.section("users")
+    assert store.section("users") is users
+    assert store.row("users", 0) == users[0]
+    assert store.count("users") == len(users)
+    assert list(store.iter_section("users")) == users
+    with pytest.raises(KeyError):
+        store.section("missing")
+
+
+def test_load_test_data_returns_copies():
+    """Test that callers can modify loaded rows without affecting others."""
+    data = load_test_data()
+    data["users"][0]["email"] = "changed@example.com"
+    data["users"].clear()
+    fresh = load_test_data()
+    assert fresh["users"][0]["email"] != "changed@example.com"
+    assert load_test_data("users") == fresh["users"]
+
+
+def test_load_test_data_copies_nested_values(tmp_path, monkeypatch):
+    """Test that nested lists and dicts are not shared with the store."""
+    path = tmp_path / "samples.json"
+    path.write_text(json.dumps(
+        {"users": [{"id": "USR001", "tags": ["a"], "profile": {"age": 30}}]}
+    ))
+    store = SampleStore(path)
+    monkeypatch.setattr(test_helpers, "get_sample_store", lambda: store)
+    user = load_test_data("users")[0]
+    user["tags"].append("b")
+    load_test_data()["users"][0]["profile"]["age"] = 99
+    assert store.section("users") == [
+        {"id": "USR001", "tags": ["a"], "profile": {"age": 30}}
+    ]
+
+
+def test_ndjson_store(tmp_path):
+    """Test offset-indexed row access on an NDJSON directory."""
+    rows = [{"symbol": "BTC", "price": i} for i in range(1000)]
+    write_ndjson_samples({"crypto_prices": rows, "users": []}, tmp_path)
+    store = SampleStore(tmp_path)
+    assert store.is_ndjson
+    assert store.sections() == ["crypto_prices", "users"]
+    assert store.count("crypto_prices") == 1000
+    assert store.row("crypto_prices", 0) == rows[0]
+    assert store.row("crypto_prices", 637) == rows[637]
+    assert store.row("crypto_prices", -1) == rows[-1]
+    assert "crypto_prices" not in store._sections
+    with pytest.raises(IndexError):
+        store.row("crypto_prices", 1000)
+
+    iterator = store.iter_section("crypto_prices")
+    assert next(iterator) == rows[0]
+    assert store.section("crypto_prices") == rows
+    assert store.count("users") == 0
+    assert store.section("users") == []
+
+    # Rewriting a section invalidates its index
+    path = tmp_path / "crypto_prices.ndjson"
+    with open(path, "a") as f:
+        f.write("\n" + json.dumps({"symbol": "ETH", "price": 1}) + "\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert store.count("crypto_prices") == 1001
+    assert store.row("crypto_prices", 1000)["symbol"] == "ETH"
+    store.clear()
@@ -0,0 +1,164 @@
+"""Concurrency stress tests for the lock-striped MockDB and MockRedis."""
+
+import sys
+import threading
+from datetime import timedelta
+
+import pytest
+
+from ..test_helpers import MockDB, MockRedis
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    """Make the interpreter switch threads often to surface races."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(target, count=THREADS):
+    """Run ``target(n)`` on ``count`` threads at once and re-raise errors."""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def run(n):
+        barrier.wait()
+        try:
+            target(n)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_mockdb_concurrent_writes():
+    """Test inserts, updates, deletes and reads racing on one collection."""
+    db = MockDB()
+    db.create_index("events", "worker")
+    db.create_index("events", "seq", ordered=True)
+
+    def work(n):
+        for seq in range(300):
+            db.insert("events", {"worker": n, "seq": seq, "state": "new"})
+            if seq % 3 == 0:
+                db.update_many("events", {"worker": n, "seq": {"$lt": seq}},
+                               {"$set": {"state": "seen"}})
+            if seq % 5 == 4:
+                db.delete_one("events", {"worker": n, "state": "seen"})
+            db.find("events", {"seq": {"$gte": seq - 10}}).sort("seq").to_list()
+            db.insert("other", {"worker": n})
+
+    run_threads(work)
+    live = db.find("events").to_list()
+    assert len({doc["_id"] for doc in live}) == len(live)
+    for n in range(THREADS):
+        indexed = db.find("events", {"worker": n}).to_list()
+        scanned = [doc for doc in live if doc["worker"] == n]
+        assert len(indexed) == len(scanned) == 300 - 60
+    assert len(db.find("events", {"seq": {"$gte": 0}}).to_list()) == len(live)
+    assert len(db.find("other").to_list()) == THREADS * 300
+
+
+def test_mockredis_concurrent_structures():
+    """Test many threads writing shared and private keys."""
+    redis = MockRedis()
+
+    def work(n):
+        for i in range(500):
+            redis.rpush("queue", f"{n}:{i}")
+            redis.hset(f"worker:{n}", mapping={"last": i})
+            redis.zadd("scores", {f"{n}:{i}": i})
+            redis.set(f"key:{n}:{i}", i)
+            if i % 2:
+                redis.lpop("queue")
+
+    run_threads(work)
+    assert redis.llen("queue") == THREADS * 250
+    assert redis.zcard("scores") == THREADS * 500
+    assert all(redis.hget(f"worker:{n}", "last") == 499 for n in range(THREADS))
+    assert len(redis.keys("key:*")) == THREADS * 500
+    assert redis.used_memory == sum(redis._sizes.values())
+
+
+def test_transaction_pipeline_is_atomic():
+    """Test that readers never see half of a transaction."""
+    redis = MockRedis()
+    redis.mset({"a": 0, "b": 0})
+    torn = []
+
+    def work(n):
+        for i in range(400):
+            if n % 2:
+                with redis.pipeline() as pipe:
+                    pipe.set("a", i).set("b", i).execute()
+            else:
+                a, b = redis.mget(["a", "b"])
+                if a != b:
+                    torn.append((a, b))
+
+    run_threads(work)
+    assert torn == []
+
+
+def test_expiry_and_eviction_under_contention(monkeypatch):
+    """Test lazy and active expiry plus eviction racing with reads."""
+    redis = MockRedis(maxmemory=20_000, maxmemory_policy="allkeys-lru")
+    now = MockRedis._now()
+    monkeypatch.setattr(MockRedis, "_now", staticmethod(lambda: now))
+    for i in range(100):
+        redis.set(f"temp:{i}", i, ex=1)
+    monkeypatch.setattr(
+        MockRedis, "_now", staticmethod(lambda: now + timedelta(seconds=2))
+    )
+
+    def work(n):
+        for i in range(100):
+            assert redis.get(f"temp:{i}") is None
+            redis.set(f"fill:{n}:{i}", "x" * 50)
+            redis.get(f"fill:{n}:{max(i - 5, 0)}")
+
+    run_threads(work)
+    info = redis.info()
+    assert info["expired_keys"] == 100
+    assert info["evicted_keys"] > 0
+    assert info["used_memory"] == sum(redis._sizes.values()) <= 20_000
+    assert set(redis._lru) == set(redis.data)
+
+
+def test_snapshot_waits_for_writers():
+    """Test snapshot/restore while other threads keep writing."""
+    db, redis = MockDB(), MockRedis()
+    db.insert("items", {"n": -1})
+    redis.set("counter", -1)
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            db.insert("items", {"n": i})
+            redis.rpush("log", i)
+            i += 1
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(20):
+            db_token, redis_token = db.snapshot(), redis.snapshot()
+            db.restore(db_token)
+            redis.restore(redis_token)
+    finally:
+        stop.set()
+        writer.join()
+    slots = db.data["items"]
+    assert len(db.ids["items"]) == sum(doc is not None for doc in slots)
+    assert redis.get("counter") == -1
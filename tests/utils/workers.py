@@ -0,0 +1,122 @@
+"""Per-worker resource isolation for parallel (pytest-xdist) runs.
+
+Every xdist worker gets its own database names, Redis database and key
+prefix, derived from its worker id (``gw0``, ``gw1``, ...). Outside
+xdist the worker id is ``master`` and every name is left unchanged, so
+serial runs keep using the configured resources. The naming rules live
+in ``test_data/db_utils.py``; this module applies them to URLs and
+environment variables. It is imported by the top-level conftest, so
+``db_utils`` (and pydantic with it) is only imported on xdist workers,
+whose URLs are actually rewritten; serial runs never load it.
+
+Test durations are recorded after each run so ``DurationScheduling``
+can hand the slowest tests out first on the next parallel run.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Union
+from urllib.parse import urlsplit, urlunsplit
+
+
+def worker_database_url(url: str, worker_id: Optional[str] = None) -> str:
+    """Point a database URL at the worker's database."""
+    from .test_data.db_utils import worker_db_name
+    parts = urlsplit(url)
+    name = parts.path.lstrip("/")
+    if not name:
+        return url
+    return urlunsplit(parts._replace(path="/" + worker_db_name(name, worker_id)))
+
+
+def worker_redis_url(url: str, worker_id: Optional[str] = None) -> str:
+    """Point a Redis URL at the worker's database."""
+    from .test_data.db_utils import worker_redis_db
+    parts = urlsplit(url)
+    db = parts.path.lstrip("/")
+    db_number = int(db) if db.isdigit() else 0
+    path = f"/{worker_redis_db(db_number, worker_id)}"
+    return urlunsplit(parts._replace(path=path))
+
+
+def worker_env(
+        base: Mapping[str, str],
+        worker_id: Optional[str] = None
+) -> Dict[str, str]:
+    """Return ``base`` with its database and Redis URLs made per-worker.
+
+    ``DATABASE_URL`` and ``REDIS_URL`` are rewritten when present and
+    ``TEST_WORKER_ID`` is always set.
+    """
+    # Same lookup as db_utils.get_worker_id, without importing pydantic
+    worker_id = worker_id or os.environ.get("PYTEST_XDIST_WORKER", "master")
+    env = dict(base)
+    if worker_id != "master":
+        if "DATABASE_URL" in env:
+            env["DATABASE_URL"] = worker_database_url(env["DATABASE_URL"], worker_id)
+        if "REDIS_URL" in env:
+            env["REDIS_URL"] = worker_redis_url(env["REDIS_URL"], worker_id)
+    env["TEST_WORKER_ID"] = worker_id
+    return env
+
+
+@contextmanager
+def environ_overlay(overrides: Mapping[str, str]) -> Iterator[None]:
+    """Apply environment variables, restoring the environment afterwards.
+
+    Only variables that changed inside the block are written back, so
+    the environment is never cleared and rebuilt.
+    """
+    original = dict(os.environ)
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key in [key for key in os.environ if key not in original]:
+            del os.environ[key]
+        for key, value in original.items():
+            if os.environ.get(key) != value:
+                os.environ[key] = value
+
+
+def load_durations(path: Union[str, Path]) -> Dict[str, float]:
+    """Load recorded test durations, or nothing if there are none yet."""
+    try:
+        with open(path) as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+class DurationRecorder:
+    """Pytest plugin recording how long each test takes.
+
+    Setup, call and teardown times are summed per node id and merged
+    into the durations file at the end of the session, keeping entries
+    for tests that did not run this time.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.durations: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report: Any) -> None:
+        self.durations[report.nodeid] = (
+            self.durations.get(report.nodeid, 0.0) + report.duration
+        )
+
+    def pytest_sessionfinish(self) -> None:
+        if not self.durations:
+            return
+        merged = load_durations(self.path)
+        merged.update(
+            (nodeid, round(duration, 6))
+            for nodeid, duration in self.durations.items()
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(merged, f, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)